@@ -12,7 +12,6 @@ so the session context (and the bill) stays bounded.
 
 from __future__ import annotations
 
-import base64
 import logging
 import threading
 import time
@@ -96,9 +95,8 @@ class AmbientVision:
         jpeg = encode_jpeg(frame, max_width=self.max_width, quality=_AMBIENT_QUALITY)
         if not jpeg:
             return False
-        data_url = "data:image/jpeg;base64," + base64.b64encode(jpeg).decode("ascii")
         try:
-            client.send_image(data_url, AMBIENT_PROMPT, respond=False)
+            client.send_image_jpeg(jpeg, AMBIENT_PROMPT, respond=False)
         except Exception as e:
             logger.debug("ambient image send failed: %s", e)
             return False
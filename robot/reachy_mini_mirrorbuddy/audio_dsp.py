@@ -13,6 +13,7 @@ the child speaks rather than waiting ~200-400ms for the server to notice.
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 from math import gcd
 
 import numpy as np
@@ -42,6 +43,17 @@ def barge_sustain_frames() -> int:
         return _DEFAULT_BARGE_SUSTAIN_FRAMES
 
 
+def barge_sustain_ms() -> float | None:
+    """Read the barge-in sustain time (ms) from the env, or ``None`` if unset."""
+    raw = os.getenv("MIRRORBUDDY_BARGE_SUSTAIN_MS")
+    if raw is None or not raw.strip():
+        return None
+    try:
+        return max(1.0, float(raw))
+    except ValueError:
+        return None
+
+
 def boost(audio: np.ndarray, gain: float) -> np.ndarray:
     """Raise the voice level by compressing the peaks instead of clipping them.
 
@@ -58,6 +70,26 @@ def boost(audio: np.ndarray, gain: float) -> np.ndarray:
     return np.tanh(audio * gain * 0.85).astype(np.float32)
 
 
+def boost_table(gain: float) -> np.ndarray:
+    """:func:`boost` of every int16 sample, scaled to ±1.0, indexed by its uint16 bits.
+
+    Once the speech is at the speaker rate and rounded back to int16, the whole
+    curve — conversion, scaling and the ``tanh`` — is one gather from this
+    table: 256 KiB, built again only when the gain changes.
+    """
+    table = (_all_int16() / 32768.0).astype(np.float32)
+    if gain != 1.0:
+        table = boost(table, gain)
+    table.flags.writeable = False
+    return table
+
+
+def boost_int16(pcm: np.ndarray, table: np.ndarray) -> np.ndarray:
+    """int16 samples to boosted float32 in ±1.0, as one gather from :func:`boost_table`."""
+    pcm = np.ascontiguousarray(pcm, dtype=np.int16)
+    return table[pcm.view(np.uint16)]
+
+
 def resample(audio: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
     """Low-latency polyphase resampling (faster + cleaner than FFT resample)."""
     if src_rate == dst_rate or audio.size == 0:
@@ -66,3 +98,116 @@ def resample(audio: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
     up = dst_rate // g
     down = src_rate // g
     return resample_poly(audio, up, down)
+
+
+_RFFT_OUT = np.lib.NumpyVersion(np.__version__) >= "2.0.0"
+
+
+def rfft_into(frames: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """``np.fft.rfft`` along the last axis, into a preallocated complex ``out``.
+
+    For the per-block loops of the mic thread: on numpy 2 no spectrum-sized
+    array is allocated; on 1.x the new one is copied in.
+    """
+    if _RFFT_OUT:
+        return np.fft.rfft(frames, out=out)
+    out[...] = np.fft.rfft(frames)  # pragma: no cover - numpy 1.x
+    return out
+
+
+def flatness_buffers(n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Work space for :func:`spectral_flatness` of ``n``-sample blocks, to reuse."""
+    bins = n // 2 + 1
+    return np.zeros(n), np.zeros(bins, dtype=np.complex128), np.zeros(bins), np.zeros(bins)
+
+
+def spectral_flatness(audio: np.ndarray, buffers: tuple | None = None) -> float:
+    """How noise-like a block is: ~1.0 for hiss or a fan, well under 0.5 for a voice.
+
+    The geometric over the arithmetic mean of the power spectrum. Energy alone
+    cannot tell a child from a hairdryer; a voice piles its energy into a few
+    harmonics, steady noise spreads it evenly. Pass :func:`flatness_buffers` of
+    the block size to keep a per-block caller free of temporaries.
+    """
+    n = audio.size
+    if n < 16:
+        return 1.0
+    if buffers is None or buffers[0].size != n:
+        buffers = flatness_buffers(n)
+    frame, spec, power, scratch = buffers
+    np.copyto(frame, audio)
+    rfft_into(frame, spec)
+    np.multiply(spec.real, spec.real, out=power)
+    np.multiply(spec.imag, spec.imag, out=scratch)
+    power += scratch
+    power += 1e-12
+    np.log(power, out=scratch)
+    return float(np.exp(scratch.mean()) / power.mean())
+
+
+# --- G.711 --------------------------------------------------------------------
+# μ-law and A-law carry 8-bit samples at 8 kHz: a sixth of the bytes of PCM16 at
+# 24 kHz, which matters on a home Wi-Fi shared with the whole family. Encoding is
+# one lookup per sample into a 65536-entry table indexed by the raw int16 bits,
+# decoding one lookup into a 256-entry table; both tables are built once, from the
+# reference (Sun g711.c) segment rules, and the audio path stays int16 throughout.
+G711_LAWS = ("pcmu", "pcma")
+_ULAW_BIAS = 0x84
+_ULAW_CLIP = 8159
+_ULAW_SEG_END = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+_ALAW_SEG_END = np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF])
+
+
+def _all_int16() -> np.ndarray:
+    """Every int16 value, laid out so the table index is the sample's uint16 bits."""
+    return np.arange(65536, dtype=np.uint32).astype(np.uint16).view(np.int16).astype(np.int32)
+
+
+@lru_cache(maxsize=None)
+def _encode_table(law: str) -> np.ndarray:
+    pcm = _all_int16()
+    if law == "pcmu":
+        val = pcm >> 2
+        mask = np.where(val < 0, 0x7F, 0xFF)
+        val = np.minimum(np.abs(val), _ULAW_CLIP) + (_ULAW_BIAS >> 2)
+        seg = np.searchsorted(_ULAW_SEG_END, val)
+        code = np.where(seg >= 8, 0x7F, (seg << 4) | ((val >> (seg + 1)) & 0xF))
+    else:
+        val = pcm >> 3
+        mask = np.where(val >= 0, 0xD5, 0x55)
+        val = np.where(val >= 0, val, -val - 1)
+        seg = np.searchsorted(_ALAW_SEG_END, val)
+        shift = np.where(seg < 2, 1, seg)
+        code = np.where(seg >= 8, 0x7F, (seg << 4) | ((val >> shift) & 0xF))
+    return (code ^ mask).astype(np.uint8)
+
+
+@lru_cache(maxsize=None)
+def _decode_table(law: str) -> np.ndarray:
+    code = np.arange(256, dtype=np.int32)
+    if law == "pcmu":
+        u = ~code & 0xFF
+        t = (((u & 0x0F) << 3) + _ULAW_BIAS) << ((u & 0x70) >> 4)
+        pcm = np.where(u & 0x80, _ULAW_BIAS - t, t - _ULAW_BIAS)
+    else:
+        a = code ^ 0x55
+        seg = (a & 0x70) >> 4
+        t = (a & 0x0F) << 4
+        t = np.where(seg == 0, t + 8, (t + 0x108) << np.maximum(seg - 1, 0))
+        pcm = np.where(a & 0x80, t, -t)
+    return pcm.astype(np.int16)
+
+
+def g711_encode(pcm: np.ndarray, law: str) -> bytes:
+    """Compand int16 samples to G.711 bytes (``law`` is "pcmu" or "pcma")."""
+    if law not in G711_LAWS:
+        raise ValueError(f"unknown G.711 law: {law!r}")
+    pcm = np.ascontiguousarray(pcm, dtype=np.int16)
+    return _encode_table(law)[pcm.view(np.uint16)].tobytes()
+
+
+def g711_decode(data: bytes, law: str) -> np.ndarray:
+    """Expand G.711 bytes back to int16 samples."""
+    if law not in G711_LAWS:
+        raise ValueError(f"unknown G.711 law: {law!r}")
+    return _decode_table(law)[np.frombuffer(data, dtype=np.uint8)]
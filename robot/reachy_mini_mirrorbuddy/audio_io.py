@@ -4,6 +4,8 @@
   forwards it to a callback (which sends it to Azure).
 - Plays back the model's speech through the robot speaker, resampling to the robot's
   output rate, and forwards the same audio to the movement engine for lip-sync.
+- When the session negotiates G.711, encodes the mic and decodes the model's speech
+  at the edge, so everything in between stays int16.
 """
 
 from __future__ import annotations
@@ -15,13 +17,27 @@ from collections.abc import Callable
 
 import numpy as np
 
-from .audio_dsp import boost, resample
+from . import earcons, meditation
+from .audio_dsp import boost_int16, boost_table, g711_decode, g711_encode
 from .azure_realtime import SAMPLE_RATE
-from .barge_detector import BargeDetector
+from .barge_detector import BargeCalibration, BargeDetector
+from .capture import CaptureSource
+from .keyword_spotter import KeywordSpotter, action_for
+from .mic_chain import MicChain
+from .packetizer import MicPacketizer
+from .playback import PlaybackEngine
+from .quantile import P2Quantile
+from .resampler import StreamingResampler
+from .rt_messages import bytes_per_sample, wire_rate
+from .voice_gate import VoiceGate
 
 logger = logging.getLogger(__name__)
 
 _PLAY_TTL_S = 0.25  # treat Buddy as "speaking" for this long after the last audio chunk
+_MIC_STATS_EVERY_S = 600.0  # how often the mic loop reports what each stage costs
+_MIC_READ_TIMEOUT_S = 0.1  # longest the mic thread sleeps before re-checking for stop
+_EARCON_REPEAT_S = 2.5  # while the wait goes on, a softer "thinking" cue this often
+_EARCON_MAX = 3  # cues per wait: past that, more sound would only add to the confusion
 
 
 class AudioIO:
@@ -35,7 +51,18 @@ class AudioIO:
         on_local_barge_in: Callable[[], None] | None = None,
         barge_rms_threshold: float | None = None,
         barge_sustain_frames: int | None = None,
+        barge_sustain_ms: float | None = None,
         output_gain: float = 1.0,
+        correct_drift: bool = False,
+        mic_packet_ms: float = 40.0,
+        voice_gate: bool = True,
+        gate_preroll_ms: float = 500.0,
+        server_silence_ms: float = 800.0,
+        audio_format: str = "pcm16",
+        keyword_dir: str | None = None,
+        keyword_threshold: float | None = None,
+        playback_lead_ms: float = 150.0,
+        earcon_delay_ms: float = 800.0,
     ) -> None:
         self.robot = robot
         self.on_input_pcm16 = on_input_pcm16
@@ -51,36 +78,164 @@ class AudioIO:
         self._in_rate: int | None = None
         self._out_rate: int | None = None
         self._playing_until = 0.0  # monotonic deadline: Buddy is "speaking" until then
+        # What goes over the websocket: PCM16 at 24 kHz, or G.711 at 8 kHz. The mic is
+        # resampled straight to the wire rate and encoded as the last stage.
+        self.audio_format = audio_format
+        self.wire_rate = wire_rate(audio_format)
+        self._law = audio_format if audio_format != "pcm16" else None
+        wire_bps = self.wire_rate * bytes_per_sample(audio_format)
+        # Resamplers are built once the rates are known: each keeps its filter state
+        # across chunks, so the stream has no seam at every block edge. The mic side
+        # lives inside the chain, with the rest of the capture stages; the speaker has
+        # one per source rate (the model's wire rate, and 24 kHz for local sounds).
+        self.correct_drift = correct_drift
+        self._mic_chain: MicChain | None = None
+        self._capture: CaptureSource | None = None
+        self._spk_resamplers: dict[int, StreamingResampler] = {}
+        self._spk_lock = threading.Lock()  # interrupt() resets what the worker renders with
+        # Speech is rendered and pushed by a worker, paced so only a short lead sits in
+        # the device queue: the realtime thread never waits on the speaker, and a cut
+        # has next to nothing left to flush.
+        self.playback = PlaybackEngine(self._render, self._push_device, lead_ms=playback_lead_ms)
+        # Mic audio leaves in fixed-length packets, not in whatever block size the
+        # media server delivers: far fewer websocket frames for the same audio.
+        self._packets = MicPacketizer(
+            self._send_packet, mic_packet_ms, self.wire_rate, bytes_per_sample(audio_format)
+        )
+        # Nothing goes upstream while the room is silent. The gate's hangover is sized
+        # from the server VAD's silence window, which has to hear a turn end.
+        self._gate = (
+            VoiceGate(
+                self._packets.push,
+                self.wire_rate,
+                preroll_ms=gate_preroll_ms,
+                server_silence_ms=server_silence_ms,
+                on_close=self._packets.flush,
+                bytes_per_second=wire_bps,
+            )
+            if voice_gate
+            else None
+        )
+        # Wired by the controller: True while the session rests or meditates, when
+        # the gate asks for a clearer voice before it streams anything.
+        self.is_resting: Callable[[], bool] | None = None
+        # Stop and wake words spotted on the mic thread, ahead of the transcript. The
+        # templates are analysed at the mic rate, so the spotter is built with it.
+        self.keyword_dir = keyword_dir
+        self.keyword_threshold = keyword_threshold
+        self.keywords: KeywordSpotter | None = None
+        self.on_keyword: Callable[[str], None] | None = None  # wired by the controller
+        # Told, on every cut, which assistant item was playing and how many ms of it
+        # the child actually heard — and whether any of it was left unplayed — so the
+        # client can truncate the conversation to what was really said.
+        self.on_cut: Callable[[str, int, bool], None] | None = None
         # Software make-up gain on Buddy's voice, on top of the system volume. The
         # robot speaker is small: in a room with a child around, the hardware maximum
         # alone is often not enough to be comfortably intelligible.
         self.output_gain = max(0.1, min(8.0, float(output_gain)))
+        self._table: np.ndarray | None = None  # boost_table(_table_gain), built on first use
+        self._table_gain: float | None = None
         # A louder voice also leaks more into the mic, so the barge-in threshold has
         # to rise with it — otherwise Buddy's own speech would cut Buddy off.
         self.barge = BargeDetector(
             rms_threshold=barge_rms_threshold,
             sustain_frames=barge_sustain_frames,
             output_gain=self.output_gain,
+            sustain_ms=barge_sustain_ms,
         )
+        # Dead air after the child's turn is filled with a short cue once it lasts
+        # longer than this (0 = never); the wait itself is measured every turn.
+        self.earcon_delay_s = max(0.0, float(earcon_delay_ms)) / 1000.0
+        # The wait starts and ends on the realtime thread, cues play from the mic
+        # thread: the state below is only touched under this lock.
+        self._earcon_lock = threading.Lock()
+        self._reply_wait_from = 0.0  # monotonic end of the child's turn, until the reply plays
+        self._earcon_due = 0.0  # when the next cue plays if the reply is still silent
+        self._earcon_at = 0.0  # when the first cue of this wait played
+        self._earcon_cues = 0  # cues played in this wait
+        self._earcon_on = False  # a cue may be in the speaker: the reply flushes it
+        self.reply_waits = 0
+        self.earcon_waits = 0  # waits long enough to need a cue
+        self.earcon_s = 0.0  # dead air the cues covered
+        self._reply_latency = (P2Quantile(0.5), P2Quantile(0.9))
+        # A calibration started from the settings page, fed by the mic thread.
+        self.calibration: BargeCalibration | None = None
+        self._on_calibrated: Callable[[BargeCalibration], None] | None = None
 
-    def note_mic_frame(self, rms: float, speaking: bool) -> bool:
-        """Feed one mic frame in; True means cut Buddy off right now."""
-        cut = self.barge.note_frame(rms, speaking)
+    def note_mic_hops(self, hops: np.ndarray, hop_ms: float, speaking: bool) -> bool:
+        """Feed the 10 ms hop RMS of one mic block in; True means cut Buddy off now."""
+        cut = self.barge.note_hops(hops, speaking, hop_ms)
         return cut and self.on_local_barge_in is not None
 
     def barge_threshold(self) -> float:
         """RMS a voice must reach to cut Buddy off, adapted to the room."""
         return self.barge.threshold()
 
+    def calibration_blocker(self) -> str | None:
+        """Why a calibration cannot start now, or None if the room is free to measure.
+
+        The room's quantiles must hear the room: not Buddy, and not a turn of the
+        conversation still going on. A resting session, or one with nothing in
+        flight, is free.
+        """
+        if self.playback.busy() or time.monotonic() < self._playing_until:
+            return "Buddy sta parlando: riprova quando ha finito"
+        if self._resting():
+            return None
+        gate = self._gate
+        if self._reply_wait_from or (gate is not None and gate.is_open):
+            return "c'è una conversazione in corso: di' «zitto» a Buddy e riprova"
+        return None
+
+    def start_calibration(
+        self, on_done: Callable[[BargeCalibration], None] | None = None
+    ) -> BargeCalibration:
+        """Measure the room and the child's voice on the next mic blocks.
+
+        ``on_done`` runs on the mic thread once the result is in. A successful run
+        also takes effect at once: the new ceiling applies without a restart.
+        """
+        self._on_calibrated = on_done
+        self.calibration = BargeCalibration(output_gain=self.output_gain)
+        logger.info("Barge-in calibration started")
+        return self.calibration
+
+    def note_calibration_hops(self, hops: np.ndarray, hop_ms: float, speaking: bool) -> None:
+        """Feed a running calibration (only what the room hears while Buddy is silent)."""
+        cal = self.calibration
+        if cal is None or speaking or not cal.feed(hops, hop_ms):
+            return
+        if cal.setting is not None:
+            self.barge.ceiling = cal.setting * BargeDetector.scale_for_gain(self.output_gain)
+        cb = self._on_calibrated
+        if cb is not None:
+            try:
+                cb(cal)
+            except Exception as e:  # pragma: no cover - runtime robustness
+                logger.warning("calibration callback error: %s", e)
+
+    def _send_packet(self, pcm16: bytes) -> None:
+        # Read at call time: the controller rewires the callback on a Maestro switch.
+        self.on_input_pcm16(pcm16)
+
+    def mic_stage_times(self) -> dict[str, float]:
+        """Mean microseconds per mic block spent in each capture stage."""
+        chain = self._mic_chain
+        return chain.timer.snapshot() if chain is not None else {}
+
     # ------------------------------------------------------------------ lifecycle
     def start(self) -> None:
         self.robot.media.start_recording()
         self.robot.media.start_playing()
         time.sleep(1.0)  # let the gstreamer pipelines come up
         self._probe_rates()
+        # Rendered now, at the speaker's rate: ringing it later is a push, nothing more.
+        meditation.speaker_bell(meditation.BELL_S, self._out_rate or 16000, self.output_gain)
+        self.playback.start()
 
         self._recording = True
         self._stop.clear()
+        self._capture = CaptureSource(self.robot.media, self._in_rate or 16000)
         self._thread = threading.Thread(
             target=self._input_loop, name="MirrorBuddyMic", daemon=True
         )
@@ -101,16 +256,45 @@ class AudioIO:
             self._out_rate = int(self.robot.media.get_output_audio_samplerate())
         except Exception:
             self._out_rate = 16000
+        self._mic_chain = self._new_mic_chain(self._in_rate)
+        self.playback.out_rate = self._out_rate
+        if self.keyword_dir and self.keywords is None:
+            self.keywords = self._load_keywords(self._in_rate)
+        self._spk_resamplers = {
+            rate: StreamingResampler(rate, self._out_rate) for rate in {SAMPLE_RATE, self.wire_rate}
+        }
         logger.info(
-            "Audio rates — mic: %s Hz, speaker: %s Hz, realtime: %s Hz",
+            "Audio rates — mic: %s Hz, speaker: %s Hz, realtime: %s Hz (%s)",
             self._in_rate,
             self._out_rate,
-            SAMPLE_RATE,
+            self.wire_rate,
+            self.audio_format,
         )
 
+    def _load_keywords(self, rate: int) -> KeywordSpotter | None:
+        spotter = KeywordSpotter(rate, self.keyword_threshold)
+        try:
+            count = spotter.load_dir(self.keyword_dir)
+        except OSError as e:
+            logger.warning("Keyword templates unavailable (%s): %s", self.keyword_dir, e)
+            return None
+        if not count:
+            logger.info("No keyword templates in %s; stop/wake stay transcript-only", self.keyword_dir)
+            return None
+        logger.info("On-device keywords: %s (%d templates)", ", ".join(spotter.words), count)
+        return spotter
+
+    def _new_mic_chain(self, in_rate: int) -> MicChain:
+        law = self._law
+        encoder = (lambda pcm: g711_encode(pcm, law)) if law else None
+        return MicChain(in_rate, self.wire_rate, correct_drift=self.correct_drift, encoder=encoder)
+
     def stop(self) -> None:
         self._recording = False
         self._stop.set()
+        if self._capture is not None:
+            self._capture.close()  # wake the mic thread now, not at its next timeout
+        self.playback.stop()
         try:
             self.robot.media.stop_recording()
         except Exception:
@@ -124,42 +308,192 @@ class AudioIO:
             self._thread = None
 
     # ------------------------------------------------------------------ playback
-    def play(self, pcm16: bytes) -> None:
-        """Play model speech (PCM16 @ realtime rate) through the robot speaker."""
+    def play_output(self, data: bytes, item_id: str | None = None) -> None:
+        """Play model speech as it arrives on the wire (PCM16 or G.711).
+
+        ``item_id`` is the assistant item the audio belongs to: the speaker keeps
+        count of how much of it was played, for the truncate after a cut.
+        """
+        if not data:
+            return
+        if self._reply_wait_from:
+            self._reply_started(time.monotonic())
+        if self._law is None:
+            audio = np.frombuffer(data, dtype=np.int16)
+        else:
+            audio = g711_decode(data, self._law)
+        self._play_samples(audio, self.wire_rate, item_id)
+
+    def play(self, pcm16: bytes, sample_rate: int = SAMPLE_RATE) -> None:
+        """Play PCM16 speech (by default at the realtime rate) through the speaker."""
         if not pcm16:
             return
-        # Mark Buddy as speaking so the mic loop knows to watch for a barge-in.
-        self._playing_until = time.monotonic() + _PLAY_TTL_S
-        audio = np.frombuffer(pcm16, dtype=np.int16)
+        self._play_samples(np.frombuffer(pcm16, dtype=np.int16), sample_rate)
+
+    def play_bell(self, seconds: float = meditation.BELL_S) -> None:
+        """Ring the meditation bell, pre-rendered for the speaker (no lip-sync)."""
+        if not self._out_rate:
+            self._probe_rates()
+        rate = self._out_rate or 16000
+        self._play_samples(meditation.speaker_bell(seconds, rate, self.output_gain), rate)
 
+    def _play_samples(self, audio: np.ndarray, rate: int, item_id: str | None = None) -> None:
+        # Mark Buddy as speaking so the mic loop knows to watch for a barge-in; once
+        # the audio reaches the device, _push_device extends this to its real end.
+        self._playing_until = max(self._playing_until, time.monotonic() + _PLAY_TTL_S)
+        self.playback.submit(audio, rate, item_id)
+
+    def _render(self, audio: np.ndarray, rate: int) -> np.ndarray:
+        """Lip-sync, resample to the speaker and boost one chunk (playback worker)."""
         # Lip-sync / head movement is driven by the raw speech signal.
         if self.movements is not None:
             try:
-                self.movements.feed(audio, SAMPLE_RATE)
+                self.movements.feed(audio, rate)
             except Exception as e:
                 logger.debug("movement feed error: %s", e)
 
-        out_rate = self._out_rate or SAMPLE_RATE
-        if self._out_rate is None:
+        if not self._spk_resamplers:
             # Playback started before rates were probed (e.g. an early greeting):
             # probe now so we don't emit the first chunks at the wrong rate.
             self._probe_rates()
-            out_rate = self._out_rate or SAMPLE_RATE
-        if out_rate != SAMPLE_RATE and audio.size:
-            audio = resample(audio, SAMPLE_RATE, out_rate)
-        audio_f32 = (np.asarray(audio, dtype=np.float32)) / 32768.0
-        if self.output_gain != 1.0 and audio_f32.size:
-            audio_f32 = boost(audio_f32, self.output_gain)
+        with self._spk_lock:
+            resampler = self._spk_resamplers.get(rate)
+            if resampler is None:
+                resampler = self._spk_resamplers[rate] = StreamingResampler(rate, self._out_rate)
+            resampled = resampler.process(audio)
+        # The soft clip comes last: the resampler's filter overshoots on loud or
+        # harsh speech, and only a curve applied after it keeps the speaker in ±1.0.
+        # Rounded back to int16, conversion and curve are one table gather.
+        np.rint(resampled, out=resampled)
+        np.clip(resampled, -32768.0, 32767.0, out=resampled)
+        return boost_int16(resampled.astype(np.int16), self._gain_table())
+
+    def _gain_table(self) -> np.ndarray:
+        """The :func:`boost_table` of the current output gain, rebuilt when it changes."""
+        gain = self.output_gain
+        if gain != self._table_gain:
+            self._table, self._table_gain = boost_table(gain), gain
+        return self._table
+
+    def _push_device(self, audio_f32: np.ndarray) -> None:
+        # Buddy is speaking for as long as the device has audio, plus the echo tail.
+        self._playing_until = self.playback.playing_until + _PLAY_TTL_S
         try:
             self.robot.media.push_audio_sample(audio_f32)
         except Exception as e:
             logger.debug("push_audio_sample error: %s", e)
 
+    # ------------------------------------------------------------------ earcons
+    def expect_reply(self) -> None:
+        """The child's turn has ended: time the wait for the answer, cue if it drags."""
+        now = time.monotonic()
+        with self._earcon_lock:
+            self._reply_wait_from = now
+            self._earcon_at = 0.0
+            self._earcon_cues = 0
+            self._earcon_due = now + self.earcon_delay_s if self.earcon_delay_s else 0.0
+
+    def cancel_reply(self) -> None:
+        """No answer is coming after all (an empty transcript, a stop): stop waiting."""
+        with self._earcon_lock:
+            self._reply_wait_from = self._earcon_due = 0.0
+
+    def _check_earcon(self, now: float) -> None:
+        """Play the next cue if the wait has outlasted it (mic thread, every block)."""
+        if not self._earcon_due or now < self._earcon_due:
+            return  # the common case, without the lock
+        if not self._out_rate:
+            self._probe_rates()
+        resting = self._resting()
+        thinking = False
+        with self._earcon_lock:
+            # Checked again under the lock: the reply may have just started.
+            if not self._earcon_due or now < self._earcon_due:
+                return
+            if (
+                resting
+                or self._earcon_cues >= _EARCON_MAX
+                or (not self._earcon_on and self.playback.busy())
+            ):
+                self._earcon_due = 0.0  # nobody is waiting, given up, or something else plays
+                return
+            name = earcons.LISTENING if not self._earcon_cues else earcons.THINKING
+            self._earcon_cues += 1
+            self._earcon_due = now + _EARCON_REPEAT_S
+            if not self._earcon_at:
+                self._earcon_at = now
+                self.earcon_waits += 1
+                thinking = True
+            # Submitted under the lock, so a reply starting now is sure to see it and cut it.
+            self._earcon_on = True
+            self.playback.submit(earcons.render(name, self._out_rate, self.output_gain), self._out_rate)
+        if thinking and self.movements is not None:
+            try:
+                self.movements.set_emotion("thinking")  # the antennas say it too
+            except Exception as e:  # pragma: no cover - runtime robustness
+                logger.debug("earcon emotion error: %s", e)
+
+    def _reply_started(self, now: float) -> None:
+        """The answer's first audio: log the wait and cut any cue short."""
+        with self._earcon_lock:
+            if not self._reply_wait_from:
+                return
+            wait = now - self._reply_wait_from
+            self._reply_wait_from = self._earcon_due = 0.0
+            self.reply_waits += 1
+            for q in self._reply_latency:
+                q.add(wait)
+            if self._earcon_at:
+                self.earcon_s += now - self._earcon_at
+            cued, self._earcon_on = self._earcon_on, False
+            if cued:
+                self.playback.clear()
+        if cued:
+            self._flush_device()
+
+    def earcon_counters(self) -> dict[str, float]:
+        """How long replies took to start, and how often a cue had to fill the wait."""
+        p50, p90 = self._reply_latency
+        return {
+            "replies": self.reply_waits,
+            "cued": self.earcon_waits,
+            "cued_s": self.earcon_s,
+            "latency_p50_s": p50.value,
+            "latency_p90_s": p90.value,
+        }
+
     def interrupt(self) -> None:
         """Stop current playback (barge-in) and reset movement state."""
         # Playback is being cut: stop watching for a barge-in until the next chunk.
         self._playing_until = 0.0
+        with self._earcon_lock:
+            self._earcon_on = False
+            self._reply_wait_from = self._earcon_due = 0.0
+        item_id, played_s = self.playback.position()
+        unplayed = self.playback.busy()
+        self.playback.clear()
+        cb = self.on_cut
+        if item_id is not None and cb is not None:
+            try:
+                cb(item_id, int(played_s * 1000), unplayed)
+            except Exception as e:  # pragma: no cover - runtime robustness
+                logger.debug("cut callback error: %s", e)
         self.barge.reset()
+        # A turn boundary: whatever the child already said goes out now, not when
+        # the packet in progress happens to fill.
+        self._packets.request_flush()
+        # The next sentence starts from silence, not from the tail of the cut one.
+        with self._spk_lock:
+            for resampler in self._spk_resamplers.values():
+                resampler.reset()
+        self._flush_device()
+        if self.movements is not None:
+            try:
+                self.movements.reset()
+            except Exception:
+                pass
+
+    def _flush_device(self) -> None:
         # clear_output_buffer() is deprecated and a no-op on this firmware; clear_player()
         # actually flushes the queued speaker audio so speech stops immediately.
         try:
@@ -169,59 +503,127 @@ class AudioIO:
                 self.robot.media.audio.clear_output_buffer()
             except Exception:
                 pass
-        if self.movements is not None:
-            try:
-                self.movements.reset()
-            except Exception:
-                pass
 
     # ------------------------------------------------------------------ capture
+    def _resting(self) -> bool:
+        cb = self.is_resting
+        try:
+            return bool(cb and cb())
+        except Exception:  # pragma: no cover - runtime robustness
+            return False
+
+    def gate_counters(self) -> dict[str, float]:
+        """Audio seconds captured vs actually sent upstream by the voice gate."""
+        gate = self._gate
+        if gate is None:
+            return {}
+        return {"captured_s": gate.captured_s, "sent_s": gate.sent_s, "opens": gate.opens}
+
+    def playback_counters(self) -> dict[str, float]:
+        """Speech queued ahead of the device, and how often the device ran dry."""
+        return self.playback.counters()
+
+    def _gate_report(self) -> str:
+        gate = self._gate
+        if gate is None or not gate.captured_s:
+            return ""
+        return (
+            f"; voice gate sent {gate.sent_s:.0f}s of {gate.captured_s:.0f}s captured "
+            f"({gate.saved_fraction():.0%} held back)"
+        )
+
+    def _spot_keyword(self, chain: MicChain) -> None:
+        hops = chain.hops
+        voiced = bool(hops.size) and float(hops.max()) >= self.barge.threshold()
+        word = self.keywords.feed(chain.mono, voiced)
+        action = action_for(word) if word else None
+        cb = self.on_keyword
+        if action is None or cb is None:
+            return
+        try:
+            cb(action)
+        except Exception as e:  # pragma: no cover - runtime robustness
+            logger.debug("keyword callback error: %s", e)
+
+    def _send_upstream(self, chain: MicChain, rms: float, barged: bool) -> None:
+        # Resample (and encode) microphone -> wire format, and out in packets
+        # (only while someone is talking, when the voice gate is on).
+        pcm = chain.serialise()
+        gate = self._gate
+        if gate is None:
+            self._packets.push(pcm)
+        else:
+            if barged:
+                gate.force_open()  # a voice cut Buddy off: the server hears it
+            gate.feed(pcm, rms, chain.mono, resting=self._resting())
+        if barged:
+            self._packets.flush()  # the server must hear the interruption now
+
     def _input_loop(self) -> None:
-        in_rate = self._in_rate or 16000
-        needs_resample = in_rate != SAMPLE_RATE
+        chain = self._mic_chain or self._new_mic_chain(self._in_rate or 16000)
+        self._mic_chain = chain
+        capture = self._capture or CaptureSource(self.robot.media, chain.in_rate)
+        report_at = time.monotonic() + _MIC_STATS_EVERY_S
         while self._recording and not self._stop.is_set():
             try:
-                sample = self.robot.media.get_audio_sample()
+                # Sleeps until a block is due instead of spinning on a 1 ms poll.
+                sample = capture.read(_MIC_READ_TIMEOUT_S)
                 if sample is None:
-                    time.sleep(0.001)
                     continue
-                audio = (
-                    sample
-                    if isinstance(sample, np.ndarray)
-                    else np.frombuffer(sample, dtype=np.int16)
-                )
-
-                # Downmix to mono.
-                if audio.ndim == 2:
-                    audio = audio.mean(axis=1)
-
-                # Normalise dtype to int16.
-                if audio.dtype != np.int16:
-                    if np.issubdtype(audio.dtype, np.floating):
-                        audio = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
-                    else:
-                        audio = audio.astype(np.int16)
+                # Downmix, normalise and measure in place; nothing is allocated here.
+                rms = chain.process(sample)
+                if not chain.mono.size:
+                    continue
 
                 # Local barge-in: if the (echo-cancelled) mic hears a sustained voice
                 # while Buddy is speaking, cut playback instantly — no server round-trip.
-                if audio.size:
-                    rms = float(
-                        np.sqrt(np.mean((audio.astype(np.float32) / 32768.0) ** 2))
+                # Judged on 10 ms hops, so the delay is the same whatever the block size.
+                speaking = time.monotonic() < self._playing_until
+                barged = self.note_mic_hops(chain.hops, chain.hop_ms, speaking=speaking)
+                if barged:
+                    try:
+                        self.on_local_barge_in()  # tell the client to drop in-flight audio
+                    except Exception as e:  # pragma: no cover - runtime robustness
+                        logger.debug("local barge-in callback error: %s", e)
+                    # Flush our speaker; after the cancel, so the truncate follows it.
+                    self.interrupt()
+
+                self._check_earcon(time.monotonic())
+
+                cal = self.calibration
+                if cal is not None:
+                    self.note_calibration_hops(chain.hops, chain.hop_ms, speaking)
+                # A running calibration hears the room and then a voice reading to it:
+                # none of that is for the session, which would only answer it.
+                if cal is None or not cal.active:
+                    # "Zitto" / "Buddy" spotted right here, without waiting for Whisper.
+                    if self.keywords is not None:
+                        self._spot_keyword(chain)
+                    self._send_upstream(chain, rms, barged)
+
+                if time.monotonic() >= report_at:
+                    elapsed = _MIC_STATS_EVERY_S + time.monotonic() - report_at
+                    report_at = time.monotonic() + _MIC_STATS_EVERY_S
+                    playback = self.playback
+                    logger.info(
+                        "Mic loop cost: %s; %.1f packets/s upstream, %.0f wakeups/s%s; "
+                        "playback queue peaked at %.1fs, %d underruns (%.2fs); "
+                        "replies started after %.2fs median (p90 %.2fs), cued in %d of %d",
+                        chain.timer.describe(),
+                        self._packets.packets / elapsed,
+                        capture.wakeups / elapsed,
+                        self._gate_report(),
+                        playback.max_depth_s,
+                        playback.underruns,
+                        playback.underrun_s,
+                        self._reply_latency[0].value,
+                        self._reply_latency[1].value,
+                        self.earcon_waits,
+                        self.reply_waits,
                     )
-                    if self.note_mic_frame(
-                        rms, speaking=time.monotonic() < self._playing_until
-                    ):
-                        self.interrupt()  # flush our speaker immediately
-                        try:
-                            self.on_local_barge_in()  # tell the client to drop in-flight audio
-                        except Exception as e:  # pragma: no cover - runtime robustness
-                            logger.debug("local barge-in callback error: %s", e)
-
-                # Resample microphone -> realtime rate.
-                if needs_resample and audio.size:
-                    audio = resample(audio, in_rate, SAMPLE_RATE).astype(np.int16)
-
-                self.on_input_pcm16(audio.tobytes())
+                    chain.timer.reset()
+                    self._packets.packets = 0
+                    capture.wakeups = 0
             except Exception as e:
                 logger.error("mic loop error: %s", e)
                 time.sleep(0.05)
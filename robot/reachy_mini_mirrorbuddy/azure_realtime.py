@@ -6,17 +6,23 @@ Bridges robot audio I/O: mic PCM in, model speech + transcripts + tool calls out
 from __future__ import annotations
 
 import asyncio
-import base64
+import itertools
 import json
 import logging
+import random
 import threading
 import time
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 
 import websockets
 
-from . import rt_messages
-from .rt_events import RealtimeEventsMixin
+from . import outbox, rt_messages
+from .connector import Connector
+from .context_window import ContextWindow
+from .digest import Digest
+from .mic_replay import MicReplay
+from .rt_events import RealtimeEventsMixin, _safe_cb, audio_delta
+from .speech_cache import SpeechCache
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +31,15 @@ SAMPLE_RATE = rt_messages.SAMPLE_RATE  # Azure Realtime PCM sample rate (in and
 _RECONNECT_MIN_S = 1.0  # a session that ran its course comes back immediately
 _RECONNECT_MAX_S = 30.0  # a robot deaf for more than half a minute is a broken robot
 _HEALTHY_SESSION_S = 30.0  # shorter than this counts as a failure, so we back off
+_RECONNECT_JITTER = 0.25  # up to this much longer, so robots that dropped together do not return together
+
+# Azure closes every session at 60 minutes, mid-sentence or not. A successor is
+# opened ``rollover_margin_s`` before that and taken over at a quiet moment.
+_SESSION_MAX_S = 60 * 60.0
+_ROLLOVER_SETUP_S = 20.0  # connect + session.updated for the successor
+_ROLLOVER_SETTLE_S = 1.5  # no event and nothing sent for this long: a quiet moment
+_ROLLOVER_POLL_S = 0.25
+_ROLLOVER_FORCE_S = 15.0  # no quiet moment by this long before expiry: move anyway
 
 
 def _ws_major() -> int:
@@ -35,6 +50,24 @@ def _ws_major() -> int:
         return 0
 
 
+def _text_sender(ws) -> Callable[[str | bytes], Awaitable[None]]:
+    """``ws.send`` for JSON given as str or as UTF-8 bytes, always as a text frame.
+
+    websockets>=14 sends bytes as a text frame as they are (``text=True``); before
+    that, bytes mean a binary frame, which the service rejects, so they are decoded.
+    """
+    if _ws_major() >= 14:
+        async def send(msg: str | bytes) -> None:
+            if isinstance(msg, bytes):
+                await ws.send(msg, text=True)
+            else:
+                await ws.send(msg)
+    else:
+        async def send(msg: str | bytes) -> None:
+            await ws.send(msg.decode("utf-8") if isinstance(msg, bytes) else msg)
+    return send
+
+
 class AzureRealtimeClient(RealtimeEventsMixin):
     def __init__(
         self,
@@ -46,13 +79,24 @@ class AzureRealtimeClient(RealtimeEventsMixin):
         greeting: str | None = None,
         use_ga: bool = True,
         tools: list[dict] | None = None,
-        on_output_audio: Callable[[bytes], None] | None = None,
+        audio_format: str = "pcm16",
+        on_output_audio: Callable[[bytes, str | None], None] | None = None,
         on_speech_started: Callable[[], None] | None = None,
         on_transcript: Callable[[str, bool], None] | None = None,
         on_ready: Callable[[], None] | None = None,
         on_tool_call: Callable[[str, dict, str], None] | None = None,
         on_sleep: Callable[[], None] | None = None,
         on_wake: Callable[[], None] | None = None,
+        on_awaiting_reply: Callable[[bool], None] | None = None,
+        on_user_transcript: Callable[[str], None] | None = None,
+        speech_cache: SpeechCache | None = None,
+        audio_max_age_ms: float = 2000.0,
+        standby: bool = False,
+        rollover_margin_s: float = 300.0,
+        connector: Connector | None = None,
+        keep_images: int = 3,
+        tool_turns: int = 8,
+        digest: Digest | None = None,
     ) -> None:
         self.ws_url = ws_url
         self.api_key = api_key
@@ -62,6 +106,9 @@ class AzureRealtimeClient(RealtimeEventsMixin):
         self.greeting = greeting
         self.use_ga = use_ga
         self.tools = tools or []
+        # Negotiated for both directions. The client passes the bytes through as they
+        # are: AudioIO encodes the mic and decodes the model's speech.
+        self.audio_format = audio_format
         self.on_output_audio = on_output_audio
         self.on_speech_started = on_speech_started
         self.on_transcript = on_transcript
@@ -69,6 +116,34 @@ class AzureRealtimeClient(RealtimeEventsMixin):
         self.on_tool_call = on_tool_call
         self.on_sleep = on_sleep
         self.on_wake = on_wake
+        # True when the child's turn ends and an answer should follow; False if the
+        # transcript then shows none is coming. Drives the earcons.
+        self.on_awaiting_reply = on_awaiting_reply
+        # Every finished transcript of the child, before it is acted on.
+        self.on_user_transcript = on_user_transcript
+        # Parked (see standby.py): connect and configure, but greet only on activate().
+        self._standby = standby
+        self._updated = threading.Event()  # the last persona_update was acknowledged
+        self._greet_on_update = False  # a persona switched in place greets once confirmed
+        # Open the next session this long before the service ends this one (0 = never).
+        self.rollover_margin_s = float(rollover_margin_s)
+        self._sender: asyncio.Future | None = None  # the outbox drained into the current socket
+        # (socket, monotonic time it was opened) a rollover moved to, taken up by _connect_and_listen
+        self._successor: tuple | None = None
+        self._in_turn = False  # the child is speaking, or their turn awaits its transcript
+        self._last_event_at = 0.0  # monotonic time of the last event handled
+        self._last_control_at = 0.0  # ... and of the last control or image message queued
+        self._rollovers = 0
+        self._rollover_failures = 0
+        self._rollover_gap_ms = 0.0
+        # DNS cache, TLS session reuse and connect timings. Owned by the controller,
+        # like the speech cache, so every session of the app shares them.
+        self._connector = connector if connector is not None else Connector()
+        self._update_sent_at = 0.0  # monotonic time this session's session.update went out
+        # What the conversation holds, and the old photos and tool calls to delete from it.
+        self._context = ContextWindow(keep_images=keep_images, tool_turns=tool_turns)
+        # Recent lines of the whole app, told to every fresh conversation of this client.
+        self._digest = digest
         self._fc_names: dict[str, str] = {}
         self._loop: asyncio.AbstractEventLoop | None = None
         self._thread: threading.Thread | None = None
@@ -76,6 +151,7 @@ class AzureRealtimeClient(RealtimeEventsMixin):
         self._stop = threading.Event()
         self._ready = threading.Event()
         self._responding = False  # a model response is currently streaming
+        self._response_audio = False  # the current response has played some audio
         self._suppress = False  # drop in-flight audio after a barge-in cancel
         self._quiet = False  # student asked for silence: keep model muted
         self._speech_started_at = 0.0  # monotonic time the student began this turn
@@ -87,6 +163,29 @@ class AzureRealtimeClient(RealtimeEventsMixin):
         self._pending_farewell = False  # a goodbye was requested; sleep when it starts→done
         self._partial_user = ""  # transcript of the turn being spoken, read for stop words
         self._stopped_on_partial = False  # a stop word already fired for this turn
+        self._woke_locally_at = 0.0  # monotonic time an on-device wake awaits its transcript
+        self._woke_from = 0.0  # when the rest it lifted began, restored if unconfirmed
+        self._audio_item: str | None = None  # assistant item whose audio is streaming
+        self._audio_done_item: str | None = None  # latest item whose audio fully arrived
+        # The cached line last played: its item id, transcript and length in ms.
+        self._cached_line: tuple[str, str, float] | None = None
+        # Bytes per second of audio on the wire, either direction.
+        self._wire_bytes_per_second = (
+            rt_messages.wire_rate(audio_format) * rt_messages.bytes_per_sample(audio_format)
+        )
+        # Mic audio said while the socket is down, appended to the next session.
+        self._replay = MicReplay(self._wire_bytes_per_second)
+        # Everything outbound goes through one sender: control before mic audio
+        # before images, and mic audio too old to matter is dropped.
+        self._outbox = outbox.Outbox(audio_max_age_s=audio_max_age_ms / 1000.0)
+        # Greetings, wake and farewell lines already spoken in this voice. Owned by
+        # the controller so it outlives a Maestro switch.
+        self._speech_cache = speech_cache if speech_cache is not None else SpeechCache()
+        self._record_next: tuple[str, str] | None = None  # (tag, fixed line) asked of the model
+        self._fixed_tags = itertools.count(1)
+        self._recording: str | None = None  # fixed line whose response is streaming
+        self._recorded: list[bytes] = []
+        self._recorded_text = ""
 
     def start(self) -> None:
         self._thread = threading.Thread(target=self._run, name="AzureRealtime", daemon=True)
@@ -95,6 +194,46 @@ class AzureRealtimeClient(RealtimeEventsMixin):
     def wait_ready(self, timeout: float = 20.0) -> bool:
         return self._ready.wait(timeout)
 
+    def activate(self) -> None:
+        """Take a parked session into use: greet now, or as soon as it is ready (thread-safe)."""
+        loop = self._loop
+        if loop is None:
+            self._standby = False  # nothing handled yet: the ready event will greet
+            return
+        try:
+            loop.call_soon_threadsafe(self._activate)
+        except RuntimeError:  # the loop has closed
+            pass
+
+    def update_persona(self, instructions: str, greeting: str | None = None) -> bool:
+        """Become someone else over the open socket, same voice (thread-safe).
+
+        The conversation so far is kept. The new persona greets once the service
+        confirms the update (see :meth:`wait_updated`). False when there is no
+        live session to update: the caller reconnects instead.
+        """
+        if self._ws is None or not self._ready.is_set():
+            return False
+        self.instructions = instructions
+        self.greeting = greeting
+        self._updated.clear()
+        self._greet_on_update = True
+        self._enqueue(json.dumps(rt_messages.persona_update(instructions, self.tools, self.use_ga)))
+        return True
+
+    def wait_updated(self, timeout: float = 5.0) -> bool:
+        return self._updated.wait(timeout)
+
+    def _activate(self) -> None:
+        # On the client's loop, so it cannot race the ready event's own greeting.
+        if not self._standby:
+            return
+        self._standby = False
+        if self._ws is not None:
+            self._carry_over()  # parked before these lines were said
+        if self._ready.is_set():
+            asyncio.ensure_future(self._greet())
+
     def stop(self) -> None:
         self._stop.set()
         loop, ws = self._loop, self._ws
@@ -108,19 +247,33 @@ class AzureRealtimeClient(RealtimeEventsMixin):
         if self._thread:
             self._thread.join(timeout)
 
+    def speech_cache_counters(self) -> dict[str, float]:
+        return self._speech_cache.counters()
+
+    def outbox_counters(self) -> dict[str, dict[str, float]]:
+        """Per message class (control, audio, image): depth, drops and send latency."""
+        return self._outbox.counters()
+
+    def replay_counters(self) -> dict[str, float]:
+        """Reconnect gaps and the mic audio replayed across them (seconds)."""
+        return self._replay.counters()
+
     def send_audio_pcm16(self, pcm16: bytes) -> None:
-        if pcm16:
-            self._enqueue(json.dumps(rt_messages.audio_append(base64.b64encode(pcm16).decode("ascii"))))
+        if pcm16 and not self._replay.offer(pcm16):
+            self._enqueue(rt_messages.audio_append_json(pcm16), outbox.AUDIO)
 
     def send_function_result(self, call_id: str, output: str, respond: bool = True) -> None:
         self._enqueue(json.dumps(rt_messages.function_call_output(call_id, output)))
         if respond:
-            self._enqueue(json.dumps({"type": "response.create"}))
+            self._enqueue(rt_messages.RESPONSE_CREATE)
 
-    def send_image(self, data_url: str, prompt: str, respond: bool = True) -> None:
-        self._enqueue(json.dumps(rt_messages.image_message(data_url, prompt)))
+    def send_image_jpeg(self, jpeg: bytes, prompt: str, respond: bool = True) -> None:
+        """Show the model a JPEG frame: serialised in one copy, no data URL."""
+        # The response.create rides behind the photo in the same queue: asked for
+        # any earlier, the model would answer before it had seen the page.
+        self._enqueue(rt_messages.image_message_json(jpeg, prompt), outbox.IMAGE)
         if respond:
-            self._enqueue(json.dumps({"type": "response.create"}))
+            self._enqueue(rt_messages.RESPONSE_CREATE, outbox.IMAGE)
 
     def speak_now(self, instructions: str) -> None:
         """Ask the model to say something on its own initiative (thread-safe).
@@ -149,6 +302,11 @@ class AzureRealtimeClient(RealtimeEventsMixin):
             self._asleep_since = time.monotonic()
         self._asleep_flag = bool(value)
 
+    @property
+    def is_resting(self) -> bool:
+        """True while the robot rests or sits a meditation: nobody expects an answer."""
+        return self._asleep_flag or self._meditating
+
     def resume_silently(self) -> None:
         """Lift a rest without saying anything (thread-safe).
 
@@ -187,13 +345,13 @@ class AzureRealtimeClient(RealtimeEventsMixin):
             self._responding = False  # one CANCEL per response: avoid a pile-up of no-op cancels
             self._enqueue(rt_messages.CANCEL)
 
-    def _enqueue(self, msg: str) -> None:
-        if self._ws is None or self._loop is None:
+    def _enqueue(self, msg: str | bytes, kind: str = outbox.CONTROL) -> None:
+        """Queue ``msg`` for the sender (thread-safe); dropped while there is no socket."""
+        if self._ws is None:
             return
-        try:
-            asyncio.run_coroutine_threadsafe(self._safe_send(msg), self._loop)
-        except Exception:
-            pass
+        if kind != outbox.AUDIO:
+            self._last_control_at = time.monotonic()
+        self._outbox.put(msg, kind)
 
     def _run(self) -> None:
         self._loop = asyncio.new_event_loop()
@@ -224,10 +382,13 @@ class AzureRealtimeClient(RealtimeEventsMixin):
                 logger.error("Realtime session dropped: %s", e)
             if self._stop.is_set():
                 return
+            if self._ready.is_set():
+                self._replay.hold()  # a session ran: keep what is said until the next one
             if time.monotonic() - started >= _HEALTHY_SESSION_S:
                 delay = _RECONNECT_MIN_S  # a real session ran: come back at once
-            logger.info("Realtime session ended; reconnecting in %.0fs", delay)
-            await asyncio.sleep(delay)
+            wait = min(delay * random.uniform(1.0, 1.0 + _RECONNECT_JITTER), _RECONNECT_MAX_S)
+            logger.info("Realtime session ended; reconnecting in %.1fs", wait)
+            await asyncio.sleep(wait)
             delay = min(delay * 2, _RECONNECT_MAX_S)
 
     def _reset_session_state(self) -> None:
@@ -244,51 +405,260 @@ class AzureRealtimeClient(RealtimeEventsMixin):
         self._fast_requested = False
         self._stopped_on_partial = False
         self._partial_user = ""
+        self._in_turn = False
+        self._context.clear()
+        self._audio_item = self._audio_done_item = None  # item ids do not outlive a session
+        self._cached_line = None
+        self._record_next = self._recording = None
 
     async def _safe_send(self, msg: str) -> None:
-        ws = self._ws
-        if ws is not None:
-            try:
-                await ws.send(msg)
-            except Exception as e:
-                logger.debug("send failed: %s", e)
+        """Send a control message from the client's own loop (through the sender)."""
+        self._enqueue(msg)
 
     async def _connect_and_listen(self) -> None:
+        born = time.monotonic()  # the service counts the hour from the connect
+        ws = await self._open_session()
+        self._update_sent_at = time.monotonic()
+        self._outbox.clear()  # nothing meant for the previous socket
+        self._ws = ws
+        if not self._standby:  # a parked session is told when it is taken
+            self._carry_over()
+        self._sender = None
+        try:
+            await self._replay_gap(ws)
+            self._sender = asyncio.ensure_future(self._outbox.run(_text_sender(ws)))
+            while ws is not None:
+                ws, born = await self._listen(ws, born)  # the successor, after a rollover
+        finally:
+            if self._sender is not None:
+                self._sender.cancel()
+            await self._ws.close()
+        self._ws = None
+        logger.info("WebSocket closed; outbox %s", self._outbox_report())
+        ctx = self._context.counters()
+        logger.info(
+            "Conversation at close: %d items (%d photos, %d tool), %d deleted, "
+            "%d input tokens (peak %d)",
+            ctx["items"], ctx["image"], ctx["tool"], ctx["deleted"], ctx["input_tokens"], ctx["peak_tokens"],
+        )
+
+    async def _open_session(self):
+        """Connect and send the ``session.update``; the events that follow are the caller's."""
         headers = {"api-key": self.api_key}
         logger.info("Connecting to Azure Realtime: %s", self.ws_url.split("?")[0])
         # websockets>=13 names custom handshake headers ``additional_headers``; the
         # 12.x asyncio client calls the same argument ``extra_headers``. Pick the one
         # the installed version accepts so we work across both.
         hdr_kw = "additional_headers" if _ws_major() >= 13 else "extra_headers"
-        async with websockets.connect(
+        ws = await self._connector.connect(
             self.ws_url, max_size=None, ping_interval=20, ping_timeout=20,
             **{hdr_kw: headers},
-        ) as ws:
-            self._ws = ws
-            logger.info("WebSocket connected; configuring session")
-            payload = rt_messages.session_update(
-                self.instructions, self.voice, self.turn_detection, self.tools, self.use_ga
-            )
+        )
+        payload = rt_messages.session_update(
+            self.instructions, self.voice, self.turn_detection, self.tools, self.use_ga,
+            self.audio_format,
+        )
+        try:
             await ws.send(json.dumps(payload))
-
+        except BaseException:
+            await ws.close()
+            raise
+        return ws
+
+    async def _listen(self, ws, born: float) -> tuple:
+        """Handle ``ws`` (opened at ``born``) until it closes; ``(successor, its born)`` after a rollover."""
+        self._successor = None
+        rollover = None
+        if self.rollover_margin_s > 0:
+            rollover = asyncio.ensure_future(self._rollover(ws, born))
+        try:
             async for raw in ws:
                 if self._stop.is_set():
                     break
+                delta = audio_delta(raw)
+                if delta is not None:
+                    self._on_audio_delta(*delta)  # the bulk of the traffic: no json.loads
+                    continue
                 try:
                     event = json.loads(raw)
                 except (ValueError, TypeError):
                     continue
                 await self._handle_event(event)
+        finally:
+            if rollover is not None and self._successor is None:
+                rollover.cancel()  # handed over, it is closing this socket: let it finish
+        successor, self._successor = self._successor, None
+        if successor is None or self._stop.is_set():
+            return None, 0.0
+        return successor
+
+    # ------------------------------------------------------------------ rollover
+    async def _rollover(self, ws, born: float) -> None:
+        """Move to a fresh session before the service closes this one at 60 minutes.
+
+        The successor is connected and configured in the background, then taken
+        over at the first quiet moment — no reply streaming, no turn waiting for
+        its transcript — so nobody hears the change. The queued mic audio and
+        everything after it goes to the successor; the old socket is closed last.
+        """
+        await asyncio.sleep(max(0.0, born + _SESSION_MAX_S - self.rollover_margin_s - time.monotonic()))
+        deadline = born + _SESSION_MAX_S - _ROLLOVER_FORCE_S
+        successor = None
+        try:
+            opened = time.monotonic()
+            successor = await self._open_session()
+            sent = time.monotonic()
+            await asyncio.wait_for(self._until_configured(successor), _ROLLOVER_SETUP_S)
+            ready = time.monotonic()
+            self._connector.configured(successor, ready - sent)
+            while not self._quiet_moment(time.monotonic()) and time.monotonic() < deadline:
+                await asyncio.sleep(_ROLLOVER_POLL_S)
+            quiet = time.monotonic()
+            await self._hand_over(successor)
+            self._carry_over()
+            handed = time.monotonic()
+            # Its hour runs from its own connect, not from when it was taken over.
+            self._successor, successor = (successor, opened), None
+            await ws.close()
+            closed = time.monotonic()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._rollover_failures += 1
+            logger.warning("Session rollover failed (%s); reconnecting when the session expires", e)
+            return
+        finally:
+            if successor is not None:
+                asyncio.ensure_future(successor.close())
+        self._rollovers += 1
+        self._rollover_gap_ms = (handed - quiet) * 1000.0
+        logger.info(
+            "Session rolled over at %.0f min: successor ready in %.2fs, waited %.1fs for a quiet "
+            "moment%s, mic moved in %.1f ms, old socket closed in %.0f ms",
+            (quiet - born) / 60.0, ready - opened, quiet - ready,
+            "" if quiet < deadline else " (none came: forced)", self._rollover_gap_ms,
+            (closed - handed) * 1000.0,
+        )
 
-        self._ws = None
-        logger.info("WebSocket closed")
+    async def _until_configured(self, ws) -> None:
+        """Read a new socket's first events up to ``session.updated``."""
+        while True:
+            try:
+                event = json.loads(await ws.recv())
+            except (ValueError, TypeError):
+                continue
+            if event.get("type") == "session.updated":
+                return
+            if event.get("type") == "error":
+                raise RuntimeError(f"session.update refused: {event.get('error')}")
+
+    def _quiet_moment(self, now: float) -> bool:
+        """Nothing in flight: no reply, no turn awaiting its transcript, nothing just asked."""
+        if self._responding or self._in_turn or self._fast_requested:
+            return False
+        return now - max(self._last_event_at, self._last_control_at) >= _ROLLOVER_SETTLE_S
+
+    async def _hand_over(self, successor) -> None:
+        """Point the sender and the per-session state at ``successor``."""
+        sender = self._sender
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+        self._ws = successor
+        self._sender = asyncio.ensure_future(self._outbox.run(_text_sender(successor)))
+        self._audio_item = self._audio_done_item = None  # item ids do not outlive a session
+        self._cached_line = None
+        self._fc_names.clear()
+        self._context.clear()
+
+    def context_counters(self) -> dict[str, float]:
+        """Conversation items by kind, deletions, and the context size in tokens."""
+        return self._context.counters()
+
+    def connect_counters(self) -> dict[str, float]:
+        """Connects, DNS cache hits, resumed TLS sessions and median time per phase."""
+        return self._connector.counters()
+
+    def rollover_counters(self) -> dict[str, float]:
+        return {
+            "rollovers": self._rollovers,
+            "failures": self._rollover_failures,
+            "last_gap_ms": self._rollover_gap_ms,
+        }
+
+    def _outbox_report(self) -> str:
+        return ", ".join(
+            f"{kind} p50 {c['latency_p50_ms']:.0f} ms / p90 {c['latency_p90_ms']:.0f} ms"
+            f" (peak depth {c['max_depth']:.0f}, {c['dropped']:.0f} dropped)"
+            for kind, c in self._outbox.counters().items()
+        )
+
+    async def _replay_gap(self, ws) -> None:
+        """Append what the child said while disconnected, ahead of any live audio."""
+        replay = self._replay
+        if not replay.holding:
+            return
+        audio = replay.release()
+        if audio:
+            await _text_sender(ws)(rt_messages.audio_append_json(audio))
+        logger.info(
+            "Reconnected after a %.1fs gap: replayed %.1fs of mic audio (%.1fs dropped in total)",
+            replay.last_gap_s, len(audio) / replay.bytes_per_second, replay.dropped_s,
+        )
+
+    def _carry_over(self) -> None:
+        """Tell a fresh conversation what was said before it (see :mod:`digest`)."""
+        text = self._digest.render() if self._digest is not None else ""
+        if text:
+            self._enqueue(json.dumps(rt_messages.system_message(text)))
+            logger.info("Carried %d characters of the conversation into the new session", len(text))
 
     async def _greet(self) -> None:
         instructions = (
             f"Di' esattamente, con calore: «{self.greeting}»" if self.greeting
             else "Saluta calorosamente e presentati brevemente, poi chiedi da cosa vuole partire."
         )
-        await self._safe_send(json.dumps({"type": "response.create", "response": {"instructions": instructions}}))
+        await self._speak_fixed(instructions, guard=False)
+
+    async def _speak_fixed(self, instructions: str, guard: bool = True) -> None:
+        """Say a fixed line: from the speech cache if this voice has said it before.
+
+        The first time, the model is asked as usual and its response recorded (see
+        :mod:`speech_cache`). Afterwards the audio plays here at once, and the
+        transcript goes into the conversation as an assistant message so the model
+        knows it was said. ``guard`` applies :meth:`_request_response`'s checks.
+        """
+        if guard and (self._responding or self._meditating):
+            return
+        cached = self._speech_cache.get(self.voice, instructions)
+        if cached is None:
+            # Tagged: only the response that carries the tag back is recorded, so
+            # a rejected request cannot leave the next ordinary answer cached here.
+            tag = str(next(self._fixed_tags))
+            self._record_next = (tag, instructions)
+            await self._safe_send(json.dumps(
+                rt_messages.response_create(instructions, {rt_messages.FIXED_LINE: tag})
+            ))
+            return
+        if self._quiet or self._asleep:
+            return  # what response.created would have cancelled
+        # Named here, so a barge-in during the line can trim it (see truncate_heard);
+        # all of its audio is handed over at once.
+        item_id = f"{rt_messages.CACHED_ITEM}{next(self._fixed_tags)}"
+        self._audio_item = self._audio_done_item = item_id
+        self._cached_line = (item_id, cached.transcript, cached.size * 1000.0 / self._wire_bytes_per_second)
+        await self._safe_send(json.dumps(rt_messages.assistant_message(cached.transcript, self.use_ga, item_id)))
+        logger.info("Speaking a cached line (%d bytes): %r", cached.size, cached.transcript)
+        if self.on_transcript:
+            _safe_cb(self.on_transcript, cached.transcript, False)
+            _safe_cb(self.on_transcript, cached.transcript, True)
+        if self.on_output_audio:
+            for chunk in cached.chunks:
+                _safe_cb(self.on_output_audio, chunk, item_id)
+        if self._pending_farewell and self._loop is not None:
+            # No response.done will come: rest once the goodbye has been played.
+            self._pending_farewell = False
+            self._sleep_after = True
+            self._loop.call_later(cached.size / self._wire_bytes_per_second, self._finish_farewell)
 
     async def _request_response(self, instructions: str | None = None) -> None:
         """Ask the model to speak now, optionally steering what it should say.
@@ -8,7 +8,10 @@ from __future__ import annotations
 
 import logging
 
+import numpy as np
+
 from . import audio_dsp
+from .quantile import P2Quantile
 
 logger = logging.getLogger(__name__)
 
@@ -17,22 +20,34 @@ logger = logging.getLogger(__name__)
 # never reaches a fixed 0.045 — so "zitto" would go unheard exactly when it matters.
 # We track the room's noise floor while Buddy is silent and trigger at a multiple of
 # it, never below _BARGE_MIN_RMS (so a silent room cannot arm on nothing).
-_NOISE_EMA_ALPHA = 0.05
+# The floor is the *median* silent-room RMS, not an EMA: a door or a chair while
+# Buddy is quiet used to drag an EMA up for seconds. The 95th percentile keeps the
+# threshold above the room's own occasional bumps.
 _BARGE_NOISE_RATIO = 4.0
+_PEAK_MARGIN = 1.5
+# The quantiles are restarted every _FLOOR_WINDOW observations (~30 s of 10 ms hops)
+# so the floor follows a room that changes; the previous window answers until the
+# new one has _FLOOR_WARMUP observations of its own.
+_FLOOR_WINDOW = 3000
+_FLOOR_WARMUP = 50
 _BARGE_MIN_RMS = 0.012
 # Reference gain the configured ceiling is calibrated against; louder playback leaks
 # more into the mic, so the ceiling has to rise with it (see scale_for_gain).
 _GAIN_REFERENCE = 1.6
+# The frame count was tuned on 20 ms media blocks; it converts to a duration at that
+# length when no sustain time is configured, so existing settings keep their feel.
+_FRAME_MS = 20.0
 
 
 class BargeDetector:
-    """Stateful mic-frame decision: does this frame mean 'stop talking'?"""
+    """Stateful mic-block decision: do these hops mean 'stop talking'?"""
 
     def __init__(
         self,
         rms_threshold: float | None = None,
         sustain_frames: int | None = None,
         output_gain: float = 1.0,
+        sustain_ms: float | None = None,
     ) -> None:
         # Prefer values passed by the caller (from Config, read after the instance
         # .env loads); fall back to env/defaults for standalone use. The defaults are
@@ -48,9 +63,18 @@ class BargeDetector:
             if sustain_frames is not None
             else audio_dsp.barge_sustain_frames()
         )
+        # How long a voice must stay loud before it cuts, in milliseconds: the same
+        # on every firmware, whatever block size its media server delivers.
+        if sustain_ms is None:
+            sustain_ms = audio_dsp.barge_sustain_ms()
+        if sustain_ms is None:
+            sustain_ms = self.sustain_frames * _FRAME_MS
+        self.sustain_ms = max(1.0, float(sustain_ms))
         self.ceiling *= self.scale_for_gain(output_gain)
-        self.noise_floor = 0.004  # room RMS while Buddy is silent, adapted continuously
-        self._loud_frames = 0
+        self._floor_seed = 0.004  # a still robot's room, until the room says otherwise
+        self._room = self._new_window()
+        self._last_room: tuple[P2Quantile, P2Quantile] | None = None
+        self._loud_ms = 0.0
 
     @staticmethod
     def scale_for_gain(output_gain: float) -> float:
@@ -59,39 +83,188 @@ class BargeDetector:
 
     def reset(self) -> None:
         """Forget the debounce streak (playback was cut; start watching afresh)."""
-        self._loud_frames = 0
+        self._loud_ms = 0.0
+
+    @property
+    def noise_floor(self) -> float:
+        """Median room RMS while Buddy is silent."""
+        room = self._settled_room()
+        return room[0].value if room else self._floor_seed
+
+    @noise_floor.setter
+    def noise_floor(self, value: float) -> None:
+        """Start over from a known floor (and forget the room's peaks)."""
+        self._floor_seed = float(value)
+        self._room = self._new_window()
+        self._last_room = None
+
+    @property
+    def noise_peak(self) -> float | None:
+        """95th percentile of the room RMS while Buddy is silent, once measured."""
+        room = self._settled_room()
+        if room is None or room[1].count < _FLOOR_WARMUP:
+            return None  # a handful of values has no tail worth the name yet
+        return room[1].value
 
     def threshold(self) -> float:
         """RMS a voice must reach to cut Buddy off, adapted to the room."""
         adaptive = max(_BARGE_MIN_RMS, self.noise_floor * _BARGE_NOISE_RATIO)
+        peak = self.noise_peak
+        if peak is not None:
+            adaptive = max(adaptive, peak * _PEAK_MARGIN)
         return min(self.ceiling, adaptive)
 
-    def note_frame(self, rms: float, speaking: bool) -> bool:
-        """Feed one mic frame in; True means cut Buddy off right now.
+    def note_hops(self, hops: np.ndarray, speaking: bool, hop_ms: float) -> bool:
+        """Feed the RMS of consecutive ``hop_ms`` hops in; True means cut Buddy off.
 
-        While Buddy is silent the frame teaches the room's noise floor (never his
-        own echo). While he speaks, the frame is measured against the adapted
-        threshold and has to stay over it for a few frames in a row, so a cough or
-        a chair does not take the turn away from him mid-sentence.
+        While Buddy is silent the hops teach the room's noise floor (never his own
+        echo). While he speaks, the voice has to stay over the adapted threshold for
+        :attr:`sustain_ms`, counted across blocks, so a cough or a chair does not
+        take the turn away from him, and how fast "zitto" lands does not depend on
+        the media server's block size.
         """
+        if not hops.size:
+            return False
         if not speaking:
-            self.noise_floor = (
-                1 - _NOISE_EMA_ALPHA
-            ) * self.noise_floor + _NOISE_EMA_ALPHA * rms
-            self._loud_frames = 0
+            for rms in hops.tolist():
+                self._learn_floor(rms)
+            self._loud_ms = 0.0
             return False
         threshold = self.threshold()
-        if rms < threshold:
-            self._loud_frames = 0
-            return False
-        self._loud_frames += 1
-        if self._loud_frames < self.sustain_frames:
-            return False
-        self._loud_frames = 0
+        for i, loud in enumerate((hops >= threshold).tolist()):
+            if not loud:
+                self._loud_ms = 0.0
+                continue
+            self._loud_ms += hop_ms
+            if self._loud_ms >= self.sustain_ms - 1e-6:
+                self._loud_ms = 0.0
+                self._log_cut(float(hops[i]), threshold)
+                return True
+        return False
+
+    @staticmethod
+    def _new_window() -> tuple[P2Quantile, P2Quantile]:
+        return P2Quantile(0.5), P2Quantile(0.95)
+
+    def _settled_room(self) -> tuple[P2Quantile, P2Quantile] | None:
+        room = self._room
+        if room[0].count >= _FLOOR_WARMUP:
+            return room
+        if self._last_room is not None:
+            return self._last_room
+        return room if room[0].count else None
+
+    def _learn_floor(self, rms: float) -> None:
+        median, peak = self._room
+        median.add(rms)
+        peak.add(rms)
+        if median.count >= _FLOOR_WINDOW:
+            self._last_room, self._room = self._room, self._new_window()
+
+    def _log_cut(self, rms: float, threshold: float) -> None:
         logger.info(
             "Local barge-in (rms=%.3f, threshold=%.3f, floor=%.4f) — cutting playback now",
             rms,
             threshold,
             self.noise_floor,
         )
+
+
+# Calibration: a few seconds of the quiet room, then the child talking normally.
+_CAL_ROOM_S = 4.0
+_CAL_VOICE_S = 8.0
+_CAL_VOICED_RATIO = 1.3  # a hop this far over the room's peak is the child, not the room
+_CAL_MIN_VOICE_S = 0.3  # less voiced audio than this is no measurement at all
+
+
+class BargeCalibration:
+    """Measure the room, then the child's voice, and suggest ``MIRRORBUDDY_BARGE_RMS``.
+
+    What used to take a script over SSH, run by the mic thread and started from
+    the settings page: the same production hops, the robot's real gain. The room's
+    95th percentile stands for "the loudest the room usually gets" and the voiced
+    hops' 90th percentile for "a normal sentence"; the ceiling lands between them,
+    closer to the room so a tired child still clears it.
+    """
+
+    ROOM, VOICE, DONE, FAILED = "room", "voice", "done", "failed"
+
+    def __init__(
+        self, output_gain: float = 1.0, room_s: float = _CAL_ROOM_S, voice_s: float = _CAL_VOICE_S
+    ) -> None:
+        self.output_gain = float(output_gain)
+        self.room_s, self.voice_s = float(room_s), float(voice_s)
+        self.phase = self.ROOM
+        self.elapsed_s = 0.0  # audio seconds heard in the current phase
+        self._room = P2Quantile(0.95)
+        self._voice = P2Quantile(0.9)
+        self._voiced_s = 0.0
+        self.room_peak = 0.0
+        self.voice_level = 0.0
+        self.setting: float | None = None  # what to write as MIRRORBUDDY_BARGE_RMS
+        self.message = "Silenzio per qualche secondo: ascolto la stanza…"
+
+    @property
+    def active(self) -> bool:
+        return self.phase in (self.ROOM, self.VOICE)
+
+    def feed(self, hops: np.ndarray, hop_ms: float) -> bool:
+        """Take the hops of one mic block (Buddy silent); True once the result is in."""
+        if not self.active or not hops.size:
+            return False
+        dt = hop_ms / 1000.0
+        if self.phase == self.ROOM:
+            for rms in hops.tolist():
+                self._room.add(rms)
+            self.elapsed_s += hops.size * dt
+            if self.elapsed_s >= self.room_s - 1e-6:
+                self.room_peak = self._room.value
+                self.phase, self.elapsed_s = self.VOICE, 0.0
+                self.message = "Ora parla normalmente, dal posto del bambino…"
+            return False
+        floor = self.room_peak * _CAL_VOICED_RATIO
+        for rms in hops.tolist():
+            if rms >= floor:
+                self._voice.add(rms)
+                self._voiced_s += dt
+        self.elapsed_s += hops.size * dt
+        if self.elapsed_s < self.voice_s - 1e-6:
+            return False
+        self._finish()
         return True
+
+    def status(self) -> dict:
+        return {
+            "phase": self.phase,
+            "elapsed": round(self.elapsed_s, 1),
+            "duration": self.room_s if self.phase == self.ROOM else self.voice_s,
+            "message": self.message,
+            "roomPeak": round(self.room_peak, 4),
+            "voice": round(self.voice_level, 4),
+            "setting": self.setting,
+        }
+
+    def _finish(self) -> None:
+        if self._voiced_s < _CAL_MIN_VOICE_S:
+            self.phase = self.FAILED
+            self.message = "Non ho sentito nessuna voce: riprova parlando più vicino al robot."
+            return
+        self.voice_level = self._voice.value
+        # Never under the room's peak, or the room would be cutting Buddy off all day.
+        suggested = max(self.room_peak * _CAL_VOICED_RATIO, (self.room_peak + self.voice_level) / 2)
+        if suggested >= self.voice_level:
+            self.phase = self.FAILED
+            self.message = (
+                "La voce non si distingue dalla stanza: allontana il robot dal rumore, "
+                "oppure affidati alla parola «zitto»."
+            )
+            return
+        # The setting is scaled by the output gain at startup, so hand back the value
+        # that *becomes* the intended threshold rather than the threshold itself.
+        self.setting = round(suggested / BargeDetector.scale_for_gain(self.output_gain), 3)
+        self.phase = self.DONE
+        self.message = f"Fatto: sensibilità calibrata ({self.setting:.3f})."
+        logger.info(
+            "Barge-in calibrated: room peak %.4f, voice %.4f -> MIRRORBUDDY_BARGE_RMS=%.3f",
+            self.room_peak, self.voice_level, self.setting,
+        )
@@ -9,17 +9,24 @@ tool), never continuously, and nothing is persisted to disk.
 
 from __future__ import annotations
 
-import base64
 import logging
 import os
 import time
 
-from .jpeg_encoder import encode_jpeg
+from .jpeg_encoder import encode_jpeg, reencode_jpeg
 
 logger = logging.getLogger(__name__)
 
 _RAW_FRAME_ATTEMPTS = 10
 _RAW_FRAME_RETRY_S = 0.2
+# A photo shares the realtime socket with the mic, and one send holds it for the
+# whole upload: mic audio queued behind it that waits past the outbox's age limit
+# (2 s) is dropped. 128 KiB is about a second of upload at 1.4 Mbit/s with the
+# base64 overhead. A bigger frame is encoded again, smaller: the same picture, never
+# a second grab, so what was judged too big is what gets sent.
+_MAX_JPEG_BYTES = 128 * 1024
+_SHRINK_WIDTH = 1024  # still enough to read a page of handwriting
+_SHRINK_QUALITY = 70
 
 
 def _jpeg_size(data: bytes) -> tuple[int, int] | None:
@@ -42,15 +49,15 @@ def _jpeg_size(data: bytes) -> tuple[int, int] | None:
     return None
 
 
-def _capture_jpeg(robot) -> bytes | None:
-    """Return one JPEG frame, encoding it ourselves when the SDK path fails."""
+def _capture_jpeg(robot) -> tuple[bytes | None, object]:
+    """Return one JPEG frame, and the raw frame it came from when we encoded it ourselves."""
     try:
         jpeg = robot.media.get_frame_jpeg()
     except Exception as e:
         logger.warning("get_frame_jpeg failed: %s", e)
         jpeg = None
     if jpeg:
-        return jpeg
+        return jpeg, None
 
     # The SDK encoder is broken on the wireless unit: read() delivers frames but
     # read_jpeg() always returns None. Fall back to the raw frame + our encoder.
@@ -60,19 +67,44 @@ def _capture_jpeg(robot) -> bytes | None:
             frame = robot.media.get_frame()
         except Exception as e:
             logger.warning("get_frame failed: %s", e)
-            return None
+            return None, None
         if frame is not None:
-            return encode_jpeg(frame)
+            return encode_jpeg(frame), frame
         time.sleep(_RAW_FRAME_RETRY_S)
-    return None
+    return None, None
 
 
-def capture_data_url(robot) -> str | None:
-    """Capture one JPEG frame and return it as a ``data:`` URL (or None)."""
-    jpeg = _capture_jpeg(robot)
+def _shrink(jpeg: bytes, frame, max_bytes: int) -> bytes:
+    """``jpeg`` if it fits ``max_bytes``; otherwise the same picture encoded smaller, if that helps.
+
+    ``frame`` is the raw frame behind ``jpeg`` when there is one; an SDK JPEG is
+    decoded and encoded again instead.
+    """
+    if len(jpeg) <= max_bytes:
+        return jpeg
+    if frame is not None:
+        smaller = encode_jpeg(frame, max_width=_SHRINK_WIDTH, quality=_SHRINK_QUALITY)
+    else:
+        size = _jpeg_size(jpeg)
+        smaller = (
+            reencode_jpeg(jpeg, size, max_width=_SHRINK_WIDTH, quality=_SHRINK_QUALITY)
+            if size is not None
+            else None
+        )
+    if smaller and len(smaller) < len(jpeg):
+        logger.info("Camera frame of %d bytes re-encoded to %d", len(jpeg), len(smaller))
+        return smaller
+    logger.warning("Camera frame of %d bytes could not be made smaller; sending it as it is", len(jpeg))
+    return jpeg
+
+
+def capture_frame(robot, max_bytes: int = _MAX_JPEG_BYTES) -> bytes | None:
+    """Capture one JPEG frame of at most about ``max_bytes`` (or None), ready for ``send_image_jpeg``."""
+    jpeg, frame = _capture_jpeg(robot)
     if not jpeg:
         logger.warning("camera returned no frame")
         return None
+    jpeg = _shrink(jpeg, frame, max_bytes)
     size = _jpeg_size(jpeg)
     logger.info("Camera frame: %s bytes, resolution=%s", len(jpeg), size)
     if os.getenv("MIRRORBUDDY_SAVE_FRAMES"):
@@ -81,8 +113,7 @@ def capture_data_url(robot) -> str | None:
                 fh.write(jpeg)
         except Exception as e:
             logger.debug("save frame failed: %s", e)
-    b64 = base64.b64encode(jpeg).decode("ascii")
-    return f"data:image/jpeg;base64,{b64}"
+    return jpeg
 
 
 def face_detected(robot) -> bool:
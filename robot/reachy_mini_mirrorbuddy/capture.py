@@ -0,0 +1,92 @@
+"""A blocking microphone source over the media server's non-blocking pull.
+
+``robot.media.get_audio_sample()`` returns ``None`` when no block is ready, and
+the mic loop used to answer that with ``time.sleep(0.001)`` — a thousand
+wake-ups a second, each one grabbing the GIL away from the 50 Hz motion loop and
+the websocket thread, to find nothing there nine times out of ten.
+
+:class:`CaptureSource` gives the loop a ``read(timeout)`` that sleeps on a
+condition instead. Blocks arrive on the codec's clock, so once the block period
+is known the source sleeps until the next one is due and only then asks the
+media server; a backend that can deliver blocks by callback calls :meth:`push`
+and wakes the reader directly. :meth:`close` wakes it too, so stopping the app
+never waits on a sleeping mic thread.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Before the first block arrives we do not know the period: poll gently.
+_UNKNOWN_GAP_S = 0.005
+# Once a block is due but late, look again at a fraction of the period.
+_LATE_FRACTION = 0.25
+_MIN_GAP_S = 0.001
+_MAX_GAP_S = 0.02
+_MAX_QUEUED = 64  # pushed blocks kept if the reader falls behind (~1-2 s)
+
+
+class CaptureSource:
+    """Blocking reads of mic blocks, paced on the codec's own clock."""
+
+    def __init__(self, media, sample_rate: int) -> None:
+        self.media = media
+        self.sample_rate = int(sample_rate)
+        self._cond = threading.Condition()
+        self._queue: deque = deque(maxlen=_MAX_QUEUED)
+        self._closed = False
+        self._period = 0.0  # duration of one block, learnt from the blocks themselves
+        self._next_due = 0.0
+        self.wakeups = 0  # times the reader woke up, useful or not
+        self.blocks = 0
+
+    # ------------------------------------------------------------------ producer
+    def push(self, sample) -> None:
+        """Hand over a block from a callback-driven backend (any thread)."""
+        with self._cond:
+            self._queue.append(sample)
+            self._cond.notify()
+
+    def close(self) -> None:
+        """Wake any reader and make every later read return ``None`` at once."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------ consumer
+    def read(self, timeout: float):
+        """Return the next mic block, or ``None`` after ``timeout`` or on close."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not self._closed:
+                self.wakeups += 1
+                if self._queue:
+                    return self._got(self._queue.popleft())
+                sample = self.media.get_audio_sample()
+                if sample is not None:
+                    return self._got(sample)
+                now = time.monotonic()
+                if now >= deadline:
+                    return None
+                self._cond.wait(min(deadline - now, self._gap(now)))
+        return None
+
+    def _gap(self, now: float) -> float:
+        """How long to sleep before asking the media server again."""
+        if not self._period:
+            return _UNKNOWN_GAP_S
+        if now < self._next_due:
+            return max(_MIN_GAP_S, self._next_due - now)
+        return min(_MAX_GAP_S, max(_MIN_GAP_S, self._period * _LATE_FRACTION))
+
+    def _got(self, sample):
+        n = sample.shape[0] if isinstance(sample, np.ndarray) else len(sample) // 2
+        if n:
+            self._period = n / self.sample_rate
+            self._next_due = time.monotonic() + self._period
+        self.blocks += 1
+        return sample
@@ -22,6 +22,29 @@ Optional:
                                        lower = more sensitive (cuts sooner)
     MIRRORBUDDY_BARGE_FRAMES           consecutive loud mic frames before cutting (default 3);
                                        higher = more robust to background noise
+    MIRRORBUDDY_BARGE_SUSTAIN_MS       how long a voice must stay loud before cutting, in ms
+                                       (default: BARGE_FRAMES x 20 ms, i.e. 60)
+    MIRRORBUDDY_MIC_DRIFT_CORRECTION   follow a mic clock that drifts from nominal (default off)
+    MIRRORBUDDY_MIC_PACKET_MS          duration of each upstream mic packet, 10..200 (default 40)
+    MIRRORBUDDY_PLAYBACK_LEAD_MS       speech queued in the speaker ahead of playback (default 150)
+    MIRRORBUDDY_AUDIO_MAX_AGE_MS       mic audio queued longer than this is dropped, not sent late
+                                       (default 2000)
+    MIRRORBUDDY_EARCON_MS              silence after a turn before a "thinking" cue, ms
+                                       (default 800, 0 = off)
+    MIRRORBUDDY_ROLLOVER_MARGIN_S      open the next realtime session this long before the
+                                       60-minute expiry, switch at a quiet moment (default 300, 0 = off)
+    MIRRORBUDDY_CONTEXT_KEEP_IMAGES    camera photos kept in the conversation (default 3, 0 = all)
+    MIRRORBUDDY_CONTEXT_TOOL_TURNS     turns a tool call stays in the conversation (default 8, 0 = all)
+    MIRRORBUDDY_DIGEST_TOKENS          budget of the recent-lines digest given to each new
+                                       session, in tokens (default 300, 0 = off)
+    MIRRORBUDDY_STANDBY_SESSIONS       sessions opened ahead of a likely Maestro switch
+                                       (default 1, 0 = off)
+    MIRRORBUDDY_VOICE_GATE             send mic audio only while someone talks (default on)
+    MIRRORBUDDY_VOICE_GATE_PREROLL_MS  audio kept from before the gate opens (default 500)
+    MIRRORBUDDY_KWS_DIR                enrolled stop/wake words, <dir>/<word>/*.wav (default: off)
+    MIRRORBUDDY_KWS_THRESHOLD          fixed match threshold; default: from each word's templates
+    MIRRORBUDDY_AUDIO_FORMAT           realtime audio on the wire: pcm16 (default), pcmu or pcma;
+                                       G.711 (pcmu/pcma) uses a sixth of the bandwidth
 """
 
 from __future__ import annotations
@@ -93,6 +116,9 @@ class Config:
         # sensitivity can be dialled in per environment without a redeploy.
         self.BARGE_RMS_THRESHOLD: float = _float("MIRRORBUDDY_BARGE_RMS", 0.045)
         self.BARGE_SUSTAIN_FRAMES: int = _int("MIRRORBUDDY_BARGE_FRAMES", 3, minimum=1)
+        # The same rule as a duration, judged on 10 ms hops so it holds on any block
+        # size. Unset (0) means "derive it from BARGE_FRAMES".
+        self.BARGE_SUSTAIN_MS: float | None = _float("MIRRORBUDDY_BARGE_SUSTAIN_MS", 0.0) or None
 
         # --- loudness ---
         # System mixer level pushed to the daemon at startup, and a software make-up
@@ -102,6 +128,52 @@ class Config:
         self.OUTPUT_GAIN: float = _float("MIRRORBUDDY_OUTPUT_GAIN", 3.2)
         self.DAEMON_URL: str = os.getenv("MIRRORBUDDY_DAEMON_URL", "http://localhost:8000").rstrip("/")
 
+        # --- audio path ---
+        # Follow a mic clock that runs slightly fast or slow by slipping one sample
+        # now and then. Off by default: Azure does not care about a few ppm, but a
+        # long session on a cheap codec can drift enough to be worth correcting.
+        self.MIC_DRIFT_CORRECTION: bool = _flag("MIRRORBUDDY_MIC_DRIFT_CORRECTION", False)
+        # Length of each mic packet sent upstream. Longer packets mean fewer websocket
+        # frames (less CPU on the CM4); barge-in is decided before packetizing and a
+        # turn boundary flushes the packet, so this never delays a cut.
+        self.MIC_PACKET_MS: float = _float("MIRRORBUDDY_MIC_PACKET_MS", 40.0)
+        # Speech is handed to the speaker by a paced worker: only this much is ever
+        # queued in the device, so a barge-in has almost nothing left to flush.
+        self.PLAYBACK_LEAD_MS: float = _float("MIRRORBUDDY_PLAYBACK_LEAD_MS", 150.0)
+        # Mic audio stuck behind a slow uplink for longer than this is dropped.
+        self.AUDIO_MAX_AGE_MS: float = _float("MIRRORBUDDY_AUDIO_MAX_AGE_MS", 2000.0)
+        # Dead air after the child's turn longer than this gets a soft cue, so a slow
+        # link does not read as "Buddy did not hear me".
+        self.EARCON_MS: float = _float("MIRRORBUDDY_EARCON_MS", 800.0)
+        # Azure ends every realtime session at 60 minutes. This long before, a new one
+        # is opened in the background and taken over between turns (0 = wait for it).
+        self.ROLLOVER_MARGIN_S: float = _float("MIRRORBUDDY_ROLLOVER_MARGIN_S", 300.0)
+        # Older photos and tool calls are deleted from the conversation, so an hour of
+        # ambient vision does not make every later reply slower and dearer.
+        self.CONTEXT_KEEP_IMAGES: int = _int("MIRRORBUDDY_CONTEXT_KEEP_IMAGES", 3, minimum=0)
+        self.CONTEXT_TOOL_TURNS: int = _int("MIRRORBUDDY_CONTEXT_TOOL_TURNS", 8, minimum=0)
+        # A new Maestro or session is told the last lines of the conversation, within
+        # this many tokens, so the child does not have to say it all again.
+        self.DIGEST_TOKENS: int = _int("MIRRORBUDDY_DIGEST_TOKENS", 300, minimum=0)
+        # Realtime sessions kept connected and configured for the Maestro a switch
+        # will most likely go to. Each one is an idle socket; 0 turns it off.
+        self.STANDBY_SESSIONS: int = _int("MIRRORBUDDY_STANDBY_SESSIONS", 1, minimum=0)
+        # Voice gate: hold the mic back while the room is silent (or the robot rests)
+        # and open on a voice, sending the last PREROLL_MS first so no syllable is lost.
+        self.VOICE_GATE: bool = _flag("MIRRORBUDDY_VOICE_GATE", True)
+        self.VOICE_GATE_PREROLL_MS: float = _float("MIRRORBUDDY_VOICE_GATE_PREROLL_MS", 500.0)
+        # On-device stop/wake words: a few recordings of the child saying each word.
+        # The transcript still confirms every decision; this only makes it land sooner.
+        self.KWS_DIR: str | None = (os.getenv("MIRRORBUDDY_KWS_DIR") or "").strip() or None
+        self.KWS_THRESHOLD: float | None = _float("MIRRORBUDDY_KWS_THRESHOLD", 0.0) or None
+        # Audio format negotiated with the realtime session. PCM16 at 24 kHz sounds
+        # best; G.711 μ-law/A-law at 8 kHz is for a Wi-Fi that can't keep up.
+        fmt = (os.getenv("MIRRORBUDDY_AUDIO_FORMAT") or "pcm16").strip().lower()
+        if fmt not in ("pcm16", "pcmu", "pcma"):
+            logger.warning("Invalid MIRRORBUDDY_AUDIO_FORMAT=%r, using pcm16", fmt)
+            fmt = "pcm16"
+        self.AUDIO_FORMAT: str = fmt
+
     def missing(self) -> list[str]:
         """Return the list of required config values that are absent."""
         errors: list[str] = []
@@ -0,0 +1,217 @@
+"""Open realtime websockets cheaply, and say where the time went.
+
+Every reconnect, rollover and Maestro switch used to start from nothing: a DNS
+lookup, a TCP connect, a full TLS handshake — certificate chain verified on a
+Raspberry-class CPU — and the HTTP upgrade, over home Wi-Fi. Nobody could tell
+which of these was slow, because only the total was ever felt.
+
+:class:`Connector` is shared by every client of the app and keeps what can be
+kept between connections:
+
+- the resolved addresses of each host, for ``dns_ttl_s``, tried in turn and the
+  one that answered first next time (all forgotten at once if none of them does);
+- one ``SSLContext``, and the last TLS session of each host, offered again on
+  the next handshake so the server can resume it instead of redoing it
+  (asyncio never passes a session itself: the context adds it);
+
+and it times each phase of each connect: DNS, TCP, the TLS handshake together
+with the websocket upgrade (asyncio does both in one call), and — reported by
+the client — the wait for ``session.updated``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import socket
+import ssl
+import threading
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+import websockets
+
+from .quantile import P2Quantile
+
+logger = logging.getLogger(__name__)
+
+_DNS_TTL_S = 300.0  # Azure endpoints move rarely; a failed connect re-resolves anyway
+# websockets' own default: bounds the lookup and each TCP connect too, which run
+# before websockets starts its clock. A blackholed address would otherwise hang
+# for the kernel's SYN retries, about two minutes.
+_OPEN_TIMEOUT_S = 10.0
+PHASES = ("dns", "tcp", "handshake", "configured")
+
+
+class _ResumingContext(ssl.SSLContext):
+    """An ``SSLContext`` that offers the last session of each host on the next handshake."""
+
+    sessions: dict[str, ssl.SSLSession]
+
+    def wrap_bio(self, incoming, outgoing, server_side=False, server_hostname=None, session=None):
+        if session is None and server_hostname:
+            session = self.sessions.get(server_hostname)
+        return super().wrap_bio(incoming, outgoing, server_side, server_hostname, session)
+
+
+def tls_context() -> _ResumingContext:
+    """A verifying TLS client context with a per-host session store."""
+    ctx = _ResumingContext(ssl.PROTOCOL_TLS_CLIENT)
+    ctx.load_default_certs()
+    ctx.sessions = {}
+    return ctx
+
+
+class Connector:
+    """Websocket connects with a DNS cache, TLS session reuse and per-phase timings (thread-safe)."""
+
+    def __init__(self, dns_ttl_s: float = _DNS_TTL_S) -> None:
+        self.dns_ttl_s = float(dns_ttl_s)
+        self.tls = tls_context()
+        self._addresses: dict[tuple[str, int], tuple[float, list[tuple[int, tuple]]]] = {}
+        self._lock = threading.Lock()
+        self._phases = {phase: P2Quantile(0.5) for phase in PHASES}
+        self.connects = 0
+        self.dns_hits = 0
+        self.resumed = 0
+
+    async def connect(self, url: str, **kwargs):
+        """``websockets.connect(url, **kwargs)``, through the caches; returns the open socket."""
+        parts = urlsplit(url)
+        secure = parts.scheme == "wss"
+        host = parts.hostname or ""
+        port = parts.port or (443 if secure else 80)
+        tls = {"ssl": self.tls, "server_hostname": host} if secure else {}
+        if _proxied(parts.scheme):
+            # The proxy does the lookup and the TCP connect: only the TLS session is ours.
+            started = time.monotonic()
+            ws = await websockets.connect(url, **tls, **kwargs)
+            self._connected(ws, {"handshake": time.monotonic() - started})
+            return ws
+
+        timeout = kwargs.get("open_timeout") or _OPEN_TIMEOUT_S
+        started = time.monotonic()
+        addresses, cached = await asyncio.wait_for(self._resolve(host, port), timeout)
+        resolved = time.monotonic()
+        sock = await self._tcp_connect(host, port, addresses, timeout)
+        connected = time.monotonic()
+        try:
+            ws = await websockets.connect(url, sock=sock, **tls, **kwargs)
+        except BaseException:
+            sock.close()
+            self.forget(host, port)  # the address may be why: look it up again next time
+            raise
+        done = time.monotonic()
+        self._connected(ws, {
+            "dns": resolved - started, "tcp": connected - resolved, "handshake": done - connected,
+        }, cached)
+        return ws
+
+    def forget(self, host: str, port: int) -> None:
+        with self._lock:
+            self._addresses.pop((host, port), None)
+
+    def configured(self, ws, seconds: float) -> None:
+        """``ws`` answered ``session.update`` after ``seconds``.
+
+        Its TLS session is stored again: a TLS 1.3 server sends its resumption
+        ticket after the handshake, so by now the session is one that can resume.
+        """
+        self._phases["configured"].add(seconds)
+        _remember(self.tls, ws)
+
+    def counters(self) -> dict[str, float]:
+        out: dict[str, float] = {
+            "connects": self.connects,
+            "dns_hits": self.dns_hits,
+            "tls_resumed": self.resumed,
+        }
+        for phase, q in self._phases.items():
+            out[f"{phase}_p50_ms"] = q.value * 1000.0
+        return out
+
+    async def _resolve(self, host: str, port: int) -> tuple[list[tuple[int, tuple]], bool]:
+        """Every ``(family, address)`` of ``host``, in the order to try them; and whether cached."""
+        now = time.monotonic()
+        with self._lock:
+            held = self._addresses.get((host, port))
+        if held is not None and now - held[0] < self.dns_ttl_s:
+            return list(held[1]), True
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys((family, address) for family, _, _, _, address in infos))
+        if not addresses:
+            raise OSError(f"no address for {host}")
+        with self._lock:
+            self._addresses[(host, port)] = (now, addresses)
+        return list(addresses), False
+
+    async def _tcp_connect(
+        self, host: str, port: int, addresses: list[tuple[int, tuple]], timeout: float,
+    ) -> socket.socket:
+        """A socket connected to the first of ``addresses`` that answers within ``timeout``.
+
+        A home network with an AAAA record and no working IPv6 route fails on the
+        first address every time: the next one is tried, and remembered first.
+        """
+        loop = asyncio.get_running_loop()
+        error: BaseException | None = None
+        for family, address in addresses:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            try:
+                sock.setblocking(False)
+                await asyncio.wait_for(loop.sock_connect(sock, address), timeout)
+            except OSError as e:  # TimeoutError included
+                sock.close()
+                error = e
+                logger.info("Connect to %s failed (%s); trying the next address", address[0], str(e) or "timed out")
+                continue
+            except BaseException:
+                sock.close()
+                raise
+            self._prefer(host, port, (family, address))
+            return sock
+        self.forget(host, port)
+        if isinstance(error, TimeoutError):
+            raise OSError(f"no address of {host} answered within {timeout:.0f}s")
+        raise error or OSError(f"no address for {host}")
+
+    def _prefer(self, host: str, port: int, answered: tuple[int, tuple]) -> None:
+        with self._lock:
+            held = self._addresses.get((host, port))
+            if held is not None and held[1][0] != answered:
+                rest = [a for a in held[1] if a != answered]
+                self._addresses[(host, port)] = (held[0], [answered, *rest])
+
+    def _connected(self, ws, phases: dict[str, float], cached: bool = False) -> None:
+        self.connects += 1
+        self.dns_hits += cached
+        for phase, seconds in phases.items():
+            self._phases[phase].add(seconds)
+        tls = _remember(self.tls, ws)
+        resumed = None if tls is None else tls.session_reused
+        self.resumed += bool(resumed)
+        logger.info(
+            "Connected in %.0f ms (%s; TLS session %s)",
+            sum(phases.values()) * 1000.0,
+            ", ".join(
+                f"{phase} {seconds * 1000.0:.0f} ms{' cached' if phase == 'dns' and cached else ''}"
+                for phase, seconds in phases.items()
+            ),
+            "n/a" if resumed is None else ("resumed" if resumed else "new"),
+        )
+
+
+def _remember(ctx: _ResumingContext, ws) -> ssl.SSLObject | None:
+    """Keep ``ws``'s TLS session for its host; the TLS object, None on a plain socket."""
+    transport = getattr(ws, "transport", None)
+    tls = transport.get_extra_info("ssl_object") if transport is not None else None
+    if tls is not None and tls.session is not None and tls.server_hostname:
+        ctx.sessions[tls.server_hostname] = tls.session
+    return tls
+
+
+def _proxied(scheme: str) -> bool:
+    """True when the environment routes this scheme through a proxy (websockets honours it)."""
+    proxies = urllib.request.getproxies()
+    return bool(proxies.get("https" if scheme == "wss" else "http"))
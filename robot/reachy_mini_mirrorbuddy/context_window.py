@@ -0,0 +1,129 @@
+"""Keep the realtime conversation from growing for the whole hour.
+
+Everything added to a realtime conversation stays there, and every response is
+computed against all of it. With ambient vision a frame joins every 20 s —
+up to 180 photos of the same desk in an hour — on top of every tool call and
+its result. Replies got slower and dearer as the homework went on, for context
+nobody needed: the child's page of ten minutes ago, a professor list read out
+at the start.
+
+:class:`ContextWindow` follows the items the server reports as created, by
+kind, and says which to delete (``conversation.item.delete``):
+
+- photos beyond the last ``keep_images``;
+- tool calls and their results older than ``tool_turns`` turns of the child.
+
+The conversation itself — what the child and Buddy said — is never dropped.
+The size of the context is the server's own count, from the usage of the
+last response.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+
+IMAGE = "image"
+TOOL = "tool"
+USER = "user"
+ASSISTANT = "assistant"
+OTHER = "other"
+KINDS = (IMAGE, TOOL, USER, ASSISTANT, OTHER)
+
+_KEEP_IMAGES = 3
+_TOOL_TURNS = 8
+
+
+def item_kind(item: dict) -> str:
+    """What a conversation item is, for retention purposes."""
+    itype = item.get("type")
+    if itype in ("function_call", "function_call_output"):
+        return TOOL
+    if itype != "message":
+        return OTHER
+    parts = item.get("content") or ()
+    if any(isinstance(p, dict) and p.get("type") == "input_image" for p in parts):
+        return IMAGE
+    if item.get("role") == "user":
+        return USER
+    if item.get("role") == "assistant":
+        return ASSISTANT
+    return OTHER
+
+
+class ContextWindow:
+    """Conversation items by kind and age, and which of them to delete."""
+
+    def __init__(self, keep_images: int = _KEEP_IMAGES, tool_turns: int = _TOOL_TURNS) -> None:
+        self.keep_images = max(0, int(keep_images))  # 0: keep every photo
+        self.tool_turns = max(0, int(tool_turns))  # 0: keep every tool call
+        self._items: OrderedDict[str, tuple[str, int]] = OrderedDict()  # id -> (kind, turn)
+        self.turn = 0  # the child's turns so far in this session
+        self.deleted = 0
+        self.input_tokens = 0  # context size as the server counted it for the last response
+        self.peak_tokens = 0
+        self.tokens_by_kind: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, item: dict) -> None:
+        """The server created ``item`` (``conversation.item.created`` / ``.added``)."""
+        item_id = item.get("id")
+        if not item_id or item_id in self._items:
+            return
+        kind = item_kind(item)
+        if kind == USER:
+            self.turn += 1
+        self._items[item_id] = (kind, self.turn)
+
+    def removed(self, item_id: str) -> None:
+        """The server confirmed a deletion (or the item is otherwise gone)."""
+        self._items.pop(item_id, None)
+
+    def prune(self) -> list[str]:
+        """Ids to delete now under the retention policy; they are forgotten here."""
+        drop: list[str] = []
+        if self.keep_images:
+            images = [i for i, (kind, _) in self._items.items() if kind == IMAGE]
+            drop += images[:-self.keep_images]
+        if self.tool_turns:
+            drop += [
+                i for i, (kind, turn) in self._items.items()
+                if kind == TOOL and self.turn - turn >= self.tool_turns
+            ]
+        for item_id in drop:
+            del self._items[item_id]
+        self.deleted += len(drop)
+        return drop
+
+    def usage(self, usage: dict | None) -> None:
+        """Record the server's token count from a ``response.done``."""
+        if not usage:
+            return
+        self.input_tokens = int(usage.get("input_tokens") or 0)
+        self.peak_tokens = max(self.peak_tokens, self.input_tokens)
+        details = usage.get("input_token_details") or {}
+        self.tokens_by_kind = {
+            k.removesuffix("_tokens"): int(v) for k, v in details.items()
+            if k.endswith("_tokens") and isinstance(v, (int, float))
+        }
+
+    def clear(self) -> None:
+        """A new session starts with an empty conversation."""
+        self._items.clear()
+        self.turn = 0
+
+    def counters(self) -> dict[str, float]:
+        out: dict[str, float] = {kind: 0 for kind in KINDS}
+        for kind, _ in self._items.values():
+            out[kind] += 1
+        out.update(
+            items=len(self._items),
+            turns=self.turn,
+            deleted=self.deleted,
+            input_tokens=self.input_tokens,
+            peak_tokens=self.peak_tokens,
+        )
+        for kind, tokens in self.tokens_by_kind.items():
+            out[f"{kind}_tokens"] = tokens
+        return out
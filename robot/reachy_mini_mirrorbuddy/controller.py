@@ -7,22 +7,33 @@ session). It keeps ``main.py`` thin and holds all the voice-driven behaviour:
 - ``list_professors``   → speak the available Maestri.
 - ``call_professor``    → switch persona + voice live.
 - ``look_at_homework``  → capture one camera frame and let Buddy read it.
+
+A persona with the same voice (friend ↔ tutor, Maestri sharing a voice) is
+switched in place over the open socket, keeping the conversation; only a new
+voice reconnects. That session is opened before it is asked for (see
+:mod:`standby`): the neutral Buddy while a professor teaches, or the Maestro
+the child just named.
 """
 
 from __future__ import annotations
 
 import logging
 import threading
+import time
 
-from . import ambient_vision, presence, tools
+from . import ambient_vision, presence, standby, tools
 from .audio_io import AudioIO
 from .azure_realtime import AzureRealtimeClient
 from .config import Config
+from .connector import Connector
+from .digest import STUDENT, Digest
 from .dsa import turn_detection_config
-from .mirrorbuddy_client import Maestro
+from .mirrorbuddy_client import Maestro, neutral_buddy
 from .movements import Movements, temperament_for
 from .people import Roster
 from .prompt_builder import build_instructions
+from .quantile import P2Quantile
+from .speech_cache import SpeechCache
 from .tool_handlers import ToolCallMixin
 
 logger = logging.getLogger(__name__)
@@ -49,7 +60,18 @@ class Controller(ToolCallMixin):
         # Who is in the room, for this power cycle only (see people.Roster).
         self.people = Roster(cfg.STUDENT_NAME)
         self._client: AzureRealtimeClient | None = None
+        # Fixed lines already spoken, replayed locally across reconnects and switches.
+        self._speech_cache = SpeechCache()
+        # Resolved address and TLS sessions of the endpoint, reused by every connect.
+        self._connector = Connector()
+        # Recent lines of both sides, so a new Maestro or session knows what was said.
+        self._digest = Digest(max_tokens=cfg.DIGEST_TOKENS)
+        # Sessions opened ahead of a likely switch, so it does not wait on the network.
+        self._standby = standby.Standby(
+            lambda m: self._build_client(m, parked=True), max_sessions=cfg.STANDBY_SESSIONS
+        )
         self._switch_lock = threading.Lock()
+        self._switch_times: dict[str, P2Quantile] = {}  # per path: how long the child waited
         self._partial = ""  # transcript of the reply in flight, used to read the mood
         self._expressed = False
         self._presence: presence.PresenceWatcher | None = None
@@ -61,6 +83,9 @@ class Controller(ToolCallMixin):
         self._client = self._build_client(self.maestro)
         self.audio.on_input_pcm16 = self._client.send_audio_pcm16
         self.audio.on_local_barge_in = self._client.local_barge_in
+        self.audio.on_keyword = self._client.local_keyword
+        self.audio.on_cut = self._client.truncate_heard
+        self.audio.is_resting = self._session_resting
         self._client.start()
         if self.cfg.ENABLE_CAMERA:
             self._presence = presence.PresenceWatcher(self.robot, self._on_presence)
@@ -73,8 +98,14 @@ class Controller(ToolCallMixin):
         ready = self._client.wait_ready(timeout=25.0)
         if not ready:
             logger.warning("Realtime session not confirmed ready; continuing anyway")
+        self._warm_next()
         return ready
 
+    def _session_resting(self) -> bool:
+        """Read by the mic thread's voice gate; follows Maestro switches."""
+        c = self._client
+        return bool(c and c.is_resting)
+
     def is_alive(self) -> bool:
         c = self._client
         return bool(c and c._thread and c._thread.is_alive())
@@ -86,14 +117,15 @@ class Controller(ToolCallMixin):
         if self._vision:
             self._vision.stop()
             self._vision = None
+        self._standby.clear()
         c = self._client
         if c:
             c.stop()
             c.join()
 
     # ------------------------------------------------------------------ building
-    def _build_client(self, maestro: Maestro) -> AzureRealtimeClient:
-        instructions = build_instructions(
+    def _instructions_for(self, maestro: Maestro) -> str:
+        return build_instructions(
             maestro,
             locale=self.cfg.LOCALE,
             dsa_profile=self.cfg.DSA_PROFILE,
@@ -101,21 +133,34 @@ class Controller(ToolCallMixin):
             roster=self.people,
             maestri=self.maestri,
         )
+
+    def _build_client(self, maestro: Maestro, parked: bool = False) -> AzureRealtimeClient:
         return AzureRealtimeClient(
             ws_url=self.cfg.realtime_ws_url(),
             api_key=self.cfg.AZURE_API_KEY or "",
-            instructions=instructions,
+            instructions=self._instructions_for(maestro),
             voice=maestro.voice,
             turn_detection=turn_detection_config(self.cfg.DSA_PROFILE),
             greeting=maestro.greeting or None,
             use_ga=self.cfg.use_ga_protocol,
             tools=tools.TOOL_SCHEMAS,
-            on_output_audio=self.audio.play,
+            audio_format=self.cfg.AUDIO_FORMAT,
+            on_output_audio=self.audio.play_output,
             on_speech_started=self._on_speech_started,
             on_transcript=self._on_transcript,
             on_tool_call=self._on_tool_call,
             on_sleep=self._on_sleep,
             on_wake=self._on_wake,
+            on_awaiting_reply=self._on_awaiting_reply,
+            on_user_transcript=self._on_user_transcript,
+            speech_cache=self._speech_cache,
+            audio_max_age_ms=self.cfg.AUDIO_MAX_AGE_MS,
+            rollover_margin_s=self.cfg.ROLLOVER_MARGIN_S,
+            connector=self._connector,
+            keep_images=self.cfg.CONTEXT_KEEP_IMAGES,
+            tool_turns=self.cfg.CONTEXT_TOOL_TURNS,
+            digest=self._digest,
+            standby=parked,
         )
 
     # ------------------------------------------------------------------ seeing
@@ -187,10 +232,18 @@ class Controller(ToolCallMixin):
                 target=self._vision.attach, args=(self._client,), name="AmbientFrame", daemon=True
             ).start()
 
+    def _on_awaiting_reply(self, waiting: bool) -> None:
+        """The child's turn ended (or turned out to need no answer): time the dead air."""
+        if waiting:
+            self.audio.expect_reply()
+        else:
+            self.audio.cancel_reply()
+
     def _on_transcript(self, text: str, final: bool) -> None:
         """Log the finished line; colour the body language from the first words."""
         if final:
             logger.info("Buddy: %s", text)
+            self._digest.add(self.maestro.display_name or self.maestro.name, text)
             return
         self._partial += text
         # One reading per response: the opening clause sets the mood, and re-reading
@@ -226,28 +279,88 @@ class Controller(ToolCallMixin):
 
     # ------------------------------------------------------------------ tools
     # ------------------------------------------------------------------ switching
+    def _on_user_transcript(self, text: str) -> None:
+        """Keep the line for the digest; if it names a Maestro, open their session now."""
+        self._digest.add(STUDENT, text)
+        target = tools.resolve_maestro(self.maestri, text)
+        if target is not None and target.id != self.maestro.id and self._needs_session(target):
+            self._standby.warm(target)
+
+    def _warm_next(self) -> None:
+        """Park the likeliest next session: back to the neutral Buddy from a professor."""
+        home = neutral_buddy(self.cfg.STUDENT_NAME, self.cfg.BUDDY_VOICE)
+        if home.id != self.maestro.id and self._needs_session(home):
+            self._standby.warm(home)
+
+    def _needs_session(self, target: Maestro) -> bool:
+        """A switch to ``target`` reconnects (its voice is not the one on the socket)."""
+        c = self._client
+        return c is None or c.voice != target.voice
+
+    def standby_counters(self) -> dict[str, float]:
+        """Parked sessions and how often a switch found the one it needed."""
+        return self._standby.counters()
+
     def _switch_to(self, target: Maestro) -> None:
-        """Reconnect the realtime session with a new persona and voice."""
+        """Hand the session to another persona: in place if the voice stays, else reconnect."""
         with self._switch_lock:
-            old = self._client
+            started = time.monotonic()
             self.audio.interrupt()
             self.movements.set_temperament(
                 temperament_for(target.subject, target.teaching_style, target.voice_instructions)
             )
-            new = self._build_client(target)
-            new.start()
-            if not new.wait_ready(timeout=25.0):
-                logger.warning("New Maestro session not ready; keeping the previous one")
-                new.stop()
-                new.join()
+            path = self._switch_in_place(target) or self._switch_session(target)
+            if path is None:
                 return
-            self.audio.on_input_pcm16 = new.send_audio_pcm16
-            self.audio.on_local_barge_in = new.local_barge_in
-            self._client = new
             self.maestro = target
-            if old:
-                old.stop()
-                old.join()
-            logger.info("Switched to Maestro %s (%s), voice=%s", target.display_name, target.id, target.voice)
+            took = time.monotonic() - started
+            self._switch_times.setdefault(path, P2Quantile(0.5)).add(took)
+            logger.info(
+                "Switched to Maestro %s (%s), voice=%s, in %.2fs (%s; standby hit rate %.0f%%)",
+                target.display_name, target.id, target.voice, took, path,
+                self._standby.counters()["hit_rate"] * 100.0,
+            )
+            self._warm_next()
+
+    def _switch_in_place(self, target: Maestro) -> str | None:
+        """Same voice: new instructions over the open socket, conversation kept."""
+        client = self._client
+        if client is None or client.voice != target.voice:
+            return None
+        if not client.update_persona(self._instructions_for(target), target.greeting or None):
+            return None
+        if not client.wait_updated(timeout=5.0):
+            logger.warning("In-place switch not confirmed; reconnecting instead")
+            return None
+        return "in place"
+
+    def _switch_session(self, target: Maestro) -> str | None:
+        """A new voice needs a new session: a parked one if the guess was right."""
+        old = self._client
+        new = self._standby.take(target, self._instructions_for(target))
+        path = "parked session" if new is not None else "new session"
+        if new is None:
+            new = self._build_client(target)
+            new.start()
+        else:
+            new.activate()
+        if not new.wait_ready(timeout=25.0):
+            logger.warning("New Maestro session not ready; keeping the previous one")
+            new.stop()
+            new.join()
+            return None
+        self.audio.on_input_pcm16 = new.send_audio_pcm16
+        self.audio.on_local_barge_in = new.local_barge_in
+        self.audio.on_keyword = new.local_keyword
+        self.audio.on_cut = new.truncate_heard
+        self._client = new
+        if old:
+            old.stop()
+            old.join()
+        return path
+
+    def switch_counters(self) -> dict[str, dict[str, float]]:
+        """Switches per path (in place, parked session, new session) and their median time."""
+        return {path: {"count": q.count, "p50_s": q.value} for path, q in self._switch_times.items()}
 
 
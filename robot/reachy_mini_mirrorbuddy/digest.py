@@ -0,0 +1,69 @@
+"""The last few lines of the conversation, for a session that did not hear them.
+
+A new Maestro, and every reconnected or rolled-over session, starts with an
+empty conversation. After "chiama Galileo" the professor knew nothing of the
+exercise the child had just spent a minute describing, so the child said it
+all again.
+
+:class:`Digest` keeps the recent finished lines of both sides — the child's
+transcripts and what Buddy said — and renders the newest of them that fit a
+hard token budget, as one short system item the client adds to each fresh
+conversation. It lives in memory only, for as long as the app runs: nothing
+of what a child says is ever written to disk.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+
+STUDENT = "Studente"
+
+_MAX_TOKENS = 300
+# Italian runs at about 4 characters per token; 3 keeps the budget a hard one.
+_CHARS_PER_TOKEN = 3
+_LINE_CHARS = 240  # one long answer must not push out everything before it
+_MAX_LINES = 64
+_HEADER = (
+    "Ultime battute della conversazione, dette prima di questa sessione. Servono a "
+    "continuare senza far ripetere nulla allo studente; non leggerle ad alta voce.\n"
+)
+
+
+class Digest:
+    """Rolling record of recent lines, rendered within a token budget (thread-safe)."""
+
+    def __init__(self, max_tokens: int = _MAX_TOKENS) -> None:
+        self.max_tokens = max(0, int(max_tokens))  # 0: nothing is carried over
+        self._lines: deque[str] = deque(maxlen=_MAX_LINES)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def add(self, speaker: str, text: str) -> None:
+        text = " ".join((text or "").split())
+        if not text or not self.max_tokens:
+            return
+        if len(text) > _LINE_CHARS:
+            text = text[:_LINE_CHARS - 1].rstrip() + "…"
+        with self._lock:
+            self._lines.append(f"{speaker}: {text}")
+
+    def render(self) -> str:
+        """The newest lines that fit the budget, oldest first; "" when there are none."""
+        room = self.max_tokens * _CHARS_PER_TOKEN - len(_HEADER)
+        picked: list[str] = []
+        with self._lock:
+            for line in reversed(self._lines):
+                if len(line) + 1 > room:
+                    break
+                picked.append(line)
+                room -= len(line) + 1
+        if not picked:
+            return ""
+        return _HEADER + "\n".join(reversed(picked))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lines.clear()
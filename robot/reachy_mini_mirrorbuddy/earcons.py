@@ -0,0 +1,54 @@
+"""Short synthetic sounds that fill the wait for Buddy's answer.
+
+Between the end of the child's turn (``speech_stopped``) and the first audio
+delta of the reply there is dead air: the transcript, the model, the network.
+Usually it is short; on a slow link it is long enough for a child to think Buddy
+did not hear and say it all again — over the answer that is about to start.
+
+These are the cues played into that gap, only once it has lasted longer than a
+configurable delay: a soft "heard you" blip first, then a quieter "thinking"
+pair of notes while the wait goes on. They are synthesised once per speaker rate
+and output gain, already at the level the speaker wants, so playing one is a
+push of ready samples — no lip-sync, no boost, no resample.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+import numpy as np
+
+from .audio_dsp import boost
+
+LISTENING = "listening"
+THINKING = "thinking"
+
+# (frequency Hz, start s, length s, level) for each note of each cue. Soft sines
+# with slow edges, well below speech level: a cue, not a notification.
+_NOTES: dict[str, tuple[tuple[float, float, float, float], ...]] = {
+    LISTENING: ((660.0, 0.0, 0.09, 0.10), (880.0, 0.07, 0.12, 0.08)),
+    THINKING: ((523.0, 0.0, 0.14, 0.06), (587.0, 0.18, 0.16, 0.05)),
+}
+_FADE_S = 0.02
+
+
+@lru_cache(maxsize=8)
+def render(name: str, rate: int, gain: float = 1.0) -> np.ndarray:
+    """The cue ``name`` as float32 at ``rate``, boosted like speech (read-only, cached)."""
+    notes = _NOTES[name]
+    length = max(start + dur for _, start, dur, _ in notes)
+    out = np.zeros(int(round(length * rate)), dtype=np.float32)
+    for freq, start, dur, level in notes:
+        n = int(round(dur * rate))
+        t = np.arange(n, dtype=np.float32) / rate
+        env = np.ones(n, dtype=np.float32)
+        fade = min(n // 2, int(_FADE_S * rate))
+        if fade:
+            ramp = 0.5 - 0.5 * np.cos(np.linspace(0.0, np.pi, fade, dtype=np.float32))
+            env[:fade] = ramp
+            env[n - fade:] = ramp[::-1]
+        first = int(round(start * rate))
+        out[first:first + n] += level * env * np.sin(2.0 * np.pi * freq * t)
+    out = boost(out, gain)
+    out.flags.writeable = False
+    return out
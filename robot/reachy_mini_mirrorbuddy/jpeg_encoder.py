@@ -4,7 +4,8 @@ The SDK's ``camera.read_jpeg()`` builds its encoder pipeline and pushes the
 buffer before the pipeline has actually reached PLAYING, so on the wireless
 unit it always returns ``None`` even though ``read()`` delivers frames. We
 therefore encode the frame ourselves, pushing a properly timestamped buffer
-and signalling EOS so ``jpegenc`` flushes the picture.
+and signalling EOS so ``jpegenc`` flushes the picture. The same pipeline can
+also take a JPEG in, to make a frame too big to send smaller.
 """
 
 from __future__ import annotations
@@ -17,8 +18,7 @@ _JPEG_QUALITY = 80
 _PULL_TIMEOUT_NS = 5_000_000_000  # 5s
 
 
-def encode_jpeg(frame, max_width: int | None = None, quality: int = _JPEG_QUALITY) -> bytes | None:
-    """Encode a ``(h, w, 3)`` BGR array to JPEG bytes, or None on failure."""
+def _gst():
     try:
         import gi
 
@@ -30,32 +30,29 @@ def encode_jpeg(frame, max_width: int | None = None, quality: int = _JPEG_QUALIT
 
     if not Gst.is_initialized():
         Gst.init(None)
+    return Gst
 
-    try:
-        height, width = frame.shape[:2]
-    except Exception:
-        logger.warning("frame has no usable shape")
-        return None
 
+def _scaled(width: int, height: int, max_width: int | None) -> str:
+    """The videoscale step that caps ``width`` at ``max_width`` (or nothing)."""
+    if not max_width or width <= max_width:
+        return ""
+    out_w = max_width - (max_width % 2)
+    out_h = int(height * out_w / width)
+    out_h -= out_h % 2
+    return f"! videoscale ! video/x-raw,width={out_w},height={out_h} "
+
+
+def _run(Gst, launch: str, data: bytes) -> bytes | None:
+    """Push ``data`` through ``launch`` (appsrc ``src`` to appsink ``sink``) and return the output."""
     pipeline = None
     try:
-        scale = ""
-        if max_width and width > max_width:
-            out_w = max_width - (max_width % 2)
-            out_h = int(height * out_w / width)
-            out_h -= out_h % 2
-            scale = f"! videoscale ! video/x-raw,width={out_w},height={out_h} "
-        pipeline = Gst.parse_launch(
-            "appsrc name=src is-live=false format=time "
-            f"caps=video/x-raw,format=BGR,width={width},height={height},framerate=1/1 "
-            f"! videoconvert {scale}"
-            f"! jpegenc quality={quality} ! appsink name=sink sync=false"
-        )
+        pipeline = Gst.parse_launch(launch)
         src = pipeline.get_by_name("src")
         sink = pipeline.get_by_name("sink")
         pipeline.set_state(Gst.State.PLAYING)
 
-        buffer = Gst.Buffer.new_wrapped(frame.tobytes())
+        buffer = Gst.Buffer.new_wrapped(data)
         buffer.pts = 0
         buffer.duration = Gst.SECOND
         src.emit("push-buffer", buffer)
@@ -83,3 +80,43 @@ def encode_jpeg(frame, max_width: int | None = None, quality: int = _JPEG_QUALIT
                 pipeline.set_state(Gst.State.NULL)
             except Exception:  # pragma: no cover - best effort cleanup
                 pass
+
+
+def encode_jpeg(frame, max_width: int | None = None, quality: int = _JPEG_QUALITY) -> bytes | None:
+    """Encode a ``(h, w, 3)`` BGR array to JPEG bytes, or None on failure."""
+    Gst = _gst()
+    if Gst is None:
+        return None
+
+    try:
+        height, width = frame.shape[:2]
+    except Exception:
+        logger.warning("frame has no usable shape")
+        return None
+
+    return _run(
+        Gst,
+        "appsrc name=src is-live=false format=time "
+        f"caps=video/x-raw,format=BGR,width={width},height={height},framerate=1/1 "
+        f"! videoconvert {_scaled(width, height, max_width)}"
+        f"! jpegenc quality={quality} ! appsink name=sink sync=false",
+        frame.tobytes(),
+    )
+
+
+def reencode_jpeg(
+    jpeg: bytes, size: tuple[int, int], max_width: int | None = None, quality: int = _JPEG_QUALITY
+) -> bytes | None:
+    """Encode the picture in ``jpeg`` (``size`` is its width, height) again, or None on failure."""
+    Gst = _gst()
+    if Gst is None:
+        return None
+
+    width, height = size
+    return _run(
+        Gst,
+        "appsrc name=src is-live=false format=time caps=image/jpeg,framerate=1/1 "
+        f"! jpegdec ! videoconvert {_scaled(width, height, max_width)}"
+        f"! jpegenc quality={quality} ! appsink name=sink sync=false",
+        jpeg,
+    )
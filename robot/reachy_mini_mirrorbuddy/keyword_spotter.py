@@ -0,0 +1,389 @@
+"""On-device spotting of the stop words and the wake word.
+
+"Zitto" and "Buddy" used to be read only in Whisper's transcript of the turn:
+the server has to notice the speech, transcribe it and send the text back, and
+only then did Buddy stop — hundreds of milliseconds of being talked over, more
+while the session rests and the transcript is the only way back.
+
+:class:`KeywordSpotter` listens on the mic thread instead. Each word is enrolled
+as a few short recordings of the child saying it (``<dir>/<word>/*.wav``); the
+spotter keeps the MFCCs of the last second or so of audio and, while someone is
+talking, matches every template against the tail of that stream with
+subsequence DTW. A match fires the local action at once; the transcript that
+follows still confirms or undoes it, so a false alarm costs a cut sentence or a
+lifted rest, never a lost turn.
+
+Everything is numpy: no model download, nothing to train, a few templates per
+child recorded from the settings page or by hand.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+import wave
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from . import rt_messages, session_flow
+from .audio_dsp import rfft_into
+
+logger = logging.getLogger(__name__)
+
+FRAME_MS = 25.0
+HOP_MS = 10.0
+N_MELS = 26
+N_CEPS = 12  # c1..c12: c0 is the level, and a child's level is not the word
+_F_LO, _F_HI = 100.0, 4000.0  # where a child's speech lives, whatever the mic rate
+_CHECK_EVERY = 4  # frames between DTW passes (40 ms)
+_ACTIVE_HOLD_S = 0.3  # keep matching this long after the last voiced hop: words end softly
+_REFRACTORY_S = 1.0  # one word, one action
+_TRIM_RATIO = 0.1  # template frames quieter than this x the loudest are silence
+# A word matches when its DTW cost (mean per-frame cepstral distance) is within
+# this factor of how far the child's own recordings of it are from each other:
+# a child who says "zitto" the same way every time gets a tight match, one whose
+# voice varies gets a looser one.
+_SPREAD_MARGIN = 1.5
+DEFAULT_THRESHOLD = 12.0  # for a word with a single template; tune with tools/eval-kws.py
+
+
+def action_for(word: str) -> str | None:
+    """What an enrolled word asks for, read with the transcript's own rules."""
+    if rt_messages.is_wake(word) or rt_messages.is_resume(word):
+        return session_flow.WAKE
+    if rt_messages.is_rest(word):
+        return session_flow.REST
+    if rt_messages.is_pause(word):
+        return session_flow.PAUSE
+    return None
+
+
+@lru_cache(maxsize=8)
+def _analysis(rate: int) -> tuple[int, int, int, np.ndarray, np.ndarray, np.ndarray]:
+    """Frame, hop, FFT size, window, mel filterbank and DCT for one sample rate."""
+    frame = int(rate * FRAME_MS / 1000.0)
+    hop = int(rate * HOP_MS / 1000.0)
+    nfft = 1 << (frame - 1).bit_length()
+    window = np.hamming(frame).astype(np.float32)
+
+    def mel(f):
+        return 2595.0 * np.log10(1.0 + f / 700.0)
+
+    hi = min(_F_HI, rate / 2.0)
+    edges = 700.0 * (10 ** (np.linspace(mel(_F_LO), mel(hi), N_MELS + 2) / 2595.0) - 1.0)
+    bins = np.fft.rfftfreq(nfft, 1.0 / rate)
+    bank = np.zeros((N_MELS, bins.size), dtype=np.float32)
+    for m in range(N_MELS):
+        lo, mid, top = edges[m], edges[m + 1], edges[m + 2]
+        rise = (bins - lo) / (mid - lo)
+        fall = (top - bins) / (top - mid)
+        bank[m] = np.clip(np.minimum(rise, fall), 0.0, None)
+    k = np.arange(N_MELS)
+    dct = np.cos(np.pi / N_MELS * (k + 0.5)[None, :] * np.arange(1, N_CEPS + 1)[:, None])
+    return frame, hop, nfft, window, bank.T.copy(), dct.T.astype(np.float32).copy()
+
+
+def mfcc(audio: np.ndarray, rate: int) -> np.ndarray:
+    """MFCC frames (``[n, 12]``, c1..c12) of int16-scaled mono audio."""
+    frame, hop, nfft, window, bank, dct = _analysis(rate)
+    audio = np.asarray(audio, dtype=np.float32)
+    if audio.size < frame:
+        return np.zeros((0, N_CEPS), dtype=np.float32)
+    n = 1 + (audio.size - frame) // hop
+    idx = np.arange(frame)[None, :] + hop * np.arange(n)[:, None]
+    frames = audio[idx] * window
+    power = np.abs(np.fft.rfft(frames, nfft, axis=1)) ** 2
+    return (np.log(power @ bank + 1.0) @ dct).astype(np.float32)
+
+
+class _MfccStream:
+    """:func:`mfcc` of a stream, one block at a time, in buffers reused block to block.
+
+    The samples of the frame still incomplete are held over, and each block
+    only analyses the frames it completes.
+    """
+
+    def __init__(self, rate: int) -> None:
+        self.rate = int(rate)
+        self.frame, self.hop, self.nfft, window, bank, dct = _analysis(self.rate)
+        # float64 throughout: numpy's float32 FFT converts (and allocates) on every call.
+        self.window, self.bank, self.dct = (a.astype(np.float64) for a in (window, bank, dct))
+        self._audio = np.zeros(self.frame + self.rate // 10)
+        self._held = 0  # samples carried over to the next block
+        self._alloc(8)
+
+    def _alloc(self, n: int) -> None:
+        bins = self.nfft // 2 + 1
+        # Sample index of every frame of a block: frame i starts i hops in.
+        self._idx = np.arange(self.frame)[None, :] + self.hop * np.arange(n)[:, None]
+        self._windows = np.zeros((n, self.frame))
+        self._frames = np.zeros((n, self.nfft))  # zero-padded to nfft
+        self._spec = np.zeros((n, bins), dtype=np.complex128)
+        self._power = np.zeros((n, bins))
+        self._scratch = np.zeros((n, bins))
+        self._mel = np.zeros((n, N_MELS))
+        self._out = np.zeros((n, N_CEPS))
+
+    def reset(self) -> None:
+        self._held = 0
+
+    def push(self, mono: np.ndarray) -> np.ndarray:
+        """Take one block; return the MFCCs of the frames it completed (a view, reused)."""
+        total = self._held + mono.size
+        if total > self._audio.size:
+            grown = np.zeros(total + self.frame)
+            grown[: self._held] = self._audio[: self._held]
+            self._audio = grown
+        audio = self._audio
+        audio[self._held:total] = mono
+        frame, hop = self.frame, self.hop
+        n = 0 if total < frame else 1 + (total - frame) // hop
+        if n:
+            if n > self._out.shape[0]:
+                self._alloc(n)
+            windows = self._windows[:n]
+            np.take(audio, self._idx[:n], out=windows, mode="clip")  # "raise" buffers out
+            frames = self._frames[:n]
+            np.multiply(windows, self.window, out=frames[:, :frame])
+            spec, power, scratch = self._spec[:n], self._power[:n], self._scratch[:n]
+            rfft_into(frames, spec)
+            np.multiply(spec.real, spec.real, out=power)
+            np.multiply(spec.imag, spec.imag, out=scratch)
+            power += scratch
+            mel = self._mel[:n]
+            np.matmul(power, self.bank, out=mel)
+            mel += 1.0
+            np.log(mel, out=mel)
+            np.matmul(mel, self.dct, out=self._out[:n])
+        self._held = total - n * hop
+        audio[: self._held] = audio[n * hop:total]
+        return self._out[:n]
+
+
+def batch_dtw(bank: np.ndarray, lengths: np.ndarray, stream: np.ndarray) -> np.ndarray:
+    """Cost of the best match of each template ending at each frame of ``stream``.
+
+    ``bank`` holds the templates zero-padded to one length (``[k, n, 12]``) and
+    ``lengths`` their real lengths; the result is ``[k, len(stream)]``. A template
+    may start anywhere in the stream (free start), and its cost is the path's
+    summed frame distance over the template length. Each row of the recursion is
+    a prefix scan across every template at once, so the only Python loop is over
+    template frames.
+    """
+    k, n, d = bank.shape
+    m = stream.shape[0]
+    flat = bank.reshape(k * n, d)
+    sq = (flat * flat).sum(1)[:, None] + (stream * stream).sum(1)[None, :]
+    dist = np.sqrt(np.maximum(sq - 2.0 * (flat @ stream.T), 0.0)).reshape(k, n, m)
+    out = np.empty((k, m), dtype=np.float32)
+    # Scratch rows reused down the recursion: ``shifted`` is the previous row moved
+    # one frame right (the diagonal step), with an impossible cost in front.
+    prev = dist[:, 0, :].copy()
+    shifted = np.full((k, m + 1), np.inf, dtype=np.float32)
+    t = np.empty((k, m), dtype=np.float32)
+    cs = np.empty((k, m), dtype=np.float32)
+    ends = {int(length) - 1: lengths == length for length in np.unique(lengths)}
+    for i in range(n):
+        if i:
+            c = dist[:, i, :]
+            shifted[:, 1:] = prev
+            np.minimum(prev, shifted[:, :-1], out=t)
+            t += c
+            np.cumsum(c, axis=1, out=cs)
+            t -= cs
+            np.minimum.accumulate(t, axis=1, out=prev)
+            prev += cs
+        done = ends.get(i)
+        if done is not None:
+            out[done] = prev[done]
+    return out / lengths[:, None]
+
+
+def subsequence_dtw(template: np.ndarray, stream: np.ndarray) -> np.ndarray:
+    """:func:`batch_dtw` for a single template."""
+    return batch_dtw(template[None], np.array([template.shape[0]]), stream)[0]
+
+
+def load_wav(path: str | Path) -> tuple[np.ndarray, int]:
+    """Read a PCM16 WAV as mono float32 (int16 units) and its sample rate."""
+    with wave.open(str(path), "rb") as w:
+        if w.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAVs are supported")
+        rate, channels = w.getframerate(), w.getnchannels()
+        data = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+    audio = data.reshape(-1, channels).mean(axis=1) if channels > 1 else data
+    return audio.astype(np.float32), rate
+
+
+def _trim(feats: np.ndarray, audio: np.ndarray, rate: int) -> np.ndarray:
+    """Drop the silence around an enrolled word, so it matches the word alone."""
+    _frame, hop, *_ = _analysis(rate)
+    n = feats.shape[0]
+    if not n:
+        return feats
+    level = np.sqrt(
+        np.mean(audio[: n * hop].reshape(n, hop).astype(np.float64) ** 2, axis=1)
+    )
+    loud = np.flatnonzero(level >= _TRIM_RATIO * level.max())
+    return feats[loud[0]:loud[-1] + 1] if loud.size else feats
+
+
+def _span(template: np.ndarray) -> int:
+    """Most stream frames a spoken template can stretch over (a slow child)."""
+    return int(template.shape[0] * 1.6) + 1
+
+
+class KeywordSpotter:
+    """Match enrolled words against the live mic stream (mic thread only)."""
+
+    def __init__(self, sample_rate: int, threshold: float | None = None) -> None:
+        self.sample_rate = int(sample_rate)
+        # None: derive each word's threshold from the spread of its own templates.
+        self.threshold = float(threshold) if threshold else None
+        self.templates: list[tuple[str, np.ndarray]] = []
+        self._thresholds: dict[str, float] = {}
+        self._bank: tuple[np.ndarray, np.ndarray, np.ndarray, int] | None = None
+        self._stream = _MfccStream(self.sample_rate)
+        self._max_frames = 100  # grown to fit the longest template
+        # The MFCCs of the recent stream: a buffer twice as long as what is kept,
+        # so the kept frames move back to its start only once every so often.
+        self._ring = np.zeros((2 * self._max_frames, N_CEPS), dtype=np.float32)
+        self._n_feats = 0
+        self._since_check = 0
+        self._active_until = 0.0
+        self._quiet_until = 0.0
+        self.checks = 0  # DTW passes run, for the cost report
+        self.hits = 0
+
+    # ------------------------------------------------------------------ enrolment
+    def add_template(self, word: str, audio: np.ndarray, rate: int) -> None:
+        """Enrol one recording of ``word`` (any rate; it is analysed at its own)."""
+        feats = _trim(mfcc(audio, rate), np.asarray(audio, dtype=np.float32), rate)
+        if feats.shape[0] < 3:
+            logger.warning("Keyword template for %r is too short; skipped", word)
+            return
+        self.templates.append((word, feats))
+        self._thresholds.clear()
+        self._bank = None
+        self._max_frames = max(self._max_frames, _span(feats) + _CHECK_EVERY)
+
+    def load_dir(self, root: str | Path) -> int:
+        """Enrol every ``<root>/<word>/*.wav``; returns how many templates loaded."""
+        before = len(self.templates)
+        for wav in sorted(Path(root).glob("*/*.wav")):
+            try:
+                audio, rate = load_wav(wav)
+            except (OSError, ValueError, wave.Error) as e:
+                logger.warning("Skipping keyword template %s: %s", wav, e)
+                continue
+            self.add_template(wav.parent.name.replace("_", " "), audio, rate)
+        return len(self.templates) - before
+
+    @property
+    def words(self) -> list[str]:
+        return sorted({w for w, _ in self.templates})
+
+    def threshold_for(self, word: str) -> float:
+        """Largest DTW cost that still counts as ``word``."""
+        if self.threshold is not None:
+            return self.threshold
+        if not self._thresholds:
+            self._thresholds = self._calibrate()
+        return self._thresholds.get(word, DEFAULT_THRESHOLD)
+
+    def _calibrate(self) -> dict[str, float]:
+        out: dict[str, float] = {}
+        for word in self.words:
+            own = [t for w, t in self.templates if w == word]
+            costs = [
+                float(subsequence_dtw(a, b).min())
+                for i, a in enumerate(own)
+                for j, b in enumerate(own)
+                if i != j
+            ]
+            out[word] = _SPREAD_MARGIN * float(np.mean(costs)) if costs else DEFAULT_THRESHOLD
+        return out
+
+    # ------------------------------------------------------------------ streaming
+    @property
+    def _feats(self) -> np.ndarray:
+        """The MFCC frames kept for matching, oldest first."""
+        return self._ring[max(0, self._n_feats - self._max_frames):self._n_feats]
+
+    def reset(self) -> None:
+        self._stream.reset()
+        self._n_feats = 0
+        self._since_check = 0
+
+    def _keep(self, feats: np.ndarray) -> None:
+        """Append the frames of one block to the ring, dropping what no word can reach."""
+        keep = self._max_frames
+        feats = feats[-keep:]
+        if self._ring.shape[0] < 2 * keep:  # a longer template was enrolled
+            kept = self._feats
+            ring = np.zeros((2 * keep, N_CEPS), dtype=np.float32)
+            ring[: kept.shape[0]] = kept
+            self._ring, self._n_feats = ring, kept.shape[0]
+        n = feats.shape[0]
+        if self._n_feats + n > self._ring.shape[0]:
+            old = keep - n
+            self._ring[:old] = self._ring[self._n_feats - old:self._n_feats]
+            self._n_feats = old
+        self._ring[self._n_feats:self._n_feats + n] = feats
+        self._n_feats += n
+
+    def feed(self, mono: np.ndarray, active: bool, now: float | None = None) -> str | None:
+        """Take one mic block; return the word just spoken, if one matched.
+
+        ``active`` says whether the block holds a voice (the barge-in hop test);
+        matching runs only while someone talks and shortly after, so a silent
+        room costs the MFCCs alone.
+        """
+        if not self.templates:
+            return None
+        now = time.monotonic() if now is None else now
+        feats = self._stream.push(mono)
+        n = feats.shape[0]
+        if n:
+            self._keep(feats)
+        if active:
+            self._active_until = now + _ACTIVE_HOLD_S
+        self._since_check += n
+        if now < self._quiet_until or now > self._active_until or self._since_check < _CHECK_EVERY:
+            return None
+        fresh, self._since_check = self._since_check, 0
+        return self._match(fresh, now)
+
+    def _templates_bank(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+        """All templates padded into one array, their lengths, thresholds and span."""
+        if self._bank is None:
+            n = max(t.shape[0] for _, t in self.templates)
+            bank = np.zeros((len(self.templates), n, N_CEPS), dtype=np.float32)
+            for i, (_, t) in enumerate(self.templates):
+                bank[i, : t.shape[0]] = t
+            lengths = np.array([t.shape[0] for _, t in self.templates])
+            limits = np.array([self.threshold_for(w) for w, _ in self.templates])
+            span = max(_span(t) for _, t in self.templates)
+            self._bank = (bank, lengths, limits, span)
+        return self._bank
+
+    def _match(self, fresh: int, now: float) -> str | None:
+        bank, lengths, limits, span = self._templates_bank()
+        # Only the stretch the longest word could occupy needs matching.
+        stream = self._feats[-(span + fresh):]
+        if stream.shape[0] < lengths.min() // 2:
+            return None
+        self.checks += 1
+        costs = batch_dtw(bank, lengths, stream)[:, -fresh:].min(axis=1)
+        margins = costs / limits  # <= 1.0 is a match
+        best = int(np.argmin(margins))
+        if margins[best] > 1.0:
+            return None
+        word = self.templates[best][0]
+        self.hits += 1
+        self._quiet_until = now + _REFRACTORY_S
+        self.reset()
+        logger.info("Keyword spotted on-device: %r (cost %.2f)", word, costs[best])
+        return word
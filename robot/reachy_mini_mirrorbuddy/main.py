@@ -21,6 +21,7 @@ from . import __version__
 from .audio_io import AudioIO
 from .config import config
 from .controller import Controller
+from .dsa import get_vad_profile
 from .mirrorbuddy_client import MirrorBuddyClient, neutral_buddy
 from .movements import Movements, temperament_for
 from .startup import wait_for_config
@@ -169,9 +170,24 @@ def run(
         movements=movements,
         barge_rms_threshold=config.BARGE_RMS_THRESHOLD,
         barge_sustain_frames=config.BARGE_SUSTAIN_FRAMES,
+        barge_sustain_ms=config.BARGE_SUSTAIN_MS,
         output_gain=config.OUTPUT_GAIN,
+        correct_drift=config.MIC_DRIFT_CORRECTION,
+        mic_packet_ms=config.MIC_PACKET_MS,
+        voice_gate=config.VOICE_GATE,
+        gate_preroll_ms=config.VOICE_GATE_PREROLL_MS,
+        server_silence_ms=get_vad_profile(config.DSA_PROFILE).silence_duration_ms,
+        audio_format=config.AUDIO_FORMAT,
+        keyword_dir=config.KWS_DIR,
+        keyword_threshold=config.KWS_THRESHOLD,
+        playback_lead_ms=config.PLAYBACK_LEAD_MS,
+        earcon_delay_ms=config.EARCON_MS,
     )
     _set_system_volume(config)
+    if settings_app is not None:
+        from .settings_ui import attach_audio
+
+        attach_audio(audio)  # the settings page calibrates the barge-in on this mic
 
     controller = Controller(robot, config, maestri, maestro, audio, movements)
 
@@ -8,20 +8,26 @@ cannot reach the room.
 
 The bell is synthesised here rather than shipped as an asset: a struck bell is a
 few decaying partials, and generating it keeps the app free of binary files it
-would have to license.
+would have to license. It is rendered once per length and speaker rate, already
+boosted, and played as it is: no resample, and no lip-sync — the antennas do not
+"talk" along with a bell.
 """
 
 from __future__ import annotations
 
 import logging
-import math
-import struct
 import threading
 from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from .audio_dsp import boost
 
 logger = logging.getLogger(__name__)
 
 SAMPLE_RATE = 24000
+BELL_S = 3.0
 
 # A child asked to sit in silence for ten minutes learns that meditation is a
 # punishment. A "session" of five seconds teaches nothing at all.
@@ -34,18 +40,27 @@ _FUNDAMENTAL_HZ = 432.0
 _DECAY = 2.4  # amplitude e-folding: fast enough to breathe, slow enough to ring
 
 
-def bell_pcm16(seconds: float = 3.0, sample_rate: int = SAMPLE_RATE) -> bytes:
-    """Synthesise one strike of an invitation bell as 16-bit mono PCM."""
+@lru_cache(maxsize=4)
+def bell(seconds: float = BELL_S, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """One strike of an invitation bell as float32 mono in ±0.7 (read-only, cached)."""
     n = max(1, int(seconds * sample_rate))
-    out = bytearray()
-    peak = sum(a for _, a in _PARTIALS)
-    for i in range(n):
-        t = i / sample_rate
-        env = math.exp(-_DECAY * t)
-        s = sum(a * math.sin(2 * math.pi * _FUNDAMENTAL_HZ * r * t) for r, a in _PARTIALS)
-        # Headroom of 0.7: the bell invites, it does not startle.
-        out += struct.pack("<h", int(max(-1.0, min(1.0, s / peak * env)) * 32767 * 0.7))
-    return bytes(out)
+    t = np.arange(n, dtype=np.float64) / sample_rate
+    s = np.zeros(n, dtype=np.float64)
+    for ratio, amp in _PARTIALS:
+        s += amp * np.sin(2 * np.pi * _FUNDAMENTAL_HZ * ratio * t)
+    s *= np.exp(-_DECAY * t) / sum(a for _, a in _PARTIALS)
+    # Headroom of 0.7: the bell invites, it does not startle.
+    out = (np.clip(s, -1.0, 1.0) * 0.7).astype(np.float32)
+    out.flags.writeable = False
+    return out
+
+
+@lru_cache(maxsize=4)
+def speaker_bell(seconds: float, sample_rate: int, gain: float) -> np.ndarray:
+    """The bell at the speaker rate with its make-up gain: ready to push (read-only)."""
+    out = boost(bell(seconds, sample_rate), gain)
+    out.flags.writeable = False
+    return out
 
 
 @dataclass(frozen=True)
@@ -103,12 +118,12 @@ class Session(threading.Thread):
     thread checks a single event rather than sleeping through the whole interval.
     """
 
-    def __init__(self, client, play_audio, plan: Plan, bell_seconds: float = 3.0):
+    def __init__(self, client, play_bell, plan: Plan, bell_seconds: float = BELL_S):
         super().__init__(name="MirrorBuddyMeditation", daemon=True)
         self._client = client
-        self._play = play_audio
+        self._play = play_bell  # rings a bell of the given length
         self._plan = plan
-        self._bell = bell_pcm16(bell_seconds)
+        self._bell_s = bell_seconds
         # Not `_stop`: threading.Thread already owns that name as an internal
         # method, and shadowing it makes join() raise instead of joining.
         self._cancelled = threading.Event()
@@ -155,6 +170,6 @@ class Session(threading.Thread):
         if self._cancelled.is_set():
             return
         try:
-            self._play(self._bell)
+            self._play(self._bell_s)
         except Exception as e:  # pragma: no cover - runtime audio faults
             logger.error("Bell failed to ring: %s", e)
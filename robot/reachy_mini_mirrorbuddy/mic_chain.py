@@ -0,0 +1,179 @@
+"""The microphone's per-block processing, as explicit stages over reusable buffers.
+
+Every mic block used to leave up to seven temporary arrays behind — a float64
+downmix, a clip, an int16 cast, a float32 copy for the RMS, the resample, another
+cast, the bytes — in the very thread that decides whether the child is cutting
+Buddy off. Garbage there is jitter there.
+
+:class:`MicChain` runs the same steps (downmix, dtype normalisation, RMS,
+resample, serialise) into buffers sized once from the mic rate, and times each
+stage, so the cost of the loop is a number in the journal rather than a guess —
+and a number that can be watched for growth.
+
+The RMS stage also cuts the stream into fixed 10 ms hops, carrying the tail of
+each block over to the next, and measures every hop in one vectorised step: the
+barge-in decision then runs on the same time grid whatever block size the media
+server happens to deliver.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+
+import numpy as np
+
+from .resampler import StreamingResampler
+
+STAGES = ("downmix", "normalise", "rms", "resample", "serialise")
+
+# Initial buffer capacity. The media server hands out blocks of 10-60 ms; a
+# bigger block simply grows the buffers once and they stay grown.
+_INITIAL_BLOCK_S = 0.1
+_INT16_MAX = 32767.0
+HOP_MS = 10.0  # time grid of the barge-in decision
+
+
+class StageTimer:
+    """Accumulated wall time per stage, reported as microseconds per block."""
+
+    def __init__(self, names: tuple[str, ...]) -> None:
+        self._names = names
+        self._ns = dict.fromkeys(names, 0)
+        self.blocks = 0
+
+    def add(self, name: str, ns: int) -> None:
+        self._ns[name] += ns
+
+    def snapshot(self) -> dict[str, float]:
+        """Mean microseconds per block for each stage since the last reset."""
+        n = max(1, self.blocks)
+        return {name: self._ns[name] / n / 1000.0 for name in self._names}
+
+    def reset(self) -> None:
+        self._ns = dict.fromkeys(self._names, 0)
+        self.blocks = 0
+
+    def describe(self) -> str:
+        snap = self.snapshot()
+        parts = ", ".join(f"{k} {v:.0f}" for k, v in snap.items())
+        total = sum(snap.values())
+        return f"{parts} — {total:.0f} µs/block over {self.blocks} blocks"
+
+
+class MicChain:
+    """Mic block in, barge-in RMS and realtime-rate PCM16 out.
+
+    Owned by the mic thread. :meth:`process` runs the stages the barge-in
+    decision needs; :meth:`serialise` finishes the block for the wire. The
+    mono signal of the current block stays readable through :attr:`mono`.
+    An ``encoder`` (e.g. G.711) turns the int16 block into the wire bytes as
+    part of the serialise stage.
+    """
+
+    def __init__(
+        self,
+        in_rate: int,
+        out_rate: int,
+        correct_drift: bool = False,
+        encoder: Callable[[np.ndarray], bytes] | None = None,
+        hop_ms: float = HOP_MS,
+    ) -> None:
+        self.in_rate = int(in_rate)
+        self.out_rate = int(out_rate)
+        self.encoder = encoder
+        self.hop = max(1, int(self.in_rate * hop_ms / 1000.0))
+        self.hop_ms = self.hop * 1000.0 / self.in_rate
+        self._tail = 0  # samples of an unfinished hop carried over from the last block
+        self._n_hops = 0
+        self.resampler = StreamingResampler(self.in_rate, self.out_rate, correct_drift=correct_drift)
+        self.timer = StageTimer(STAGES)
+        self._n = 0
+        self._alloc(max(1, int(self.in_rate * _INITIAL_BLOCK_S)))
+
+    def _alloc(self, capacity: int) -> None:
+        self._mono = np.zeros(capacity, dtype=np.float32)
+        tail = getattr(self, "_hop_buf", None)
+        self._hop_buf = np.zeros(capacity + self.hop, dtype=np.float32)
+        if tail is not None:
+            self._hop_buf[: self._tail] = tail[: self._tail]
+        self._hop_rms = np.zeros(capacity // self.hop + 1, dtype=np.float32)
+        out = self.resampler.output_size(capacity) + 1  # +1: a drift-stretched block
+        self._resampled = np.zeros(out, dtype=np.float32)
+        self._pcm = np.zeros(out, dtype=np.int16)
+
+    @property
+    def mono(self) -> np.ndarray:
+        """The current block, mono float32 in int16 units."""
+        return self._mono[: self._n]
+
+    @property
+    def hops(self) -> np.ndarray:
+        """RMS (0..1) of each 10 ms hop the current block completed, oldest first."""
+        return self._hop_rms[: self._n_hops]
+
+    def process(self, sample) -> float:
+        """Downmix + normalise one raw block; return its RMS in 0..1."""
+        timer = self.timer
+        t0 = time.perf_counter_ns()
+        audio = sample if isinstance(sample, np.ndarray) else np.frombuffer(sample, dtype=np.int16)
+        n = audio.shape[0] if audio.ndim else 0
+        if n > self._mono.size:
+            self._alloc(n)
+        self._n = n
+        mono = self._mono[:n]
+        # Downmix straight into the float32 buffer: no float64 mean, no copy.
+        if audio.ndim == 2:
+            np.sum(audio, axis=1, dtype=np.float32, out=mono)
+            mono *= 1.0 / audio.shape[1]
+        else:
+            np.copyto(mono, audio, casting="unsafe")
+        t1 = time.perf_counter_ns()
+        timer.add("downmix", t1 - t0)
+
+        # Normalise to int16 units: floats are full-scale ±1.0, integers already are.
+        if np.issubdtype(audio.dtype, np.floating):
+            np.clip(mono, -1.0, 1.0, out=mono)
+            mono *= _INT16_MAX
+        elif audio.dtype != np.int16:
+            np.clip(mono, -32768.0, _INT16_MAX, out=mono)
+        t2 = time.perf_counter_ns()
+        timer.add("normalise", t2 - t1)
+
+        rms = float(np.sqrt(np.dot(mono, mono) / n)) / 32768.0 if n else 0.0
+        self._measure_hops(mono)
+        timer.add("rms", time.perf_counter_ns() - t2)
+        timer.blocks += 1
+        return rms
+
+    def _measure_hops(self, mono: np.ndarray) -> None:
+        """Append the block to the carried tail and take the RMS of every whole hop."""
+        buf, hop = self._hop_buf, self.hop
+        total = self._tail + mono.size
+        buf[self._tail:total] = mono
+        k = total // hop
+        self._n_hops = k
+        if k:
+            frames = buf[: k * hop].reshape(k, hop)
+            out = self._hop_rms[:k]
+            np.einsum("ij,ij->i", frames, frames, out=out)
+            out *= 1.0 / hop
+            np.sqrt(out, out=out)
+            out *= 1.0 / 32768.0
+        self._tail = total - k * hop
+        buf[: self._tail] = buf[k * hop:total]
+
+    def serialise(self) -> bytes:
+        """Resample the current block to the wire rate and return its wire bytes."""
+        t0 = time.perf_counter_ns()
+        out = self.resampler.process(self.mono, out=self._resampled)
+        t1 = time.perf_counter_ns()
+        self.timer.add("resample", t1 - t0)
+        k = out.size
+        np.clip(out, -32768.0, _INT16_MAX, out=out)
+        pcm = self._pcm[:k]
+        np.copyto(pcm, out, casting="unsafe")
+        # The one allocation the wire genuinely needs.
+        data = self.encoder(pcm) if self.encoder is not None else pcm.tobytes()
+        self.timer.add("serialise", time.perf_counter_ns() - t1)
+        return data
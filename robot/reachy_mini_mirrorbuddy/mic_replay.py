@@ -0,0 +1,115 @@
+"""Keep what the child says while the realtime socket is down, and replay it.
+
+A reconnect (a Wi-Fi drop, or Azure's 60-minute session expiry) used to leave
+a hole: every mic packet sent while ``_ws`` was ``None`` was silently thrown
+away, and a child who asked a question in those seconds had to ask it again —
+if they noticed at all.
+
+:class:`MicReplay` holds outbound mic audio, time-stamped, from the moment a
+session ends until the next one is configured, and hands it back in one piece
+to be appended right after ``session.update``. It is bounded twice over:
+
+- by **size**: never more than ``max_s`` seconds are kept, oldest out first;
+- by **age**: audio older than ``max_age_s`` when the session comes back is
+  dropped, together with the rest of the utterance it belonged to, so Buddy
+  never answers something said long ago, or half of a sentence. No utterance
+  is taken to last longer than ``max_age_s``: with the voice gate off the mic
+  never pauses, and fresh speech would otherwise go with the stale.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+
+_MAX_S = 10.0
+_MAX_AGE_S = 6.0
+# Packets closer than this belong to the same utterance (the voice gate only
+# sends while someone talks, so a longer pause is a new one).
+_UTTERANCE_GAP_S = 0.5
+
+
+class MicReplay:
+    """Bounded, time-stamped ring of wire audio across a reconnect (thread-safe)."""
+
+    def __init__(
+        self,
+        bytes_per_second: int,
+        max_s: float = _MAX_S,
+        max_age_s: float = _MAX_AGE_S,
+    ) -> None:
+        self.bytes_per_second = int(bytes_per_second)
+        self.max_age_s = float(max_age_s)
+        self._max_bytes = int(self.bytes_per_second * max_s)
+        self._ring: deque[tuple[float, bytes]] = deque()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._holding = False
+        self._gap_started = 0.0
+        self.gaps = 0
+        self.last_gap_s = 0.0
+        self.gap_s = 0.0
+        self.replayed_s = 0.0
+        self.dropped_s = 0.0
+
+    @property
+    def holding(self) -> bool:
+        return self._holding
+
+    def hold(self, now: float | None = None) -> None:
+        """The session is gone: keep mic audio from now on instead of sending it."""
+        with self._lock:
+            if not self._holding:
+                self._holding = True
+                self._gap_started = time.monotonic() if now is None else now
+
+    def offer(self, data: bytes, now: float | None = None) -> bool:
+        """Keep ``data`` if holding; ``False`` means the caller should send it live."""
+        with self._lock:
+            if not self._holding:
+                return False
+            self._ring.append((time.monotonic() if now is None else now, data))
+            self._bytes += len(data)
+            while self._bytes > self._max_bytes:
+                _, old = self._ring.popleft()
+                self._bytes -= len(old)
+                self.dropped_s += len(old) / self.bytes_per_second
+            return True
+
+    def release(self, now: float | None = None) -> bytes:
+        """A new session is configured: stop holding and return what is still fresh."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not self._holding:
+                return b""
+            ring, self._ring, self._bytes = self._ring, deque(), 0
+            self._holding = False
+            gap = max(0.0, now - self._gap_started)
+        self.gaps += 1
+        self.last_gap_s = gap
+        self.gap_s += gap
+
+        items = list(ring)
+        stale, last, start = 0, None, 0.0
+        for t, _ in items:
+            if last is None or t - last >= _UTTERANCE_GAP_S:
+                start = t  # a new utterance
+            too_old = now - t > self.max_age_s
+            same_utterance = t != start and t - start < self.max_age_s
+            if not (too_old or same_utterance):
+                break
+            stale, last = stale + 1, t
+        out = b"".join(data for _, data in items[stale:])
+        self.dropped_s += sum(len(data) for _, data in items[:stale]) / self.bytes_per_second
+        self.replayed_s += len(out) / self.bytes_per_second
+        return out
+
+    def counters(self) -> dict[str, float]:
+        return {
+            "gaps": self.gaps,
+            "last_gap_s": self.last_gap_s,
+            "gap_s": self.gap_s,
+            "replayed_s": self.replayed_s,
+            "dropped_s": self.dropped_s,
+        }
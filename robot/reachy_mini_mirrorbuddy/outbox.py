@@ -0,0 +1,170 @@
+"""One sender for the realtime socket, in order of what cannot wait.
+
+Every outbound message used to be its own ``run_coroutine_threadsafe`` — a
+future and a task per mic packet — and they reached the socket in whatever
+order the loop got to them: a ``response.cancel`` on barge-in waited behind
+queued audio, and a homework photo of a few hundred kilobytes held up the mic
+for as long as it took to upload.
+
+:class:`Outbox` keeps three FIFO queues and a single asyncio task drains them:
+
+- **control** (cancel, truncate, response.create, tool results) always first;
+- **audio** next — and mic audio that has waited longer than ``audio_max_age_s``
+  is dropped: a turn the server hears seconds late is worse than a gap in it;
+- **image** last, one at a time and at most one per ``image_gap_s``, so the mic
+  audio captured while a photo was uploading goes out before the next one.
+
+Pacing only spaces images apart: a single send still holds the socket for its
+whole upload, and on a slow uplink the audio queued behind a big photo can age
+past ``audio_max_age_s`` and be dropped. The photos are therefore kept small
+where they are taken (:mod:`camera`, :mod:`ambient_vision`), so one upload
+stays well under that limit.
+
+Producers on any thread only append under a lock; the sender is woken only
+when it is actually idle. Depth, drops and send latency are kept per class.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+from .quantile import P2Quantile
+
+logger = logging.getLogger(__name__)
+
+CONTROL = "control"
+AUDIO = "audio"
+IMAGE = "image"
+_ORDER = (CONTROL, AUDIO, IMAGE)
+
+_AUDIO_MAX_AGE_S = 2.0
+_IMAGE_GAP_S = 0.25
+_LARGE = 16 * 1024  # an image payload, as opposed to the response.create that follows it
+
+
+class _Lane:
+    """One priority class: its queue and what it costs."""
+
+    def __init__(self) -> None:
+        self.queue: deque[tuple[float, str | bytes]] = deque()
+        self.sent = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.latency = (P2Quantile(0.5), P2Quantile(0.9))
+
+    def counters(self) -> dict[str, float]:
+        p50, p90 = self.latency
+        return {
+            "depth": len(self.queue),
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "latency_p50_ms": p50.value * 1000.0,
+            "latency_p90_ms": p90.value * 1000.0,
+        }
+
+
+class Outbox:
+    """Priority queues (control > audio > image) drained by one sender task."""
+
+    def __init__(self, audio_max_age_s: float = _AUDIO_MAX_AGE_S, image_gap_s: float = _IMAGE_GAP_S) -> None:
+        self.audio_max_age_s = float(audio_max_age_s)
+        self.image_gap_s = float(image_gap_s)
+        self._lanes = {kind: _Lane() for kind in _ORDER}
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._idle = False  # the sender is waiting: the next put must wake it
+        self._image_at = 0.0  # monotonic time the next image may go
+
+    # ------------------------------------------------------------------ producers
+    def put(self, msg: str | bytes, kind: str = CONTROL) -> None:
+        """Queue ``msg`` in its class (any thread); returns at once."""
+        lane = self._lanes[kind]
+        with self._lock:
+            lane.queue.append((time.monotonic(), msg))
+            lane.max_depth = max(lane.max_depth, len(lane.queue))
+            wake, self._idle = self._idle, False
+        if wake:
+            self._signal()
+
+    def clear(self) -> None:
+        """Forget everything queued (the socket it was meant for is gone)."""
+        with self._lock:
+            for lane in self._lanes.values():
+                lane.queue.clear()
+
+    def depth(self, kind: str) -> int:
+        return len(self._lanes[kind].queue)
+
+    def counters(self) -> dict[str, dict[str, float]]:
+        return {kind: lane.counters() for kind, lane in self._lanes.items()}
+
+    def _signal(self) -> None:
+        loop, wake = self._loop, self._wake
+        if loop is None or wake is None:
+            return
+        try:
+            loop.call_soon_threadsafe(wake.set)
+        except RuntimeError:  # the loop has closed
+            pass
+
+    # ------------------------------------------------------------------ sender
+    async def run(self, send: Callable[[str | bytes], Awaitable[None]]) -> None:
+        """Send everything queued, best class first, until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        try:
+            while True:
+                kind, queued_at, msg, wait = self._next(time.monotonic())
+                if msg is None:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wake.clear()
+                    continue
+                try:
+                    await send(msg)
+                except Exception as e:
+                    logger.debug("send failed: %s", e)
+                    continue
+                self._sent(kind, queued_at, len(msg), time.monotonic())
+        finally:
+            with self._lock:
+                self._idle = False
+            self._wake = None
+
+    def _next(self, now: float) -> tuple[str, float, str | bytes | None, float | None]:
+        """``(class, queued at, message)`` to send now.
+
+        With nothing to send, the message is ``None`` and the last item says how
+        long to wait for a paced image (``None``: until the next put).
+        """
+        with self._lock:
+            control, audio, image = (self._lanes[k] for k in _ORDER)
+            if control.queue:
+                return (CONTROL, *control.queue.popleft(), None)
+            while audio.queue and now - audio.queue[0][0] > self.audio_max_age_s:
+                audio.queue.popleft()
+                audio.dropped += 1
+            if audio.queue:
+                return (AUDIO, *audio.queue.popleft(), None)
+            if image.queue and now >= self._image_at:
+                return (IMAGE, *image.queue.popleft(), None)
+            self._idle = True
+            wait = self._image_at - now if image.queue else None
+            return IMAGE, now, None, wait
+
+    def _sent(self, kind: str, queued_at: float, size: int, now: float) -> None:
+        lane = self._lanes[kind]
+        lane.sent += 1
+        for q in lane.latency:
+            q.add(now - queued_at)
+        if kind == IMAGE and size > _LARGE:
+            self._image_at = now + self.image_gap_s  # let the mic catch up first
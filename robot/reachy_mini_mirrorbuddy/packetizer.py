@@ -0,0 +1,82 @@
+"""Re-block microphone audio into fixed-length packets for the websocket.
+
+Whatever block size the media server happens to deliver used to become its own
+``input_audio_buffer.append``: a base64 pass, a ``json.dumps`` and a hop onto the
+websocket thread per block — fifty or a hundred times a second on a CM4 that
+also has to move the head. The server does not care how the audio is cut, so we
+cut it into fewer, larger packets of a fixed duration.
+
+Barge-in is decided on the mic thread *before* audio reaches this point, so the
+packet length never delays the local cut; and the packet in progress is flushed
+the moment a turn boundary is crossed, so the server never waits on a half-full
+packet to hear the child interrupt.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+MIN_PACKET_MS = 10.0
+MAX_PACKET_MS = 200.0
+
+
+class MicPacketizer:
+    """Collect PCM bytes and hand them on in packets of ``packet_ms``.
+
+    Owned by the mic thread: :meth:`push` and :meth:`flush` must be called from
+    it. Other threads ask for a flush with :meth:`request_flush`, which is
+    honoured on the next push.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[bytes], None],
+        packet_ms: float,
+        sample_rate: int,
+        bytes_per_sample: int = 2,
+    ) -> None:
+        self.sink = sink
+        self.packet_ms = max(MIN_PACKET_MS, min(MAX_PACKET_MS, float(packet_ms)))
+        frame = bytes_per_sample
+        size = int(sample_rate * self.packet_ms / 1000.0) * frame
+        self._size = max(frame, size - size % frame)
+        self._buf = bytearray(self._size)
+        self._fill = 0
+        self._flush_requested = False
+        self.packets = 0  # packets handed to the sink since start
+        self.bytes = 0
+
+    @property
+    def pending(self) -> int:
+        """Bytes waiting for the packet in progress to fill."""
+        return self._fill
+
+    def push(self, data: bytes) -> None:
+        """Add mic audio; emits every packet it completes."""
+        view = memoryview(data)
+        while view.nbytes:
+            take = min(self._size - self._fill, view.nbytes)
+            self._buf[self._fill:self._fill + take] = view[:take]
+            self._fill += take
+            view = view[take:]
+            if self._fill == self._size:
+                self._emit()
+        if self._flush_requested:
+            self.flush()
+
+    def flush(self) -> None:
+        """Send the partial packet now (a turn boundary: don't sit on the audio)."""
+        self._flush_requested = False
+        if self._fill:
+            self._emit()
+
+    def request_flush(self) -> None:
+        """Thread-safe: flush on the mic thread's next push."""
+        self._flush_requested = True
+
+    def _emit(self) -> None:
+        packet = bytes(self._buf[: self._fill])
+        self._fill = 0
+        self.packets += 1
+        self.bytes += len(packet)
+        self.sink(packet)
@@ -0,0 +1,205 @@
+"""Feed the speaker from its own thread, never more than a short lead ahead.
+
+Model speech used to be rendered and pushed to the speaker inline, on the
+realtime client's asyncio thread: the lip-sync RMS, the resample, the make-up
+gain and ``push_audio_sample`` for every audio delta. A slow push held up event
+handling — cancels included — and since the deltas arrive faster than
+realtime, the device queue grew to seconds of audio that a barge-in then had
+to flush, while the mic loop thought Buddy had stopped talking long before.
+
+:class:`PlaybackEngine` takes the chunks into a bounded queue and returns at
+once. A worker thread renders each one and hands it to the device in short
+slices, waiting so that no more than ``lead_ms`` of audio is ever queued in
+hardware: a cut empties the engine's queue and leaves only that lead to flush,
+and :attr:`playing_until` follows what the speaker really has left to play.
+Each chunk may carry a tag (the assistant item it belongs to): :meth:`position`
+says how much of the tagged audio the speaker has actually played.
+
+Sounds made for the speaker (the earcons) skip the rendering: float32 chunks
+are pushed as they are.
+
+Until :meth:`start` (tests, tools) chunks are rendered and pushed inline.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_SLICE_MS = 20.0  # hardware pushes: small enough to pace, large enough to be cheap
+_MAX_QUEUE_S = 120.0  # a very long answer delivered in one burst still fits
+# Audio resuming this soon after the device ran dry was a hiccup, not a new sentence.
+_UNDERRUN_GAP_S = 0.5
+
+
+class PlaybackEngine:
+    """Bounded queue + paced worker between the realtime thread and the speaker."""
+
+    def __init__(
+        self,
+        render: Callable[[np.ndarray, int], np.ndarray],
+        push: Callable[[np.ndarray], None],
+        out_rate: int = 16000,
+        lead_ms: float = 150.0,
+        max_queue_s: float = _MAX_QUEUE_S,
+    ) -> None:
+        self.render = render  # (samples, source rate) -> float32 at the speaker rate
+        self.push = push
+        self.out_rate = int(out_rate)
+        self.lead_s = max(_SLICE_MS, float(lead_ms)) / 1000.0
+        self.max_queue_s = float(max_queue_s)
+        self._queue: deque[tuple[np.ndarray, int, str | None, int]] = deque()
+        self._queued_s = 0.0
+        self._cond = threading.Condition()
+        self._generation = 0  # bumped by clear(): a chunk from before is never pushed
+        self._device_until = 0.0  # monotonic time the speaker runs out of audio
+        self._tag: str | None = None  # what the device is playing
+        self._tag_pushed_s = 0.0  # seconds of it handed to the device so far
+        self._stop = False
+        self._thread: threading.Thread | None = None
+        self.underruns = 0
+        self.underrun_s = 0.0
+        self.overflow_s = 0.0
+        self.max_depth_s = 0.0
+
+    # ------------------------------------------------------------------ producer
+    def submit(self, samples: np.ndarray, rate: int, tag: str | None = None) -> None:
+        """Queue ``samples`` (at ``rate``) for playback; returns at once.
+
+        float32 samples are taken as already rendered for the speaker (at
+        ``out_rate``, gain applied) and are pushed as they are.
+        """
+        if not samples.size:
+            return
+        if self._thread is None:
+            self._play(samples, rate, tag, self._generation)
+            return
+        dur = samples.size / rate
+        with self._cond:
+            self._queue.append((samples, rate, tag, self._generation))
+            self._queued_s += dur
+            while self._queued_s > self.max_queue_s and len(self._queue) > 1:
+                old, old_rate, _, _ = self._queue.popleft()
+                self._queued_s -= old.size / old_rate
+                self.overflow_s += old.size / old_rate
+            self.max_depth_s = max(self.max_depth_s, self._queued_s)
+            self._cond.notify_all()
+
+    def clear(self) -> None:
+        """Drop everything not yet handed to the device; the caller flushes the device."""
+        with self._cond:
+            self._queue.clear()
+            self._queued_s = 0.0
+            self._generation += 1
+            self._device_until = 0.0  # the caller flushed the device: nothing left to play
+            self._tag, self._tag_pushed_s = None, 0.0
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------ state
+    @property
+    def depth_s(self) -> float:
+        """Seconds of audio waiting in the engine (not yet in hardware)."""
+        return self._queued_s
+
+    @property
+    def device_s(self) -> float:
+        """Seconds of audio the speaker still has queued."""
+        return max(0.0, self._device_until - time.monotonic())
+
+    @property
+    def playing_until(self) -> float:
+        """Monotonic time the speaker falls silent, if nothing more is pushed."""
+        return self._device_until
+
+    def position(self) -> tuple[str | None, float]:
+        """The tag on the device and how many seconds of it the speaker has played."""
+        with self._cond:
+            return self._tag, max(0.0, self._tag_pushed_s - self.device_s)
+
+    def busy(self) -> bool:
+        """True while audio is queued here or still playing on the device."""
+        return bool(self._queue) or time.monotonic() < self._device_until
+
+    def counters(self) -> dict[str, float]:
+        return {
+            "depth_s": self._queued_s,
+            "max_depth_s": self.max_depth_s,
+            "underruns": self.underruns,
+            "underrun_s": self.underrun_s,
+            "overflow_s": self.overflow_s,
+        }
+
+    # ------------------------------------------------------------------ worker
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="MirrorBuddyPlayback", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                samples, rate, tag, generation = self._queue.popleft()
+                self._queued_s = max(0.0, self._queued_s - samples.size / rate)
+            try:
+                self._play(samples, rate, tag, generation)
+            except Exception as e:  # pragma: no cover - runtime robustness
+                logger.debug("playback error: %s", e)
+
+    def _play(self, samples: np.ndarray, rate: int, tag: str | None, generation: int) -> None:
+        audio = samples if samples.dtype == np.float32 else self.render(samples, rate)
+        step = max(1, int(self.out_rate * _SLICE_MS / 1000.0))
+        paced = self._thread is not None
+        for start in range(0, audio.size, step):
+            piece = audio[start:start + step]
+            dur = piece.size / self.out_rate
+            with self._cond:
+                if paced and not self._wait_for_room(dur, generation):
+                    return
+                if generation != self._generation:
+                    return  # cut while rendering
+                now = time.monotonic()
+                if now > self._device_until:
+                    gap = now - self._device_until
+                    if self._device_until and gap < _UNDERRUN_GAP_S:
+                        self.underruns += 1
+                        self.underrun_s += gap
+                    self._device_until = now
+                self._device_until += dur
+                if tag != self._tag:
+                    self._tag, self._tag_pushed_s = tag, 0.0
+                self._tag_pushed_s += dur
+            # The device call runs unlocked: a slow push must not hold up submit(),
+            # position() or the clear() of a barge-in on the other threads.
+            if generation != self._generation:
+                return
+            self.push(piece)
+
+    def _wait_for_room(self, dur: float, generation: int) -> bool:
+        """Sleep until ``dur`` more fits under the lead (lock held); False if cut."""
+        while not self._stop and generation == self._generation:
+            ahead = self._device_until - time.monotonic()
+            if ahead + dur <= self.lead_s:
+                return True
+            self._cond.wait(ahead + dur - self.lead_s)
+        return False
@@ -0,0 +1,77 @@
+"""Streaming quantiles in constant memory (the P² algorithm).
+
+The barge-in threshold wants "how loud is this room, usually" and "how loud does
+it get, now and then" — a median and a 95th percentile of the silent-room RMS.
+Keeping the samples to sort them is out of the question on a loop that runs a
+hundred times a second for hours; an EMA is cheap but a few loud frames (a
+chair, a door) drag it up for seconds.
+
+P² (Jain & Chlamtac, 1985) keeps five markers whose heights converge on the
+minimum, the p/2, p and (1+p)/2 quantiles and the maximum, nudging them with a
+piecewise-parabolic fit as each value arrives: five floats and O(1) per update,
+and a single outlier can move the estimate by at most one marker step.
+"""
+
+from __future__ import annotations
+
+import bisect
+
+
+class P2Quantile:
+    """Running estimate of the ``p`` quantile of every value :meth:`add`-ed so far."""
+
+    def __init__(self, p: float) -> None:
+        if not 0.0 < p < 1.0:
+            raise ValueError(f"quantile must be in (0, 1), got {p}")
+        self.p = float(p)
+        self.count = 0
+        self._q: list[float] = []  # marker heights (the first five values, sorted, until then)
+        self._n = [0, 1, 2, 3, 4]  # marker positions
+        self._want = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]  # desired positions
+        self._step = [0.0, p / 2, p, (1 + p) / 2, 1.0]  # desired position increments
+
+    @property
+    def value(self) -> float:
+        """The current estimate (exact until five values are in; 0.0 before any)."""
+        if self.count >= 5:
+            return self._q[2]
+        if not self._q:
+            return 0.0
+        return self._q[round(self.p * (len(self._q) - 1))]
+
+    def add(self, x: float) -> None:
+        x = float(x)
+        self.count += 1
+        q, n = self._q, self._n
+        if self.count <= 5:
+            bisect.insort(q, x)
+            return
+
+        if x < q[0]:
+            q[0], k = x, 0
+        elif x >= q[4]:
+            q[4], k = x, 3
+        else:
+            k = bisect.bisect_right(q, x, 1, 4) - 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        want, step = self._want, self._step
+        for i in range(5):
+            want[i] += step[i]
+
+        for i in (1, 2, 3):
+            d = want[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                s = 1 if d > 0 else -1
+                h = self._parabolic(i, s)
+                if not q[i - 1] < h < q[i + 1]:
+                    h = q[i] + s * (q[i + s] - q[i]) / (n[i + s] - n[i])
+                q[i] = h
+                n[i] += s
+
+    def _parabolic(self, i: int, s: int) -> float:
+        q, n = self._q, self._n
+        return q[i] + s / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
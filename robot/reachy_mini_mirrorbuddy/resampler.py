@@ -0,0 +1,186 @@
+"""Streaming polyphase resampling for the live mic and speaker paths.
+
+:func:`audio_dsp.resample` is right for a one-off buffer and wrong for a stream:
+``resample_poly`` designs its anti-alias filter from scratch on every call and
+treats each chunk as if the world began and ended at its edges. On the robot that
+meant a filter design per mic block and per model delta, plus a faint click at
+every chunk boundary where the filter restarted from zeros.
+
+:class:`StreamingResampler` designs the filter once per rate pair (cached across
+instances), keeps the last few input samples between chunks so the output is one
+continuous signal, and can slowly slip or repeat a sample to follow a source clock
+that runs a little fast or slow.
+"""
+
+from __future__ import annotations
+
+import time
+from functools import lru_cache
+from math import gcd
+
+import numpy as np
+from scipy.signal import firwin
+
+# Same filter design resample_poly uses, so switching paths does not change the
+# sound: a Kaiser window, ten zero-crossings per side at the slower rate.
+_KAISER_BETA = 5.0
+_HALF_LEN_PER_RATE = 10
+
+# Clock drift is estimated over a long window: a Wi-Fi hiccup that delays a few
+# blocks must not read as a crystal running 5% fast.
+_DRIFT_WARMUP_S = 10.0
+_DRIFT_MAX_PPM = 1000.0
+
+
+@lru_cache(maxsize=16)
+def polyphase_taps(up: int, down: int) -> np.ndarray:
+    """Anti-alias filter for an ``up/down`` ratio, split into ``up`` phases.
+
+    Row ``p`` holds the taps used by output samples that land on phase ``p`` of
+    the upsampled grid, newest input first. Cached: the robot only ever runs a
+    couple of rate pairs, and a filter design costs far more than a chunk.
+    """
+    if up == down:
+        return np.ones((1, 1), dtype=np.float32)  # nothing to filter
+    max_rate = max(up, down)
+    half_len = _HALF_LEN_PER_RATE * max_rate
+    h = firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", _KAISER_BETA)) * up
+    per_phase = -(-h.size // up)  # ceil
+    padded = np.zeros(per_phase * up, dtype=np.float64)
+    padded[: h.size] = h
+    taps = padded.reshape(per_phase, up).T.astype(np.float32)
+    taps.setflags(write=False)
+    return taps
+
+
+class StreamingResampler:
+    """Resample a continuous stream chunk by chunk, without seams.
+
+    Not thread-safe: one instance per stream, owned by the thread that feeds it.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int, correct_drift: bool = False) -> None:
+        self.src_rate = int(src_rate)
+        self.dst_rate = int(dst_rate)
+        g = gcd(self.src_rate, self.dst_rate)
+        self.up = self.dst_rate // g
+        self.down = self.src_rate // g
+        self._taps = polyphase_taps(self.up, self.down)
+        self._per_phase = self._taps.shape[1]
+        self._history = np.zeros(self._per_phase - 1, dtype=np.float32)
+        # Position of the next output on the upsampled grid, relative to the first
+        # sample of the next chunk. Always in [0, down).
+        self._pos = 0
+        self._index_cache: dict[tuple[int, int], tuple[np.ndarray, np.ndarray]] = {}
+        # Scratch space reused across chunks, grown only when a bigger chunk arrives.
+        self._work = np.zeros(0, dtype=np.float32)
+        self._gather = np.zeros(0, dtype=np.float32)
+        self.correct_drift = correct_drift
+        self.drift_ppm = 0.0
+        self._drift_acc = 0.0
+        self._clock_start = 0.0
+        self._clock_samples = 0
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down
+
+    def output_size(self, n_in: int) -> int:
+        """Upper bound on the samples :meth:`process` returns for ``n_in`` inputs."""
+        return (n_in * self.up) // self.down + 2
+
+    def reset(self) -> None:
+        """Forget the stream (a new utterance, a new session): start from silence."""
+        self._history[:] = 0.0
+        self._pos = 0
+        self._drift_acc = 0.0
+
+    def set_drift_ppm(self, ppm: float) -> None:
+        """Tell the resampler how fast the source clock runs, in parts per million."""
+        self.drift_ppm = max(-_DRIFT_MAX_PPM, min(_DRIFT_MAX_PPM, float(ppm)))
+
+    def process(self, audio: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        """Resample one chunk; returns float32 in the same scale as the input.
+
+        ``out`` may be a preallocated float32 buffer of at least
+        :meth:`output_size` samples; the result is then a view into it.
+        """
+        n = int(audio.size)
+        if self.passthrough:
+            if out is None:
+                return np.asarray(audio, dtype=np.float32)
+            np.copyto(out[:n], audio, casting="unsafe")
+            return out[:n]
+        if self.correct_drift:
+            self._track_clock(n)
+        if n == 0:
+            return np.zeros(0, dtype=np.float32) if out is None else out[:0]
+        h = self._history.size
+        if self._work.size < h + n:
+            self._work = np.zeros(h + n, dtype=np.float32)
+        buf = self._work[: h + n]
+        buf[:h] = self._history
+        np.copyto(buf[h:], audio, casting="unsafe")
+        idx, taps = self._indices(n)
+        count = idx.shape[0]
+        result = out[:count] if out is not None else np.empty(count, dtype=np.float32)
+        if count:
+            if self._gather.size < idx.size:
+                self._gather = np.zeros(idx.size, dtype=np.float32)
+            gathered = self._gather[: idx.size].reshape(idx.shape)
+            np.take(buf, idx, out=gathered)
+            np.einsum("ij,ij->i", gathered, taps, out=result)
+        self._pos = self._pos + count * self.down - n * self.up
+        self._history[:] = buf[n:]
+        if self.drift_ppm:
+            result = self._apply_drift(result, out)
+        return result
+
+    def _indices(self, n: int) -> tuple[np.ndarray, np.ndarray]:
+        """Gather indices + per-output taps for a chunk of ``n`` at the current position.
+
+        Chunks from a device have a fixed size and the position cycles through at
+        most ``down`` values, so in steady state this is a dictionary lookup.
+        """
+        key = (self._pos, n)
+        cached = self._index_cache.get(key)
+        if cached is not None:
+            return cached
+        last = n * self.up - 1
+        count = 0 if last < self._pos else (last - self._pos) // self.down + 1
+        pos = self._pos + np.arange(count, dtype=np.int64) * self.down
+        base = (self._per_phase - 1) + pos // self.up
+        idx = base[:, None] - np.arange(self._per_phase, dtype=np.int64)[None, :]
+        taps = np.ascontiguousarray(self._taps[pos % self.up])
+        if len(self._index_cache) > 64:
+            self._index_cache.clear()  # a stream with wildly varying chunk sizes
+        self._index_cache[key] = (idx, taps)
+        return idx, taps
+
+    def _apply_drift(self, result: np.ndarray, out: np.ndarray | None) -> np.ndarray:
+        """Drop or repeat one output sample whenever the drift adds up to one."""
+        self._drift_acc += result.size * self.drift_ppm * 1e-6
+        if self._drift_acc >= 1.0 and result.size > 1:
+            self._drift_acc -= 1.0
+            return result[:-1]  # source runs fast: one sample too many
+        if self._drift_acc <= -1.0 and result.size:
+            self._drift_acc += 1.0
+            if out is not None and out.size > result.size:
+                out[result.size] = result[-1]
+                return out[: result.size + 1]
+            return np.append(result, result[-1])  # source runs slow: stretch by one
+        return result
+
+    def _track_clock(self, n: int) -> None:
+        """Estimate the source clock against the host clock, once warmed up."""
+        now = time.monotonic()
+        if not self._clock_start:
+            self._clock_start = now
+            self._clock_samples = 0
+            return
+        self._clock_samples += n
+        elapsed = now - self._clock_start
+        if elapsed < _DRIFT_WARMUP_S:
+            return
+        measured = self._clock_samples / elapsed
+        self.set_drift_ppm((measured / self.src_rate - 1.0) * 1e6)
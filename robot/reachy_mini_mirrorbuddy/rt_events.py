@@ -8,7 +8,7 @@ model means for a child in the room, which is where all the judgement calls live
 
 from __future__ import annotations
 
-import base64
+import binascii
 import json
 import logging
 import time
@@ -31,6 +31,37 @@ _FAST_PATH_MIN_SPEECH_S = 1.8
 # coffee break and not an adult with an SSH session.
 _REST_MAX_S = 600.0
 
+# How long a wake word spotted on-device waits for the transcript to confirm it.
+# Past this the robot simply stays awake, as if the face watcher had woken it.
+_LOCAL_WAKE_CONFIRM_S = 5.0
+
+
+# Audio deltas are most of the inbound frames, and most of each one is base64.
+# They are recognised by how the service starts them, and their two fields of
+# interest cut out of the text; anything unexpected takes the generic path.
+_AUDIO_DELTA_PREFIXES = ('{"type":"response.output_audio.delta"', '{"type":"response.audio.delta"')
+_DELTA_KEY = '"delta":"'
+_ITEM_KEY = '"item_id":"'
+
+
+def audio_delta(raw: str | bytes) -> tuple[str, str | None] | None:
+    """``(base64 audio, item id)`` of an audio-delta frame without parsing it; None otherwise."""
+    if not isinstance(raw, str) or not raw.startswith(_AUDIO_DELTA_PREFIXES):
+        return None
+    start = raw.find(_DELTA_KEY)
+    if start < 0:
+        return None
+    start += len(_DELTA_KEY)
+    end = raw.find('"', start)
+    if end < 0:
+        return None
+    item_id = None
+    at = raw.find(_ITEM_KEY)
+    if at >= 0:
+        at += len(_ITEM_KEY)
+        item_id = raw[at:raw.find('"', at)] or None
+    return raw[start:end], item_id
+
 
 def _safe_cb(cb: Callable, *args) -> None:
     try:
@@ -44,41 +75,61 @@ class RealtimeEventsMixin:
 
     async def _handle_event(self, event: dict) -> None:
         etype = event.get("type", "")
+        self._last_event_at = time.monotonic()  # a rollover waits for the session to go quiet
 
+        if etype == "session.updated" and self._update_sent_at:
+            self._connector.configured(self._ws, time.monotonic() - self._update_sent_at)
+            self._update_sent_at = 0.0
         if etype in ("session.created", "session.updated"):
+            if etype == "session.updated" and self._greet_on_update:
+                self._greet_on_update = False  # a persona switched in place
+                self._updated.set()
+                await self._greet()
+                return
             if not self._ready.is_set():
                 self._ready.set()
                 if self.on_ready:
                     _safe_cb(self.on_ready)
-                await self._greet()
+                if not self._standby:  # a parked session greets when it is taken
+                    await self._greet()
             return
 
         if etype in ("response.output_audio.delta", "response.audio.delta"):
-            if self._suppress:
-                return  # dropped: user barged in, this response is being cancelled
             b64 = event.get("delta") or event.get("audio")
-            if b64 and self.on_output_audio:
-                _safe_cb(self.on_output_audio, base64.b64decode(b64))
+            if b64:
+                self._on_audio_delta(b64, event.get("item_id"))
+            return
+
+        if etype in ("response.output_audio.done", "response.audio.done"):
+            # Every byte of this item has arrived: once it has also all been played,
+            # a later cut has nothing of it to take back.
+            self._audio_done_item = event.get("item_id") or self._audio_item
             return
 
         if etype == "response.created":
             if self._quiet or self._asleep:
                 await self._cancel_response()
                 self._suppress = True
+                self._record_next = None
                 return
+            # A fixed line asked of the model: keep what it says for next time.
+            self._recording = self._fixed_line(event.get("response") or {})
+            self._recorded, self._recorded_text = [], ""
             if self._pending_farewell:  # the goodbye is now starting → sleep once it's done
                 self._pending_farewell = False
                 self._sleep_after = True
             self._responding = True
             self._suppress = False
+            self._response_audio = False
             return
         if etype == "response.done":
             self._responding = False
-            if self._sleep_after:  # farewell just finished → go to sleep
-                self._sleep_after = False
-                self._asleep = True
-                if self.on_sleep:
-                    _safe_cb(self.on_sleep)
+            if not self._response_audio and self.on_awaiting_reply:
+                # Tool calls only, or a failure: this response brought no answer to wait for.
+                _safe_cb(self.on_awaiting_reply, False)
+            self._context.usage((event.get("response") or {}).get("usage"))
+            self._keep_recording((event.get("response") or {}).get("status"))
+            self._finish_farewell()
             return
 
         # "Zitto" cannot wait for the full transcription pass. A child who asks for
@@ -93,12 +144,36 @@ class RealtimeEventsMixin:
                 await self._apply_stop(rest=rt_messages.is_rest(self._partial_user))
             return
 
+        if etype.endswith("input_audio_transcription.failed"):
+            self._in_turn = False  # no transcript is coming for this turn
+            logger.warning("Transcription failed: %s", json.dumps(event.get("error") or {}))
+            if self.on_awaiting_reply and not self._fast_requested:
+                _safe_cb(self.on_awaiting_reply, False)  # nothing will ask for an answer
+            return
+
         # Student's speech transcribed: honour stop / end / wake intents deterministically.
         if etype.endswith("input_audio_transcription.completed"):
+            self._in_turn = False
             text = (event.get("transcript") or "").strip()
             if not text:
+                if self.on_awaiting_reply:  # a cough, a chair: no answer is coming
+                    _safe_cb(self.on_awaiting_reply, False)
+                return
+            if self.on_user_transcript:
+                _safe_cb(self.on_user_transcript, text)
+            # A wake word already acted on by the mic thread is judged as if the robot
+            # were still resting: the transcript confirms it, or puts the robot back.
+            woke_locally = self._local_wake_pending()
+            self._woke_locally_at = 0.0
+            asleep = self._asleep or woke_locally
+            action = session_flow.decide(text, asleep, self._rest_expired())
+            if woke_locally and action == session_flow.IGNORE:
+                logger.info("On-device wake not confirmed by %r; resting again", text)
+                self._asleep = True
+                self._asleep_since = self._woke_from
+                if self.on_sleep:
+                    _safe_cb(self.on_sleep)
                 return
-            action = session_flow.decide(text, self._asleep, self._rest_expired())
             if self._meditating and action != session_flow.SPEAK:
                 # Any request to stop, rest or leave ends the practice at once.
                 # Sitting in an imposed silence you have asked to leave is the
@@ -111,7 +186,7 @@ class RealtimeEventsMixin:
                 if running is not None:
                     running.cancel()
                 self.end_meditation()
-            if self._asleep:
+            if asleep:
                 # The single most useful line in the journal: it says what the robot
                 # actually heard while it was silent, and what it made of it.
                 logger.info("Resting — heard %r → %s", text, action)
@@ -132,16 +207,16 @@ class RealtimeEventsMixin:
                 return
             if action == session_flow.WAKE:
                 self._asleep = self._quiet = False
-                if self.on_wake:
+                if self.on_wake and not woke_locally:  # the body already woke up
                     _safe_cb(self.on_wake)
-                await self._request_response(rt_messages.WAKE_INSTR)
+                await self._speak_fixed(rt_messages.WAKE_INSTR)
                 return
             if action == session_flow.END:
                 self._pending_farewell = True
                 self._suppress = self._quiet = False
                 if self._responding or self._fast_requested:
                     await self._cancel_response()
-                await self._request_response(rt_messages.FAREWELL_INSTR)
+                await self._speak_fixed(rt_messages.FAREWELL_INSTR)
                 return
             if action in (session_flow.REST, session_flow.PAUSE):
                 logger.info("%s requested by %r", action.upper(), text)
@@ -165,6 +240,7 @@ class RealtimeEventsMixin:
             # revived by restarting the app.
             self._partial_user = ""
             self._stopped_on_partial = False
+            self._in_turn = True  # until its transcript: a wake word counts too
             if self._asleep:
                 return  # ignore ambient speech while asleep; wake word handles it
             self._suppress = True
@@ -185,8 +261,10 @@ class RealtimeEventsMixin:
             # We only need the transcript to catch "zitto"/"basta"/"buddy", and those
             # are always brief. So a clearly long utterance can't be one: ask for the
             # answer straight away. Anything short keeps the safe, slower path.
-            if self._asleep or self._quiet:
-                return
+            if self._asleep or self._quiet or self._local_wake_pending():
+                return  # an unconfirmed wake is answered by the wake greeting, not here
+            if self.on_awaiting_reply:
+                _safe_cb(self.on_awaiting_reply, True)  # dead air starts now
             spoken = time.monotonic() - self._speech_started_at
             if self._speech_started_at and spoken >= _FAST_PATH_MIN_SPEECH_S:
                 self._fast_requested = True
@@ -204,18 +282,33 @@ class RealtimeEventsMixin:
 
         if etype in ("response.output_audio_transcript.done", "response.audio_transcript.done"):
             text = event.get("transcript") or ""
+            if self._recording is not None:
+                self._recorded_text = text
             if text and self.on_transcript:
                 _safe_cb(self.on_transcript, text, True)
             return
 
         if etype == "response.output_item.added":
             item = event.get("item") or {}
+            if item.get("type") == "message" and item.get("id"):
+                self._audio_item = item["id"]  # the reply the next audio deltas belong to
+                return
             if item.get("type") == "function_call":
                 cid = item.get("call_id") or item.get("id") or ""
                 if cid:
                     self._fc_names[cid] = item.get("name") or ""
             return
 
+        if etype in ("conversation.item.created", "conversation.item.added"):
+            self._context.add(event.get("item") or {})
+            for item_id in self._context.prune():
+                self._enqueue(json.dumps(rt_messages.item_delete(item_id)))
+            return
+
+        if etype == "conversation.item.deleted":
+            self._context.removed(event.get("item_id") or "")
+            return
+
         if etype == "response.function_call_arguments.done":
             call_id = event.get("call_id") or ""
             name, args = tools.parse_call_arguments(event, self._fc_names.get(call_id, ""))
@@ -240,6 +333,7 @@ class RealtimeEventsMixin:
                 # Believe it and wait for its response.done, rather than firing
                 # requests it will keep rejecting while the child hears nothing.
                 self._responding = True
+                self._record_next = None  # the fixed line asked for will never start
                 logger.info("Server still has a response in flight; waiting for it")
                 return
             logger.error("Azure Realtime error event: %s", json.dumps(err))
@@ -247,6 +341,135 @@ class RealtimeEventsMixin:
 
         logger.debug("Unhandled event: %s", etype)
 
+    def _on_audio_delta(self, b64: str, item_id: str | None) -> None:
+        """Play one chunk of the model's speech (both parse paths end here)."""
+        if self._suppress:
+            return  # dropped: user barged in, this response is being cancelled
+        self._response_audio = True
+        try:
+            audio = binascii.a2b_base64(b64)
+        except (binascii.Error, ValueError) as e:
+            logger.debug("bad audio delta: %s", e)
+            return
+        if self._recording is not None:
+            self._recorded.append(audio)
+        if self.on_output_audio:
+            _safe_cb(self.on_output_audio, audio, item_id or self._audio_item)
+
+    def local_keyword(self, action: str) -> None:
+        """A stop or wake word spotted on the robot itself (mic thread; thread-safe).
+
+        Handed to the client loop, like every other cross-thread call: the
+        session flags and the ``on_wake`` / ``on_speech_started`` callbacks are
+        the event handler's, and the mic thread must not wait on the robot.
+        """
+        loop = self._loop
+        if loop is None:
+            self._local_keyword(action)  # no session running: nothing to race with
+            return
+        try:
+            loop.call_soon_threadsafe(self._local_keyword, action)
+        except RuntimeError:  # the loop has closed
+            pass
+
+    def _local_keyword(self, action: str) -> None:
+        """Act on a spotted word (client loop).
+
+        Acts at once, with the mildest reading of the word, and leaves the rest to
+        the transcript that follows: a stop only hushes (the transcript decides
+        whether it was a deliberate rest), a wake only lifts the rest silently (the
+        transcript brings the greeting, or puts the robot back to rest if it was
+        not its name after all).
+        """
+        if action in (session_flow.REST, session_flow.PAUSE):
+            if self._asleep or self._meditating:
+                return
+            logger.info("Stop word heard on-device; hushing before the transcript")
+            self._quiet = True
+            self._suppress = True
+            self._fast_requested = False
+            if self._responding:
+                self._responding = False
+                self._enqueue(rt_messages.CANCEL)
+            if self.on_speech_started:
+                _safe_cb(self.on_speech_started)  # flush local playback now
+        elif action == session_flow.WAKE:
+            if not self._asleep:
+                return
+            logger.info("Wake word heard on-device; listening again before the transcript")
+            self._woke_from = self._asleep_since
+            self._woke_locally_at = time.monotonic()
+            self._asleep = False
+            self._quiet = False
+            if self.on_wake:
+                _safe_cb(self.on_wake)
+
+    def truncate_heard(self, item_id: str, audio_end_ms: int, unplayed: bool) -> None:
+        """Playback of ``item_id`` was cut after ``audio_end_ms``: forget the rest (thread-safe).
+
+        The server still holds the whole reply, including what the child never
+        heard: it grows the context on every interrupted turn, and the model goes
+        on to refer to things it never actually said. Truncating drops the unheard
+        audio and its transcript. An item that had fully arrived and fully played
+        is left alone — truncating it would only throw away its transcript.
+
+        A cached line is a text item, which the server cannot truncate: it is
+        deleted and added again with only the share of its text that was heard.
+        """
+        if item_id.startswith(rt_messages.CACHED_ITEM):
+            cached = self._cached_line
+            if unplayed and cached is not None and item_id == cached[0]:
+                self._trim_cached_line(audio_end_ms)
+            return
+        if self._audio_item is None:
+            return  # a new session: the item belonged to the one before
+        if not unplayed and item_id == self._audio_done_item:
+            return
+        logger.info("Truncating %s at %d ms: the rest was never heard", item_id, audio_end_ms)
+        self._enqueue(json.dumps(rt_messages.item_truncate(item_id, audio_end_ms)))
+
+    def _trim_cached_line(self, audio_end_ms: int) -> None:
+        """Replace the cut cached line with the words played before the cut."""
+        item_id, text, total_ms = self._cached_line
+        self._cached_line = None
+        words = text.split()
+        heard = " ".join(words[: int(len(words) * min(1.0, audio_end_ms / max(total_ms, 1.0)))])
+        logger.info("Cached line %s cut at %d ms: keeping %r", item_id, audio_end_ms, heard)
+        self._enqueue(json.dumps(rt_messages.item_delete(item_id)))
+        if heard:
+            self._enqueue(json.dumps(rt_messages.assistant_message(heard, self.use_ga, f"{item_id}_heard")))
+
+    def _fixed_line(self, response: dict) -> str | None:
+        """The fixed line ``response`` was asked for, by its metadata tag; None for any other."""
+        pending = self._record_next
+        tag = (response.get("metadata") or {}).get(rt_messages.FIXED_LINE)
+        if pending is None or tag != pending[0]:
+            return None
+        self._record_next = None
+        return pending[1]
+
+    def _keep_recording(self, status: str | None) -> None:
+        """A recorded fixed line ended: cache it, unless it was cut or went wrong."""
+        key, self._recording = self._recording, None
+        if key is None or self._suppress or status not in (None, "completed"):
+            return
+        if self._speech_cache.put(self.voice, key, self._recorded, self._recorded_text):
+            logger.info("Cached the spoken line %r for voice %s", self._recorded_text, self.voice)
+        self._recorded, self._recorded_text = [], ""
+
+    def _finish_farewell(self) -> None:
+        """The goodbye has been said: go to sleep (no-op unless one was pending)."""
+        if not self._sleep_after:
+            return
+        self._sleep_after = False
+        self._asleep = True
+        if self.on_sleep:
+            _safe_cb(self.on_sleep)
+
+    def _local_wake_pending(self) -> bool:
+        at = self._woke_locally_at
+        return bool(at) and time.monotonic() - at < _LOCAL_WAKE_CONFIRM_S
+
     def _rest_expired(self) -> bool:
         """True when the robot has been resting longer than the silence was worth.
 
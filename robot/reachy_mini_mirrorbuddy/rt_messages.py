@@ -7,13 +7,33 @@ The event schema differs between the Realtime GA and Preview protocols, so
 
 from __future__ import annotations
 
+import binascii
 import json
 import re
 
 SAMPLE_RATE = 24000  # PCM sample rate (in and out)
+G711_RATE = 8000  # μ-law / A-law are fixed at telephone rate
+
+# Audio formats the session can negotiate, by config name: (GA type, Preview name).
+# G.711 trades fidelity for a sixth of the bandwidth — worth it on a weak Wi-Fi.
+AUDIO_FORMATS = {
+    "pcm16": ("audio/pcm", "pcm16"),
+    "pcmu": ("audio/pcmu", "g711_ulaw"),
+    "pcma": ("audio/pcma", "g711_alaw"),
+}
+
+
+def wire_rate(audio_format: str) -> int:
+    """Sample rate of the audio on the wire for a negotiated format."""
+    return SAMPLE_RATE if audio_format == "pcm16" else G711_RATE
+
+
+def bytes_per_sample(audio_format: str) -> int:
+    return 2 if audio_format == "pcm16" else 1
 
 # Pre-serialised cancel of the model's current response (used on barge-in / stop).
 CANCEL = json.dumps({"type": "response.cancel"})
+RESPONSE_CREATE = json.dumps({"type": "response.create"})
 
 # Hush intents come in two tiers, because the cost of getting them wrong differs.
 #
@@ -118,10 +138,23 @@ WAKE_INSTR = (
 )
 
 
-def response_create(instructions: str | None = None) -> dict:
+# ``response.metadata`` key naming the fixed line a response was asked for. The
+# server echoes the metadata in ``response.created``, so the response that says
+# the line is known for certain, even if the request itself was rejected.
+FIXED_LINE = "fixed_line"
+# Item ids of the fixed lines played from the speech cache (text items, no audio).
+CACHED_ITEM = "mb_cached_"
+
+
+def response_create(instructions: str | None = None, metadata: dict[str, str] | None = None) -> dict:
     """Build a ``response.create`` (optionally steering what the model should say)."""
+    response: dict = {}
     if instructions:
-        return {"type": "response.create", "response": {"instructions": instructions}}
+        response["instructions"] = instructions
+    if metadata:
+        response["metadata"] = metadata
+    if response:
+        return {"type": "response.create", "response": response}
     return {"type": "response.create"}
 
 
@@ -131,22 +164,27 @@ def session_update(
     turn_detection: dict,
     tools: list[dict] | None,
     use_ga: bool,
+    audio_format: str = "pcm16",
 ) -> dict:
     """Build the ``session.update`` message for the active protocol."""
+    ga_type, preview_name = AUDIO_FORMATS[audio_format]
     if use_ga:
+        fmt: dict = {"type": ga_type}
+        if audio_format == "pcm16":
+            fmt["rate"] = SAMPLE_RATE
         session: dict = {
             "type": "realtime",
             "instructions": instructions,
             "output_modalities": ["audio"],
             "audio": {
                 "input": {
-                    "format": {"type": "audio/pcm", "rate": SAMPLE_RATE},
+                    "format": fmt,
                     "turn_detection": turn_detection,
                     "transcription": {"model": "whisper-1"},
                     "noise_reduction": {"type": "near_field"},
                 },
                 "output": {
-                    "format": {"type": "audio/pcm", "rate": SAMPLE_RATE},
+                    "format": dict(fmt),
                     "voice": voice,
                 },
             },
@@ -156,8 +194,8 @@ def session_update(
             "modalities": ["audio", "text"],
             "instructions": instructions,
             "voice": voice,
-            "input_audio_format": "pcm16",
-            "output_audio_format": "pcm16",
+            "input_audio_format": preview_name,
+            "output_audio_format": preview_name,
             "input_audio_transcription": {"model": "whisper-1"},
             "turn_detection": turn_detection,
         }
@@ -167,10 +205,87 @@ def session_update(
     return {"type": "session.update", "session": session}
 
 
+def persona_update(instructions: str, tools: list[dict] | None, use_ga: bool) -> dict:
+    """A ``session.update`` that changes only who the model is, on a live session.
+
+    The voice is left out: once the model has spoken the service refuses to
+    change it, and a new voice means a new session anyway.
+    """
+    session: dict = {"type": "realtime"} if use_ga else {}
+    session["instructions"] = instructions
+    if tools:
+        session["tools"] = tools
+        session["tool_choice"] = "auto"
+    return {"type": "session.update", "session": session}
+
+
 def audio_append(b64: str) -> dict:
     return {"type": "input_audio_buffer.append", "audio": b64}
 
 
+# The two payloads that carry bulk data — every mic packet, every camera frame —
+# are assembled from pre-serialised pieces: the base64 of the raw bytes is
+# joined between them in one copy, with no intermediate str, dict or json.dumps.
+# The result is UTF-8 JSON as bytes, sent as a text frame (see azure_realtime).
+_APPEND_HEAD = b'{"type":"input_audio_buffer.append","audio":"'
+_APPEND_TAIL = b'"}'
+_IMAGE_HEAD = b'{"type":"conversation.item.create","item":{"type":"message","role":"user","content":[{"type":"input_text","text":'
+_IMAGE_URL = b'},{"type":"input_image","image_url":"data:image/jpeg;base64,'
+_IMAGE_TAIL = b'"}]}}'
+
+
+def audio_append_json(audio: bytes) -> bytes:
+    """Serialised :func:`audio_append` of raw wire audio."""
+    return b"".join((_APPEND_HEAD, binascii.b2a_base64(audio, newline=False), _APPEND_TAIL))
+
+
+def image_message_json(jpeg: bytes, prompt: str) -> bytes:
+    """Serialised :func:`image_message` of a JPEG, without building its data URL."""
+    return b"".join((
+        _IMAGE_HEAD,
+        json.dumps(prompt).encode("utf-8"),
+        _IMAGE_URL,
+        binascii.b2a_base64(jpeg, newline=False),
+        _IMAGE_TAIL,
+    ))
+
+
+def item_truncate(item_id: str, audio_end_ms: int) -> dict:
+    """Cut an assistant item's audio (and its transcript) to what was actually played."""
+    return {
+        "type": "conversation.item.truncate",
+        "item_id": item_id,
+        "content_index": 0,
+        "audio_end_ms": max(0, int(audio_end_ms)),
+    }
+
+
+def item_delete(item_id: str) -> dict:
+    """Remove an item from the conversation: the model no longer reads it on any turn."""
+    return {"type": "conversation.item.delete", "item_id": item_id}
+
+
+def assistant_message(text: str, use_ga: bool, item_id: str | None = None) -> dict:
+    """A line Buddy said without the model (played from the speech cache).
+
+    ``item_id`` names the item, so a barge-in can delete it: a text item cannot
+    be truncated.
+    """
+    kind = "output_text" if use_ga else "text"
+    item: dict = {"type": "message", "role": "assistant", "content": [{"type": kind, "text": text}]}
+    if item_id:
+        item["id"] = item_id
+    return {"type": "conversation.item.create", "item": item}
+
+
+def system_message(text: str) -> dict:
+    """Context for the model that nobody said in this conversation (see digest)."""
+    return {
+        "type": "conversation.item.create",
+        "item": {"type": "message", "role": "system", "content": [{"type": "input_text", "text": text}]},
+    }
+
+
 def function_call_output(call_id: str, output: str) -> dict:
     return {
         "type": "conversation.item.create",
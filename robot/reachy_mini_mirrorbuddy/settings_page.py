@@ -59,6 +59,8 @@ PAGE = """<!doctype html>
  <option value="0.045">Media (consigliata)</option>
  <option value="0.060">Bassa — serve una voce più decisa (ambienti rumorosi)</option>
 </select>
+<button onclick="calibrate()">🎙️ Calibra sulla voce del bambino</button>
+<div id="calState" class="status warn" style="display:none"></div>
 <label>Volume dell'altoparlante</label>
 <select id="MIRRORBUDDY_VOLUME">
  <option value="70">Basso</option>
@@ -103,6 +105,12 @@ async function load(){
   const sel=document.getElementById('MIRRORBUDDY_BARGE_RMS');
   let best=sel.options[0].value,bd=1e9;
   for(const o of sel.options){const d=Math.abs(parseFloat(o.value)-s.bargeRms);if(d<bd){bd=d;best=o.value;}}
+  if(bd>0.0005){
+   // A calibrated value matches no preset: offer it as is, or saving would overwrite it.
+   let o=document.getElementById('bargeCalibrated');
+   if(!o){o=document.createElement('option');o.id='bargeCalibrated';sel.appendChild(o);}
+   o.value=s.bargeRms.toFixed(3);o.textContent='Calibrata sulla voce del bambino ('+o.value+')';best=o.value;
+  }
   sel.value=best;
  }
  try{
@@ -119,6 +127,19 @@ async function save(){
  load();
  alert(r.ok?'Salvato!':'Errore: '+(r.error||'?'));
 }
+async function calibrate(){
+ const box=document.getElementById('calState');
+ const r=await (await fetch('./api/calibrate',{method:'POST'})).json();
+ box.style.display='block';
+ if(!r.ok){box.className='status warn';box.textContent=(r.busy?'':'Errore: ')+(r.error||'?');return;}
+ const poll=async()=>{
+  const c=await (await fetch('./api/calibrate')).json();
+  box.className='status '+(c.phase==='done'?'ok':'warn');
+  box.textContent=c.message+(c.phase==='room'||c.phase==='voice'?' ('+Math.max(0,Math.ceil(c.duration-c.elapsed))+'s)':'');
+  if(c.phase==='room'||c.phase==='voice'){setTimeout(poll,500);}else if(c.phase==='done'){load();}
+ };
+ poll();
+}
 async function pair(){
  const code=document.getElementById('pairCode').value.trim();
  if(!code){alert('Inserisci il codice');return;}
@@ -3,7 +3,8 @@
 Mounted on the Reachy Mini app's built-in settings web server. It lets you:
 - see whether the required configuration is present,
 - pick which Maestro to embody, the DSA profile and the student name,
-- enter the Azure Realtime credentials (written to the instance ``.env``).
+- enter the Azure Realtime credentials (written to the instance ``.env``),
+- calibrate the barge-in sensitivity on the child's own voice.
 
 The page is deliberately tiny and dependency-free (inline HTML + fetch).
 """
@@ -49,6 +50,15 @@ _EDITABLE_KEYS = (
     "MIRRORBUDDY_OUTPUT_GAIN",
 )
 
+# The running app's AudioIO, once the pipeline is up: calibration needs its mic.
+_audio = None
+
+
+def attach_audio(audio) -> None:
+    """Let the settings page reach the live microphone (called by ``main.run``)."""
+    global _audio
+    _audio = audio
+
 
 def mount_settings_routes(app, instance_path: str | None) -> None:
     """Attach the settings routes to the app's FastAPI ``settings_app``."""
@@ -115,6 +125,40 @@ def mount_settings_routes(app, instance_path: str | None) -> None:
         config.reload()
         return JSONResponse({"ok": True, "ready": not config.missing(), "missing": config.missing()})
 
+    @app.post("/api/calibrate")
+    async def calibrate() -> JSONResponse:
+        """Measure the room and the child's voice, then store the barge-in ceiling.
+
+        Refused, with the reason, while Buddy talks or a turn is in flight.
+        """
+        audio = _audio
+        if audio is None:
+            return JSONResponse({"ok": False, "error": "il robot non è ancora in ascolto"}, status_code=409)
+        busy = audio.calibration_blocker()
+        if busy is not None:
+            return JSONResponse({"ok": False, "busy": True, "error": busy}, status_code=409)
+
+        def store(cal) -> None:
+            if cal.setting is None:
+                return
+            try:
+                _write_env(env_path, {"MIRRORBUDDY_BARGE_RMS": f"{cal.setting:.3f}"})
+            except Exception as e:
+                logger.error("failed to store the calibrated threshold: %s", e)
+                return
+            config.env_path = str(env_path)
+            config.reload()
+
+        cal = audio.start_calibration(on_done=store)
+        return JSONResponse({"ok": True, **cal.status()})
+
+    @app.get("/api/calibrate")
+    async def calibration_status() -> JSONResponse:
+        cal = _audio.calibration if _audio is not None else None
+        if cal is None:
+            return JSONResponse({"phase": "idle"})
+        return JSONResponse(cal.status())
+
     @app.post("/api/pair")
     async def pair(request: Request) -> JSONResponse:
         """Redeem a pairing code from the parent's MirrorBuddy settings for a device token."""
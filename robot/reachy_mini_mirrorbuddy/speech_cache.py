@@ -0,0 +1,89 @@
+"""Say the fixed lines again without asking the model to speak them again.
+
+The greeting is spoken at every session start, every reconnect and every
+Maestro switch; the wake and farewell lines follow fixed instructions. Each time
+that was a full model round-trip — ``response.create``, the model thinking, the
+first audio delta — before the child heard a word, for a sentence Buddy had
+already said in the same voice.
+
+:class:`SpeechCache` keeps the output audio of those responses, as the deltas
+that arrived, together with the transcript of what was said, keyed by
+``(voice, instructions)``. Later the client plays them locally at once and adds
+the transcript to the conversation as an assistant message, so the model still
+knows it was said. The cache is bounded in bytes, least recently used out.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+_MAX_BYTES = 4 * 1024 * 1024  # ~90 s of PCM16 at 24 kHz: every greeting of every Maestro
+
+
+@dataclass(frozen=True)
+class CachedSpeech:
+    chunks: tuple[bytes, ...]  # wire audio, as the deltas arrived
+    transcript: str
+
+    @property
+    def size(self) -> int:
+        return sum(len(c) for c in self.chunks)
+
+
+class SpeechCache:
+    """LRU of spoken fixed lines, bounded in bytes (thread-safe: shared across clients)."""
+
+    def __init__(self, max_bytes: int = _MAX_BYTES) -> None:
+        self.max_bytes = int(max_bytes)
+        self._items: OrderedDict[tuple[str, str], CachedSpeech] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def get(self, voice: str, text: str) -> CachedSpeech | None:
+        with self._lock:
+            speech = self._items.get((voice, text))
+            if speech is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end((voice, text))
+            self.hits += 1
+            return speech
+
+    def put(self, voice: str, text: str, chunks: list[bytes], transcript: str) -> bool:
+        """Keep a line; ``False`` if there is nothing to keep or it could never fit."""
+        speech = CachedSpeech(tuple(c for c in chunks if c), transcript.strip())
+        if not speech.chunks or not speech.transcript or speech.size > self.max_bytes:
+            return False
+        key = (voice, text)
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._items[key] = speech
+            self._bytes += speech.size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+        return True
+
+    def counters(self) -> dict[str, float]:
+        return {
+            "entries": len(self._items),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
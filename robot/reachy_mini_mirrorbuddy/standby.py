@@ -0,0 +1,126 @@
+"""A realtime session opened ahead of time, for the Maestro the child will want next.
+
+Switching professor used to mean building a client, a TLS handshake, the
+``session.update`` and the wait for ``session.updated`` — seconds of silence
+after "chiamo il professore", every time, while the child waited for a voice.
+
+:class:`Standby` keeps a few sessions connected and configured in the
+background, parked: they do not greet and receive no mic audio. A switch to a
+Maestro that is already parked takes that session and only has to greet. The
+guess comes from the controller (the neutral Buddy while a professor teaches, or
+whoever the child has just named); a wrong guess costs an idle socket, and no
+more than ``max_sessions`` are ever open on speculation. A parked session whose
+instructions no longer match (someone new joined the room) is not used.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+_MAX_SESSIONS = 1
+# Azure closes every session at 60 minutes; a parked one that old would reconnect
+# just as it is taken, so it is replaced well before.
+_MAX_AGE_S = 30 * 60.0
+
+
+class Standby:
+    """Parked realtime clients keyed by Maestro id, oldest out (thread-safe)."""
+
+    def __init__(
+        self,
+        build: Callable[[object], object],
+        max_sessions: int = _MAX_SESSIONS,
+        max_age_s: float = _MAX_AGE_S,
+    ) -> None:
+        self.build = build  # Maestro -> parked client, not yet started
+        self.max_sessions = max(0, int(max_sessions))
+        self.max_age_s = float(max_age_s)
+        self._parked: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.warmed = 0
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def __len__(self) -> int:
+        return len(self._parked)
+
+    def warm(self, maestro) -> None:
+        """Open a parked session for ``maestro`` unless one is already there."""
+        if not self.max_sessions:
+            return
+        now = time.monotonic()
+        stale: list[object] = []
+        with self._lock:
+            held = self._parked.get(maestro.id)
+            if held is not None and now - held[0] < self.max_age_s:
+                self._parked.move_to_end(maestro.id)
+                return
+            if held is not None:
+                stale.append(self._parked.pop(maestro.id)[1])
+            while len(self._parked) >= self.max_sessions:
+                stale.append(self._parked.popitem(last=False)[1][1])
+            client = self.build(maestro)
+            self._parked[maestro.id] = (now, client)
+            self.warmed += 1
+            self.discarded += len(stale)
+        client.start()
+        logger.info("Standby session opening for %s", getattr(maestro, "display_name", maestro.id))
+        _close(stale)
+
+    def take(self, maestro, instructions: str):
+        """The parked session for ``maestro``, if it is still the right one; else None.
+
+        Taken either way: a session that does not match is closed, not kept.
+        """
+        with self._lock:
+            held = self._parked.pop(maestro.id, None)
+            usable = (
+                held is not None
+                and time.monotonic() - held[0] < self.max_age_s
+                and held[1].instructions == instructions
+            )
+            if usable:
+                self.hits += 1
+            else:
+                self.misses += 1
+                self.discarded += held is not None
+        if held is None:
+            return None
+        if not usable:
+            _close([held[1]])
+            return None
+        return held[1]
+
+    def clear(self) -> None:
+        """Close every parked session."""
+        with self._lock:
+            stale = [client for _, client in self._parked.values()]
+            self._parked.clear()
+        _close(stale)
+
+    def counters(self) -> dict[str, float]:
+        asked = self.hits + self.misses
+        return {
+            "parked": len(self._parked),
+            "warmed": self.warmed,
+            "hits": self.hits,
+            "misses": self.misses,
+            "discarded": self.discarded,
+            "hit_rate": self.hits / asked if asked else 0.0,
+        }
+
+
+def _close(clients: list) -> None:
+    """Stop sessions without waiting for their threads (callers may be on a ws loop)."""
+    for client in clients:
+        try:
+            client.stop()
+        except Exception as e:  # pragma: no cover - runtime robustness
+            logger.debug("closing a standby session failed: %s", e)
@@ -93,7 +93,7 @@ class ToolCallMixin:
             return
         plan = meditation.build_plan(str(args.get("practice") or ""), args.get("minutes") or 2)
         client.send_function_result(call_id, plan.opening)
-        self._meditation = meditation.Session(client, self.audio.play, plan)
+        self._meditation = meditation.Session(client, self.audio.play_bell, plan)
         self._meditation.start()
 
     def _handle_call_professor(self, client: AzureRealtimeClient, args: dict, call_id: str) -> None:
@@ -174,11 +174,11 @@ class ToolCallMixin:
         self.movements.set_emotion("focused")
         self.movements.hold_still()
         try:
-            data_url = camera.capture_data_url(self.robot)
+            jpeg = camera.capture_frame(self.robot)
         finally:
             self.movements.release_hold()
             self.movements.set_emotion("thinking")
-        if not data_url:
+        if not jpeg:
             client.send_function_result(call_id, "Non riesco a vedere bene, avvicina il foglio e riproviamo.")
             return
         question = str(args.get("question") or "").strip() or (
@@ -188,4 +188,4 @@ class ToolCallMixin:
         )
         # Privacy: we already announced verbally; hand the still frame to the model.
         client.send_function_result(call_id, "Ho guardato il tuo compito.", respond=False)
-        client.send_image(data_url, question)
+        client.send_image_jpeg(jpeg, question)
@@ -0,0 +1,148 @@
+"""Only send the microphone upstream when someone is actually talking.
+
+The robot used to stream every sample to Azure around the clock — the silent
+room, the hour of rest after "zitto", the minutes of a guided meditation —
+paying bandwidth on the home Wi-Fi, realtime audio billing and CPU for base64
+and JSON, all to transmit nothing.
+
+:class:`VoiceGate` holds audio back while the room is quiet and opens on a
+voice. Two things keep that from ever costing the child a word:
+
+- a **pre-roll** ring of the last few hundred milliseconds is sent first when
+  the gate opens, so the syllable that opened it (and the server VAD's own
+  prefix padding) is never lost;
+- a **hangover** longer than the server VAD's silence window keeps the gate
+  open after the voice stops, because the server only ends a turn when it has
+  *heard* the silence — a gate that closed on the last syllable would leave the
+  turn open forever.
+
+While the session rests or meditates the gate wants a clearer, longer voice
+before it opens: the child can still wake Buddy by name, but the television
+next door no longer streams to the cloud.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import deque
+from collections.abc import Callable
+
+import numpy as np
+
+from .audio_dsp import flatness_buffers, spectral_flatness
+
+logger = logging.getLogger(__name__)
+
+_FLOOR_EMA_ALPHA = 0.02
+_MIN_RMS = 0.008  # never open on a truly silent room, however low its floor
+_MAX_FLATNESS = 0.45  # above this a block sounds like steady noise, not a voice
+# Awake: open fast, the pre-roll covers the attack. Resting: ask for more.
+_RATIO_AWAKE, _ATTACK_AWAKE_S = 3.0, 0.03
+_RATIO_RESTING, _ATTACK_RESTING_S = 5.0, 0.12
+# Margin added to the server's silence window so it reliably sees the turn end.
+_HANGOVER_MARGIN_MS = 500.0
+
+
+class VoiceGate:
+    """Forward mic PCM to ``sink`` while a voice is present (mic thread only)."""
+
+    def __init__(
+        self,
+        sink: Callable[[bytes], None],
+        sample_rate: int,
+        preroll_ms: float = 500.0,
+        server_silence_ms: float = 800.0,
+        on_close: Callable[[], None] | None = None,
+        bytes_per_second: int | None = None,
+    ) -> None:
+        self.sink = sink
+        self.on_close = on_close
+        self.sample_rate = int(sample_rate)
+        self.bytes_per_second = bytes_per_second or self.sample_rate * 2
+        self.preroll_ms = max(0.0, float(preroll_ms))
+        self.hangover_s = (float(server_silence_ms) + _HANGOVER_MARGIN_MS) / 1000.0
+        self._ring: deque[bytes] = deque()
+        self._ring_bytes = 0
+        self._ring_max = int(self.bytes_per_second * self.preroll_ms / 1000.0)
+        self.noise_floor = 0.004
+        self.is_open = False
+        self._voiced_for = 0.0
+        self._silent_for = 0.0
+        self.captured_s = 0.0
+        self.sent_s = 0.0
+        self.opens = 0
+        self._spectrum: tuple | None = None  # spectral_flatness work space
+
+    def threshold(self, resting: bool) -> float:
+        ratio = _RATIO_RESTING if resting else _RATIO_AWAKE
+        return max(_MIN_RMS, self.noise_floor * ratio)
+
+    def feed(self, pcm: bytes, rms: float, mono: np.ndarray, resting: bool = False) -> bool:
+        """Take one block; forward it if the gate is (or just became) open."""
+        dur = len(pcm) / self.bytes_per_second
+        self.captured_s += dur
+        # Energy first: the spectrum is only worth computing for a block loud enough to matter.
+        voiced = rms >= self.threshold(resting) and self._flatness(mono) <= _MAX_FLATNESS
+        self._voiced_for = self._voiced_for + dur if voiced else 0.0
+
+        if self.is_open:
+            self._silent_for = 0.0 if voiced else self._silent_for + dur
+            self._send(pcm)
+            if self._silent_for >= self.hangover_s:
+                self._close()
+            return True
+
+        attack = _ATTACK_RESTING_S if resting else _ATTACK_AWAKE_S
+        if voiced and self._voiced_for >= attack:
+            self._open()
+            self._send(pcm)
+            return True
+        if not voiced:
+            self.noise_floor += _FLOOR_EMA_ALPHA * (rms - self.noise_floor)
+        self._remember(pcm)
+        return False
+
+    def force_open(self) -> None:
+        """Open now: a local barge-in heard a voice, the server must hear it too."""
+        if not self.is_open:
+            self._open()
+        self._silent_for = 0.0
+
+    def saved_fraction(self) -> float:
+        """Share of captured audio that never had to leave the robot."""
+        if not self.captured_s:
+            return 0.0
+        return max(0.0, 1.0 - self.sent_s / self.captured_s)
+
+    def _flatness(self, mono: np.ndarray) -> float:
+        """:func:`~.audio_dsp.spectral_flatness` of ``mono``, in buffers reused block to block."""
+        if self._spectrum is None or self._spectrum[0].size != mono.size:
+            self._spectrum = flatness_buffers(mono.size)  # once: the block size holds
+        return spectral_flatness(mono, self._spectrum)
+
+    def _open(self) -> None:
+        self.is_open = True
+        self.opens += 1
+        self._silent_for = 0.0
+        # The words that opened the gate started before it did: send them first.
+        while self._ring:
+            self._send(self._ring.popleft())
+        self._ring_bytes = 0
+
+    def _close(self) -> None:
+        self.is_open = False
+        self._voiced_for = 0.0
+        if self.on_close is not None:
+            self.on_close()
+
+    def _remember(self, pcm: bytes) -> None:
+        if not self._ring_max:
+            return
+        self._ring.append(pcm)
+        self._ring_bytes += len(pcm)
+        while self._ring_bytes - len(self._ring[0]) >= self._ring_max:
+            self._ring_bytes -= len(self._ring.popleft())
+
+    def _send(self, pcm: bytes) -> None:
+        self.sent_s += len(pcm) / self.bytes_per_second
+        self.sink(pcm)
@@ -0,0 +1,39 @@
+"""Shared fixtures."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+
+class FakeMedia:
+    """The robot's media server as AudioIO sees it: a 16 kHz speaker that keeps what it is given."""
+
+    rate = 16000
+
+    def __init__(self):
+        self.audio = self
+        self.pushed: list[np.ndarray] = []
+        self.flushes = 0
+
+    def get_input_audio_samplerate(self):
+        return self.rate
+
+    def get_output_audio_samplerate(self):
+        return self.rate
+
+    def push_audio_sample(self, block):
+        self.pushed.append(block)
+
+    def clear_player(self):
+        self.flushes += 1
+
+
+class FakeRobot:
+    def __init__(self):
+        self.media = FakeMedia()
+
+
+@pytest.fixture
+def robot():
+    return FakeRobot()
@@ -12,8 +12,8 @@ class _Client:
     def __init__(self):
         self.sent = []
 
-    def send_image(self, data_url, prompt, respond=True):
-        self.sent.append((data_url, prompt, respond))
+    def send_image_jpeg(self, jpeg, prompt, respond=True):
+        self.sent.append((jpeg, prompt, respond))
 
 
 class _Robot:
@@ -34,8 +34,8 @@ def test_attaches_latest_frame_without_asking_for_a_reply(monkeypatch):
     client = _Client()
 
     assert v.attach(client) is True
-    data_url, prompt, respond = client.sent[0]
-    assert data_url.startswith("data:image/jpeg;base64,")
+    jpeg, prompt, respond = client.sent[0]
+    assert jpeg == b"\xff\xd8x"  # the encoded frame itself: serialised once, by the client
     assert respond is False
     assert prompt == ambient_vision.AMBIENT_PROMPT
 
@@ -5,6 +5,8 @@ from __future__ import annotations
 import numpy as np
 
 from reachy_mini_mirrorbuddy.audio_dsp import boost as _boost
+from reachy_mini_mirrorbuddy.audio_dsp import boost_int16, boost_table
+from reachy_mini_mirrorbuddy.audio_io import AudioIO
 
 
 def test_boost_makes_speech_louder() -> None:
@@ -29,3 +31,32 @@ def test_boost_is_monotonic() -> None:
 def test_boost_returns_float32() -> None:
     out = _boost(np.array([0.1, 0.2], dtype=np.float32), 2.0)
     assert out.dtype == np.float32
+
+
+def test_the_table_is_the_same_curve_as_boost() -> None:
+    """One gather replaces convert, scale and tanh — and changes nothing audible."""
+    every = np.arange(-32768, 32768, dtype=np.int32).astype(np.int16)
+    reference = _boost(every.astype(np.float32) / 32768.0, 3.2)
+    assert np.max(np.abs(boost_int16(every, boost_table(3.2)) - reference)) < 1e-6
+
+
+def test_unity_gain_is_a_plain_conversion() -> None:
+    pcm = np.array([-32768, -16384, 0, 16384, 32767], dtype=np.int16)
+    assert np.array_equal(boost_int16(pcm, boost_table(1.0)), pcm.astype(np.float32) / 32768.0)
+
+
+def test_the_table_is_rebuilt_only_when_the_gain_changes(robot) -> None:
+    io = AudioIO(robot, on_input_pcm16=lambda b: None, voice_gate=False, output_gain=3.2)
+    table = io._gain_table()
+    assert io._gain_table() is table and not table.flags.writeable
+    io.output_gain = 4.5
+    assert io._gain_table() is not table
+
+
+def test_the_speaker_never_gets_more_than_full_scale(robot) -> None:
+    """The soft clip runs after the resampler, whose filter overshoots on a harsh edge."""
+    io = AudioIO(robot, on_input_pcm16=lambda b: None, voice_gate=False, output_gain=3.2)
+    io._probe_rates()
+    square = np.where(np.arange(2400) % 40 < 20, 32767, -32768).astype(np.int16)
+    out = io._render(square, 24000)
+    assert out.size and np.max(np.abs(out)) < 1.0
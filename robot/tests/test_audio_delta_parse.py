@@ -0,0 +1,60 @@
+"""Audio deltas skip the JSON parser.
+
+Most inbound frames are ``response.output_audio.delta`` events, and most of each
+one is a base64 string that ``json.loads`` copied into a dict only for it to be
+decoded again. Those frames are now recognised by how they start and the two
+fields that matter are cut out of the text; everything else is parsed as before.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+
+import pytest
+from reachy_mini_mirrorbuddy.azure_realtime import AzureRealtimeClient
+from reachy_mini_mirrorbuddy.rt_events import audio_delta
+
+PCM = bytes(range(256)) * 20
+
+
+def _frame(etype="response.output_audio.delta", **fields) -> str:
+    event = {"type": etype, "event_id": "event_1", "response_id": "resp_1", "item_id": "item_7",
+             "output_index": 0, "content_index": 0, "delta": base64.b64encode(PCM).decode("ascii")}
+    event.update(fields)
+    return json.dumps(event, separators=(",", ":"))
+
+
+def test_an_audio_delta_is_cut_out_of_the_text():
+    raw = _frame()
+    b64, item_id = audio_delta(raw)
+    assert (b64, item_id) == (json.loads(raw)["delta"], "item_7")
+    assert audio_delta(_frame("response.audio.delta"))[0] == b64  # the Preview name
+
+
+@pytest.mark.parametrize("raw", [
+    _frame("response.output_audio_transcript.delta"),  # a delta, but not audio
+    '{"type": "response.output_audio.delta", "delta": "AAAA"}',  # not the service's layout
+    '{"type":"response.output_audio.delta","item_id":"x"}',  # no audio in it
+    b'{"type":"response.output_audio.delta","delta":"AAAA"}',  # not a text frame
+])
+def test_anything_else_takes_the_generic_path(raw):
+    assert audio_delta(raw) is None
+
+
+@pytest.mark.asyncio
+async def test_both_paths_play_the_same_audio():
+    played = []
+    c = AzureRealtimeClient(
+        ws_url="wss://x", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"},
+        on_output_audio=lambda data, item_id: played.append((data, item_id)),
+    )
+    raw = _frame()
+    c._on_audio_delta(*audio_delta(raw))
+    await c._handle_event(json.loads(raw))
+    assert played == [(PCM, "item_7"), (PCM, "item_7")]
+
+    c._suppress = True  # after a barge-in nothing more is decoded or played
+    c._on_audio_delta(*audio_delta(raw))
+    assert len(played) == 2
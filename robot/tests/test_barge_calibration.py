@@ -0,0 +1,147 @@
+"""The barge-in floor is robust to a slammed door, and calibrates from the settings page.
+
+The room's floor used to be an EMA: a few loud frames while Buddy was silent
+dragged it, and the threshold with it, up for seconds. It is now the median of
+the silent room, tracked by a constant-memory P² estimator next to its 95th
+percentile. Finding the right ceiling for one child used to mean running a
+script over SSH; the mic thread now does it from a button on the settings page.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+
+import numpy as np
+import pytest
+from reachy_mini_mirrorbuddy.audio_io import AudioIO
+from reachy_mini_mirrorbuddy.azure_realtime import AzureRealtimeClient
+from reachy_mini_mirrorbuddy.barge_detector import BargeCalibration, BargeDetector
+from reachy_mini_mirrorbuddy.quantile import P2Quantile
+
+
+@pytest.mark.parametrize("p", [0.5, 0.9, 0.95])
+@pytest.mark.parametrize("dist", ["normal", "lognormal"])
+def test_p2_tracks_the_true_quantile(p, dist):
+    rng = np.random.default_rng(7)
+    values = rng.normal(0, 1, 20000) if dist == "normal" else rng.lognormal(-5, 0.5, 20000)
+    estimate = P2Quantile(p)
+    for x in values.tolist():
+        estimate.add(x)
+    spread = np.quantile(values, 0.99) - np.quantile(values, 0.01)
+    assert abs(estimate.value - np.quantile(values, p)) < 0.01 * spread
+
+
+def test_p2_is_exact_for_the_first_few_values():
+    estimate = P2Quantile(0.5)
+    assert estimate.value == 0.0
+    for x in (3.0, 1.0, 2.0):
+        estimate.add(x)
+    assert estimate.value == 2.0
+
+
+def test_p2_refuses_a_quantile_outside_0_1():
+    with pytest.raises(ValueError):
+        P2Quantile(1.0)
+
+
+# ------------------------------------------------------------------- calibration
+def _hops(level: float, seconds: float, rng) -> np.ndarray:
+    return np.abs(level * (1 + 0.1 * rng.standard_normal(int(seconds * 100))))
+
+
+def _run(cal: BargeCalibration, room: float, voice: float) -> None:
+    rng = np.random.default_rng(1)
+    stream = np.concatenate([_hops(room, cal.room_s, rng), _hops(voice, cal.voice_s, rng)])
+    for block in np.array_split(stream, stream.size // 2):  # two hops per 20 ms block
+        if cal.feed(block, 10.0):
+            return
+
+
+def test_calibration_lands_between_the_room_and_the_voice():
+    cal = BargeCalibration(output_gain=1.0)
+    _run(cal, room=0.005, voice=0.05)
+    assert cal.phase == cal.DONE
+    assert 0.005 < cal.setting < 0.05
+    assert cal.setting < (0.005 + 0.06) / 2 + 0.005  # closer to the room than to a shout
+
+
+def test_the_setting_survives_the_output_gain_scaling():
+    cal = BargeCalibration(output_gain=3.2)
+    _run(cal, room=0.005, voice=0.05)
+    plain = BargeCalibration(output_gain=1.0)
+    _run(plain, room=0.005, voice=0.05)
+    assert cal.setting * BargeDetector.scale_for_gain(3.2) == pytest.approx(plain.setting, abs=0.002)  # 3 decimals each
+
+
+def test_no_voice_is_a_failed_calibration_not_a_silly_threshold():
+    cal = BargeCalibration()
+    _run(cal, room=0.005, voice=0.005)
+    assert cal.phase == cal.FAILED and cal.setting is None
+
+
+def test_the_mic_thread_applies_the_result_at_once():
+    io = AudioIO(robot=object(), on_input_pcm16=lambda _b: None, barge_rms_threshold=0.045,
+                 output_gain=3.2)
+    done = []
+    cal = io.start_calibration(on_done=done.append)
+    rng = np.random.default_rng(2)
+    stream = np.concatenate([_hops(0.005, cal.room_s, rng), _hops(0.04, cal.voice_s, rng)])
+    for block in np.array_split(stream, stream.size // 2):
+        io.note_calibration_hops(block, 10.0, speaking=False)
+    assert done == [cal] and cal.phase == cal.DONE
+    assert io.barge.ceiling == pytest.approx(cal.setting * BargeDetector.scale_for_gain(3.2))
+
+
+def test_buddys_own_voice_is_not_measured():
+    io = AudioIO(robot=object(), on_input_pcm16=lambda _b: None)
+    cal = io.start_calibration()
+    for _ in range(1000):
+        io.note_calibration_hops(np.full(2, 0.3), 10.0, speaking=True)
+    assert cal.phase == cal.ROOM and cal.elapsed_s == 0.0
+
+
+def test_no_calibration_over_a_live_conversation():
+    io = AudioIO(robot=object(), on_input_pcm16=lambda _b: None)
+    assert io.calibration_blocker() is None  # nothing in flight
+    io.expect_reply()
+    assert "conversazione" in io.calibration_blocker()
+    io.is_resting = lambda: True
+    assert io.calibration_blocker() is None  # a resting session is free
+    io.cancel_reply()
+    io._playing_until = time.monotonic() + 1.0
+    assert "parlando" in io.calibration_blocker()  # even at rest, not over Buddy's voice
+
+
+class _Capture:
+    """A mic that delivers ``blocks`` and then ends the loop."""
+
+    def __init__(self, io, blocks):
+        self.io, self.blocks, self.wakeups = io, list(blocks), 0
+
+    def read(self, _timeout):
+        if not self.blocks:
+            self.io._recording = False
+            return None
+        return self.blocks.pop(0)
+
+
+def test_nothing_reaches_the_session_while_a_calibration_runs(robot):
+    client = AzureRealtimeClient(
+        ws_url="wss://x", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"},
+    )
+    client._ws = object()
+    io = AudioIO(robot, on_input_pcm16=client.send_audio_pcm16, voice_gate=False)
+    cal = io.start_calibration()
+    cal.room_s, cal.voice_s = 0.2, 0.4
+    sent = []
+    client._outbox.put = lambda msg, kind: sent.append((json.loads(msg)["type"], cal.active))
+    t = np.arange(320) / 16000
+    voice = (np.sin(2 * np.pi * 220 * t) * 8000).astype(np.int16)
+    quiet = (np.random.default_rng(0).normal(0, 100, 320)).astype(np.int16)
+    io._capture, io._recording = _Capture(io, [quiet] * 10 + [voice] * 90), True
+    io._input_loop()
+    assert cal.phase == cal.DONE
+    assert sent and all(kind == "input_audio_buffer.append" for kind, _ in sent)
+    assert not any(active for _, active in sent)  # only what was said after it ended
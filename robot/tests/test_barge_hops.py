@@ -0,0 +1,91 @@
+""""Zitto" cuts Buddy off just as fast on every firmware.
+
+Counting loud *blocks* made the barge-in delay a multiple of whatever block size
+the media server delivers: three 20 ms blocks is 60 ms, three 64 ms blocks is
+nearly 200 ms of Buddy talking over a child who asked him to stop. The decision
+now runs on 10 ms hops with a sustain time in milliseconds.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from reachy_mini_mirrorbuddy.barge_detector import BargeDetector
+from reachy_mini_mirrorbuddy.mic_chain import MicChain
+
+RATE = 16000
+ONSET_S = 0.503  # the child starts speaking mid-block, never on a boundary
+
+
+def _burst(seconds: float = 1.5) -> np.ndarray:
+    """Quiet room, then a voice from ONSET_S on."""
+    rng = np.random.default_rng(3)
+    t = np.arange(int(RATE * seconds)) / RATE
+    audio = rng.normal(0, 60, t.size)
+    on = t >= ONSET_S
+    audio[on] += np.sin(2 * np.pi * 200 * t[on]) * 3000  # ~0.065 RMS
+    return audio.astype(np.int16)
+
+
+def _delay_ms(block_ms: float, hops: bool, sustain_ms: float = 60.0) -> float:
+    """Milliseconds from the voice onset to the block that cuts Buddy off."""
+    chain = MicChain(RATE, 24000)
+    detector = BargeDetector(rms_threshold=0.045, sustain_frames=3, sustain_ms=sustain_ms)
+    audio = _burst()
+    block = int(RATE * block_ms / 1000)
+    for start in range(0, audio.size - block + 1, block):
+        rms = chain.process(audio[start:start + block])
+        end_s = (start + block) / RATE
+        speaking = True  # Buddy is mid-sentence the whole time
+        if end_s <= ONSET_S - 0.1:
+            speaking = False  # ...after a quiet spell that taught the room's floor
+        if hops:
+            cut = detector.note_hops(chain.hops, speaking, chain.hop_ms)
+        else:  # the old way: one block counted as one 20 ms frame, whatever its length
+            cut = detector.note_hops(np.array([rms]), speaking, 20.0)
+        if cut:
+            return (end_s - ONSET_S) * 1000.0
+    raise AssertionError("the voice never cut Buddy off")
+
+
+@pytest.mark.parametrize("block_ms", [10, 20, 32, 64])
+def test_the_delay_is_the_sustain_time_plus_at_most_one_block(block_ms):
+    delay = _delay_ms(block_ms, hops=True)
+    # The onset hop counts once it is loud, so up to one hop early; then at most the
+    # wait for the block that completes the sustain time.
+    assert 60.0 - 10.0 <= delay <= 60.0 + block_ms
+
+
+def test_the_delay_no_longer_grows_with_the_block_size():
+    old = {b: _delay_ms(b, hops=False) for b in (20, 64)}
+    new = {b: _delay_ms(b, hops=True) for b in (20, 64)}
+    assert old[64] - old[20] >= 64.0  # counting blocks: bigger blocks, later cut
+    assert new[64] - new[20] <= 20.0  # only the block boundary remains, not 3 of them
+    assert new[64] < old[64]
+
+
+def test_a_shorter_sustain_cuts_sooner():
+    assert _delay_ms(20, hops=True, sustain_ms=30) < _delay_ms(20, hops=True, sustain_ms=60)
+
+
+def test_a_cough_shorter_than_the_sustain_does_not_cut():
+    detector = BargeDetector(rms_threshold=0.045, sustain_frames=3, sustain_ms=60)
+    detector.noise_floor = 0.004
+    loud, quiet = np.full(4, 0.1), np.full(2, 0.001)  # 40 ms loud, then silence
+    assert detector.note_hops(loud, True, 10.0) is False
+    assert detector.note_hops(quiet, True, 10.0) is False
+    assert detector.note_hops(loud, True, 10.0) is False  # the streak started over
+
+
+def test_the_streak_carries_across_blocks():
+    detector = BargeDetector(rms_threshold=0.045, sustain_frames=3, sustain_ms=60)
+    detector.noise_floor = 0.004
+    assert detector.note_hops(np.full(3, 0.1), True, 10.0) is False
+    assert detector.note_hops(np.full(3, 0.1), True, 10.0) is True
+
+
+def test_the_sustain_time_defaults_from_the_frame_setting(monkeypatch):
+    monkeypatch.delenv("MIRRORBUDDY_BARGE_SUSTAIN_MS", raising=False)
+    assert BargeDetector(rms_threshold=0.045, sustain_frames=4).sustain_ms == 80.0
+    monkeypatch.setenv("MIRRORBUDDY_BARGE_SUSTAIN_MS", "45")
+    assert BargeDetector(rms_threshold=0.045, sustain_frames=4).sustain_ms == 45.0
@@ -46,7 +46,7 @@ class TestLocalBargeIn:
     def test_sends_cancel_only_while_responding(self):
         sent: list[str] = []
         c = _client()
-        c._enqueue = lambda msg: sent.append(msg)  # type: ignore[assignment]
+        c._enqueue = lambda msg, kind=None: sent.append(msg)  # type: ignore[assignment]
 
         c._responding = False
         c.local_barge_in()
@@ -61,7 +61,7 @@ class TestLocalBargeIn:
         would come back as a spurious 'no active response' error."""
         sent: list[str] = []
         c = _client()
-        c._enqueue = lambda msg: sent.append(msg)  # type: ignore[assignment]
+        c._enqueue = lambda msg, kind=None: sent.append(msg)  # type: ignore[assignment]
 
         c._responding = True
         c.local_barge_in()
@@ -25,6 +25,11 @@ def _io(threshold=0.045):
     )
 
 
+def _frame(io, rms, speaking):
+    """One 20 ms hop: with three sustain frames, the third loud one cuts."""
+    return io.note_mic_hops(np.array([rms]), 20.0, speaking=speaking)
+
+
 def test_quiet_room_lowers_the_threshold_far_below_the_configured_one():
     io = _io()
     io.barge.noise_floor = 0.004
@@ -67,17 +72,44 @@ def test_a_soft_voice_now_crosses_the_threshold():
 def test_floor_tracks_measured_frames():
     io = _io()
     io.barge.noise_floor = 0.05
-    quiet = np.zeros(512, dtype=np.int16)
 
     for _ in range(200):
-        rms = float(np.sqrt(np.mean((quiet.astype(np.float32) / 32768.0) ** 2)))
-        io.barge.noise_floor = (
-            1 - barge_detector._NOISE_EMA_ALPHA
-        ) * io.barge.noise_floor + barge_detector._NOISE_EMA_ALPHA * rms
+        _frame(io, 0.0, speaking=False)
 
     assert io.barge.noise_floor < 0.001
 
 
+def test_a_few_loud_moments_do_not_drag_the_floor_up():
+    """A door or a chair while Buddy is quiet is the room's tail, not its floor."""
+    io = _io()
+    rng = np.random.default_rng(0)
+    for i in range(600):
+        rms = 0.2 if i % 50 == 0 else 0.004 * (1 + 0.2 * rng.standard_normal())
+        _frame(io, rms, speaking=False)
+
+    assert io.barge.noise_floor == pytest.approx(0.004, rel=0.1)
+    assert io.barge_threshold() == pytest.approx(0.016, rel=0.1)
+
+
+def test_the_room_peaks_keep_the_threshold_above_its_own_bumps():
+    io = _io()
+    for i in range(600):  # a fan with a hard knock every tenth frame
+        _frame(io, 0.03 if i % 10 == 0 else 0.004, speaking=False)
+
+    assert io.barge.noise_peak == pytest.approx(0.03, rel=0.1)
+    assert io.barge_threshold() >= 0.03  # the knock alone never cuts Buddy off
+
+
+def test_the_floor_follows_a_room_that_changes():
+    io = _io()
+    for _ in range(3000):
+        _frame(io, 0.002, speaking=False)
+    for _ in range(6000):  # the window turns over: the old room is forgotten
+        _frame(io, 0.008, speaking=False)
+
+    assert io.barge.noise_floor == pytest.approx(0.008, rel=0.05)
+
+
 class TestMicFrameDecision:
     """The mic loop's decision, isolated from hardware."""
 
@@ -85,30 +117,30 @@ class TestMicFrameDecision:
         io = _io()
         io.barge.noise_floor = 0.004
 
-        assert io.note_mic_frame(0.02, speaking=True) is False  # 1st loud frame
-        assert io.note_mic_frame(0.02, speaking=True) is False  # 2nd
-        assert io.note_mic_frame(0.02, speaking=True) is True  # 3rd → cut
+        assert _frame(io, 0.02, speaking=True) is False  # 1st loud frame
+        assert _frame(io, 0.02, speaking=True) is False  # 2nd
+        assert _frame(io, 0.02, speaking=True) is True  # 3rd → cut
 
     def test_an_isolated_bump_does_not_take_the_turn_away(self):
         io = _io()
         io.barge.noise_floor = 0.004
 
-        io.note_mic_frame(0.02, speaking=True)
-        io.note_mic_frame(0.001, speaking=True)  # back to quiet: debounce resets
-        assert io.note_mic_frame(0.02, speaking=True) is False
+        _frame(io, 0.02, speaking=True)
+        _frame(io, 0.001, speaking=True)  # back to quiet: debounce resets
+        assert _frame(io, 0.02, speaking=True) is False
 
     def test_nothing_fires_while_buddy_is_silent(self):
         io = _io()
 
         for _ in range(10):
-            assert io.note_mic_frame(0.5, speaking=False) is False
+            assert _frame(io, 0.5, speaking=False) is False
 
     def test_buddys_own_echo_never_teaches_the_floor(self):
         io = _io()
         io.barge.noise_floor = 0.004
 
         for _ in range(50):
-            io.note_mic_frame(0.4, speaking=True)  # loud echo while he speaks
+            _frame(io, 0.4, speaking=True)  # loud echo while he speaks
 
         assert io.barge.noise_floor == 0.004
 
@@ -117,7 +149,7 @@ class TestMicFrameDecision:
         io.barge.noise_floor = 0.004
 
         for _ in range(200):
-            io.note_mic_frame(0.02, speaking=False)
+            _frame(io, 0.02, speaking=False)
 
         assert io.barge.noise_floor > 0.015
 
@@ -168,9 +200,10 @@ def test_cutting_playback_forgets_the_streak():
     """After an interrupt the next word starts from zero, not mid-debounce."""
     detector = BargeDetector(rms_threshold=0.045, sustain_frames=3, output_gain=1.0)
     detector.noise_floor = 0.004
-    assert detector.note_frame(0.02, speaking=True) is False
-    assert detector.note_frame(0.02, speaking=True) is False
+    hop = np.array([0.02])
+    assert detector.note_hops(hop, True, 20.0) is False
+    assert detector.note_hops(hop, True, 20.0) is False
 
     detector.reset()
 
-    assert detector.note_frame(0.02, speaking=True) is False
+    assert detector.note_hops(hop, True, 20.0) is False
@@ -34,9 +34,7 @@ def test_uses_sdk_jpeg_when_available(monkeypatch):
     monkeypatch.setattr(camera, "encode_jpeg", lambda f: b"never")
     robot = _Robot(_Media(jpeg=b"\xff\xd8sdk"))
 
-    url = camera.capture_data_url(robot)
-
-    assert url is not None and url.startswith("data:image/jpeg;base64,")
+    assert camera.capture_frame(robot) == b"\xff\xd8sdk"
     assert robot.media.frame_calls == 0
 
 
@@ -44,9 +42,7 @@ def test_falls_back_to_raw_frame_encoding(monkeypatch):
     monkeypatch.setattr(camera, "encode_jpeg", lambda f: b"\xff\xd8encoded")
     robot = _Robot(_Media(jpeg=None, frames=[_frame()]))
 
-    url = camera.capture_data_url(robot)
-
-    assert url is not None
+    assert camera.capture_frame(robot) == b"\xff\xd8encoded"
     assert robot.media.frame_calls == 1
 
 
@@ -55,9 +51,7 @@ def test_retries_until_a_frame_arrives(monkeypatch):
     monkeypatch.setattr(camera.time, "sleep", lambda _s: None)
     media = _Media(jpeg=None, frames=[None, None, _frame()])
 
-    url = camera.capture_data_url(_Robot(media))
-
-    assert url is not None
+    assert camera.capture_frame(_Robot(media)) == b"\xff\xd8encoded"
     assert media.frame_calls == 3
 
 
@@ -66,5 +60,48 @@ def test_returns_none_when_camera_never_delivers(monkeypatch):
     monkeypatch.setattr(camera.time, "sleep", lambda _s: None)
     media = _Media(jpeg=None, frames=[])
 
-    assert camera.capture_data_url(_Robot(media)) is None
+    assert camera.capture_frame(_Robot(media)) is None
     assert media.frame_calls == camera._RAW_FRAME_ATTEMPTS
+
+
+# SOI, then a baseline SOF0 for a 2048x1536 picture, then bulk.
+_BIG_SDK_JPEG = b"\xff\xd8\xff\xc0\x00\x11\x08\x06\x00\x08\x00" + b"x" * 200_000
+
+
+def test_a_frame_too_big_for_the_socket_is_encoded_again_smaller(monkeypatch):
+    asked = {}
+
+    def reencode(jpeg, size, max_width=None, quality=None):
+        asked.update(jpeg=jpeg, size=size, max_width=max_width, quality=quality)
+        return b"\xff\xd8small"
+
+    monkeypatch.setattr(camera, "reencode_jpeg", reencode)
+    robot = _Robot(_Media(jpeg=_BIG_SDK_JPEG, frames=[_frame()]))
+
+    assert camera.capture_frame(robot, max_bytes=100_000) == b"\xff\xd8small"
+    assert asked["jpeg"] is _BIG_SDK_JPEG  # the picture that was judged, not a new one
+    assert asked["size"] == (2048, 1536)
+    assert asked["max_width"] == camera._SHRINK_WIDTH
+    assert robot.media.frame_calls == 0
+
+
+def test_a_big_raw_frame_is_encoded_again_from_the_same_frame(monkeypatch):
+    first, seen = _frame(), []
+
+    def encode(frame, max_width=None, quality=None):
+        seen.append((frame, max_width))
+        return b"\xff\xd8" + (b"small" if max_width else b"x" * 200_000)
+
+    monkeypatch.setattr(camera, "encode_jpeg", encode)
+    robot = _Robot(_Media(jpeg=None, frames=[first, _frame()]))
+
+    assert camera.capture_frame(robot, max_bytes=100_000) == b"\xff\xd8small"
+    assert seen == [(first, None), (first, camera._SHRINK_WIDTH)]
+    assert robot.media.frame_calls == 1
+
+
+def test_a_big_frame_that_cannot_be_shrunk_is_sent_as_it_is(monkeypatch):
+    monkeypatch.setattr(camera, "reencode_jpeg", lambda *a, **k: None)
+    robot = _Robot(_Media(jpeg=_BIG_SDK_JPEG))
+
+    assert camera.capture_frame(robot, max_bytes=100_000) == _BIG_SDK_JPEG
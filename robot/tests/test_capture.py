@@ -0,0 +1,108 @@
+"""The mic thread sleeps until audio is due, instead of spinning on the GIL.
+
+A 1 ms poll meant a thousand wake-ups a second competing with the motion loop
+and the websocket. The capture source must deliver every block just as before,
+wake up a small multiple of the block rate, and still let the app stop at once.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import numpy as np
+from reachy_mini_mirrorbuddy.capture import CaptureSource
+
+RATE = 16000
+
+
+class ClockedMedia:
+    """A media server that makes a 20 ms block available every 20 ms."""
+
+    def __init__(self, block_s: float = 0.02) -> None:
+        self.block_s = block_s
+        self.start = time.monotonic()
+        self.handed = 0
+        self.polls = 0
+
+    def get_audio_sample(self):
+        self.polls += 1
+        due = int((time.monotonic() - self.start) / self.block_s)
+        if self.handed >= due:
+            return None
+        self.handed += 1
+        return np.zeros(int(RATE * self.block_s), dtype=np.int16)
+
+
+def _drain(source: CaptureSource, seconds: float) -> int:
+    got, end = 0, time.monotonic() + seconds
+    while time.monotonic() < end:
+        if source.read(0.1) is not None:
+            got += 1
+    return got
+
+
+def test_every_block_still_arrives():
+    media = ClockedMedia()
+    got = _drain(CaptureSource(media, RATE), 0.6)
+    assert got >= media.handed - 1 and got >= 25
+
+
+def test_wakeups_stay_near_the_block_rate():
+    media = ClockedMedia()
+    source = CaptureSource(media, RATE)
+    _drain(source, 1.0)
+    # 50 blocks a second; a 1 ms spin would be ~1000 wake-ups.
+    assert source.wakeups < 250
+    assert media.polls < 250
+
+
+def test_a_burst_backlog_is_drained_at_once():
+    class Backlog:
+        def __init__(self):
+            self.left = 5
+
+        def get_audio_sample(self):
+            if self.left:
+                self.left -= 1
+                return np.zeros(320, dtype=np.int16)
+            return None
+
+    source = CaptureSource(Backlog(), RATE)
+    start = time.monotonic()
+    blocks = [source.read(0.1) for _ in range(5)]
+    assert all(b is not None for b in blocks)
+    assert time.monotonic() - start < 0.05  # no waiting a period per queued block
+
+
+def test_a_pushed_block_wakes_the_reader_immediately():
+    class Silent:
+        def get_audio_sample(self):
+            return None
+
+    source = CaptureSource(Silent(), RATE)
+    block = np.ones(320, dtype=np.int16)
+    threading.Timer(0.05, source.push, args=(block,)).start()
+    start = time.monotonic()
+    assert source.read(2.0) is block
+    assert time.monotonic() - start < 0.5
+
+
+def test_close_wakes_a_sleeping_reader():
+    class Silent:
+        def get_audio_sample(self):
+            return None
+
+    source = CaptureSource(Silent(), RATE)
+    threading.Timer(0.05, source.close).start()
+    start = time.monotonic()
+    assert source.read(5.0) is None
+    assert time.monotonic() - start < 1.0  # stopping never waits the full timeout
+
+
+def test_a_timeout_returns_none():
+    class Silent:
+        def get_audio_sample(self):
+            return None
+
+    assert CaptureSource(Silent(), RATE).read(0.02) is None
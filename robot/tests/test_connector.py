@@ -0,0 +1,163 @@
+"""Reconnects reuse what the last connect already paid for, and say what it cost.
+
+Every reconnect, rollover and Maestro switch looked the endpoint up again and
+did a full TLS handshake on the robot's CPU. The connector keeps the address
+for a while and offers the last TLS session back to the server, and it times
+each phase so a slow reconnect can be told apart from a slow network.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import shutil
+import socket
+import ssl
+import subprocess
+
+import pytest
+import websockets
+from reachy_mini_mirrorbuddy import azure_realtime, connector
+from reachy_mini_mirrorbuddy.azure_realtime import AzureRealtimeClient
+from reachy_mini_mirrorbuddy.connector import Connector
+
+
+@pytest.fixture(autouse=True)
+def no_proxy(monkeypatch):
+    for var in ("http_proxy", "https_proxy", "HTTP_PROXY", "HTTPS_PROXY", "all_proxy", "ALL_PROXY"):
+        monkeypatch.delenv(var, raising=False)
+
+
+async def _echo(ws):
+    async for msg in ws:
+        await ws.send(msg)
+
+
+@pytest.mark.asyncio
+async def test_the_address_is_looked_up_once_and_forgotten_on_failure(monkeypatch):
+    lookups = []
+    loop = asyncio.get_running_loop()
+    real = loop.getaddrinfo
+
+    async def getaddrinfo(host, port, **kw):
+        lookups.append(host)
+        return await real("127.0.0.1", port, **kw)
+
+    monkeypatch.setattr(loop, "getaddrinfo", getaddrinfo)
+    conn = Connector()
+    async with websockets.serve(_echo, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        for _ in range(2):
+            ws = await conn.connect(f"ws://robot.example:{port}")
+            await ws.close()
+    assert lookups == ["robot.example"]
+    assert conn.counters()["connects"] == 2 and conn.counters()["dns_hits"] == 1
+
+    with pytest.raises(OSError):
+        await conn.connect(f"ws://robot.example:{port}")  # the server is gone
+    assert ("robot.example", port) not in conn._addresses
+
+
+@pytest.mark.asyncio
+async def test_every_address_is_tried_and_the_one_that_answered_goes_first(monkeypatch):
+    loop = asyncio.get_running_loop()
+    real_connect = loop.sock_connect
+    dead = ("127.0.0.2", 1)  # an AAAA with no route behind it, say: it never answers
+
+    async def getaddrinfo(host, port, **kw):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (dead[0], port)),
+                (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port))]
+
+    async def sock_connect(sock, address):
+        if address[0] == dead[0]:
+            await asyncio.sleep(3600)
+        return await real_connect(sock, address)
+
+    monkeypatch.setattr(loop, "getaddrinfo", getaddrinfo)
+    monkeypatch.setattr(loop, "sock_connect", sock_connect)
+    conn = Connector()
+    async with websockets.serve(_echo, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        ws = await conn.connect(f"ws://robot.example:{port}", open_timeout=0.2)
+        await ws.close()
+        assert [a[1][0] for a in conn._addresses[("robot.example", port)][1]] == ["127.0.0.1", dead[0]]
+
+
+@pytest.mark.asyncio
+async def test_a_cached_address_expires():
+    conn = Connector(dns_ttl_s=0.0)
+    async with websockets.serve(_echo, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        for _ in range(2):
+            ws = await conn.connect(f"ws://127.0.0.1:{port}")
+            await ws.close()
+    assert conn.counters()["dns_hits"] == 0
+
+
+def test_the_context_verifies_and_has_nothing_to_offer_at_first():
+    ctx = connector.tls_context()
+    assert ctx.verify_mode == ssl.CERT_REQUIRED and ctx.check_hostname
+    tls = ctx.wrap_bio(ssl.MemoryBIO(), ssl.MemoryBIO(), server_hostname="x.example")
+    assert tls.session is None  # nothing to offer yet: a full handshake
+
+
+@pytest.mark.skipif(shutil.which("openssl") is None, reason="needs openssl to make a certificate")
+@pytest.mark.asyncio
+async def test_the_second_handshake_resumes_the_first(tmp_path):
+    cert, key = tmp_path / "cert.pem", tmp_path / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", str(key),
+         "-out", str(cert), "-days", "1", "-subj", "/CN=localhost",
+         "-addext", "subjectAltName=DNS:localhost"],
+        check=True, capture_output=True,
+    )
+    server_tls = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server_tls.load_cert_chain(cert, key)
+    conn = Connector()
+    conn.tls.load_verify_locations(cert)
+    async with websockets.serve(_echo, "localhost", 0, ssl=server_tls, family=socket.AF_INET) as server:
+        port = server.sockets[0].getsockname()[1]
+        for _ in range(2):
+            ws = await conn.connect(f"wss://localhost:{port}")
+            await ws.send("hi")
+            assert await ws.recv() == "hi"  # the resumption ticket has arrived by now
+            conn.configured(ws, 0.0)
+            await ws.close()
+    assert conn.counters()["tls_resumed"] == 1
+
+
+def test_the_backoff_is_jittered_but_never_past_the_cap(monkeypatch):
+    c = AzureRealtimeClient(
+        ws_url="wss://x", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"},
+    )
+    slept = []
+
+    async def connect():
+        if len(slept) >= 8:
+            c._stop.set()
+        raise OSError("connection refused")
+
+    async def sleep(d):
+        slept.append(d)
+
+    c._connect_and_listen = connect
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    monkeypatch.setattr(azure_realtime.random, "uniform", lambda a, b: b)
+    asyncio.run(c._session_loop())
+    assert slept[:3] == [1.25, 2.5, 5.0]
+    assert max(slept) == azure_realtime._RECONNECT_MAX_S
+
+
+@pytest.mark.asyncio
+async def test_the_wait_for_session_updated_is_timed():
+    c = AzureRealtimeClient(
+        ws_url="wss://x", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"},
+    )
+    c._safe_send = lambda msg: asyncio.sleep(0)
+    c._update_sent_at = 1.0
+    await c._handle_event({"type": "session.updated"})
+    assert c._update_sent_at == 0.0
+    assert c.connect_counters()["configured_p50_ms"] > 0
+    json.dumps(c.connect_counters())  # loggable as it is
@@ -0,0 +1,100 @@
+"""An hour of homework does not leave an hour of photos in the model's context.
+
+Ambient vision adds a frame every 20 s, tool calls add their results, and all
+of it was read again on every turn: replies got slower and dearer as the
+session went on. Old photos and old tool calls are now deleted from the
+conversation; what the child and Buddy said is kept.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from reachy_mini_mirrorbuddy import context_window as cw
+from reachy_mini_mirrorbuddy.azure_realtime import AzureRealtimeClient
+
+
+def _photo(i):
+    return {"id": f"img{i}", "type": "message", "role": "user",
+            "content": [{"type": "input_text", "text": "?"}, {"type": "input_image"}]}
+
+
+def _said(i, role="user"):
+    return {"id": f"{role}{i}", "type": "message", "role": role, "content": [{"type": "input_audio"}]}
+
+
+def _tool(i):
+    return {"id": f"out{i}", "type": "function_call_output", "call_id": f"c{i}", "output": "ok"}
+
+
+def test_items_are_told_apart():
+    assert cw.item_kind(_photo(1)) == cw.IMAGE
+    assert cw.item_kind(_said(1)) == cw.USER
+    assert cw.item_kind(_said(1, "assistant")) == cw.ASSISTANT
+    assert cw.item_kind(_tool(1)) == cw.TOOL
+    assert cw.item_kind({"type": "function_call", "id": "f"}) == cw.TOOL
+
+
+def test_only_the_latest_photos_stay():
+    window = cw.ContextWindow(keep_images=2)
+    for i in range(5):
+        window.add(_photo(i))
+        window.add(_said(i))
+    assert window.prune() == ["img0", "img1", "img2"]
+    assert window.prune() == []
+    counters = window.counters()
+    assert counters["image"] == 2 and counters["user"] == 5 and counters["deleted"] == 3
+
+
+def test_tool_calls_go_after_enough_turns():
+    window = cw.ContextWindow(tool_turns=2)
+    window.add(_said(0))
+    window.add(_tool(0))
+    window.add(_said(1))
+    assert window.prune() == []
+    window.add(_said(2))
+    assert window.prune() == ["out0"]
+
+
+def test_zero_keeps_everything():
+    window = cw.ContextWindow(keep_images=0, tool_turns=0)
+    for i in range(10):
+        window.add(_photo(i))
+        window.add(_tool(i))
+        window.add(_said(i))
+    assert window.prune() == [] and len(window) == 30
+
+
+def test_the_size_is_the_servers_own_count():
+    window = cw.ContextWindow()
+    window.usage({"input_tokens": 5400, "input_token_details": {
+        "text_tokens": 1200, "audio_tokens": 3000, "image_tokens": 1200, "cached_tokens_details": {},
+    }})
+    window.usage({"input_tokens": 900})
+    counters = window.counters()
+    assert counters["input_tokens"] == 900 and counters["peak_tokens"] == 5400
+
+
+@pytest.mark.asyncio
+async def test_the_client_deletes_what_the_window_lets_go():
+    c = AzureRealtimeClient(
+        ws_url="wss://x", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"}, keep_images=1,
+    )
+    c.queued = []
+    c._enqueue = lambda msg, kind=None: c.queued.append(json.loads(msg))
+    c._safe_send = lambda msg: asyncio.sleep(0)
+    for i in range(3):
+        await c._handle_event({"type": "conversation.item.added", "item": _photo(i)})
+    assert c.queued == [
+        {"type": "conversation.item.delete", "item_id": "img0"},
+        {"type": "conversation.item.delete", "item_id": "img1"},
+    ]
+    await c._handle_event({"type": "conversation.item.deleted", "item_id": "img1"})
+    await c._handle_event({"type": "response.done", "response": {"usage": {"input_tokens": 77}}})
+    assert c.context_counters()["input_tokens"] == 77
+
+    c._reset_session_state()  # a new session has none of these items
+    assert c.context_counters()["items"] == 0
@@ -0,0 +1,84 @@
+"""A new professor knows what the child just said to the one before.
+
+Every new Maestro, reconnect and rollover started from an empty conversation:
+after "chiama Galileo" the child had to describe the exercise all over again.
+The last lines of both sides are now carried into each fresh conversation, as
+one system item, within a hard token budget and in memory only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from reachy_mini_mirrorbuddy import digest as dg
+from reachy_mini_mirrorbuddy.azure_realtime import AzureRealtimeClient
+from reachy_mini_mirrorbuddy.digest import Digest
+
+
+def test_lines_come_out_oldest_first_under_a_header():
+    d = Digest()
+    d.add(dg.STUDENT, "non capisco le frazioni")
+    d.add("Buddy", "Proviamo con una pizza divisa in quattro.")
+    text = d.render()
+    assert text.startswith(dg._HEADER)
+    assert text.endswith("Studente: non capisco le frazioni\nBuddy: Proviamo con una pizza divisa in quattro.")
+
+
+@pytest.mark.parametrize("budget", [40, 100, 300])
+def test_the_budget_is_hard_and_keeps_the_newest(budget):
+    d = Digest(max_tokens=budget)
+    for i in range(200):
+        d.add(dg.STUDENT, f"riga numero {i} " + "parola " * (i % 30))
+    text = d.render()
+    assert len(text) <= budget * dg._CHARS_PER_TOKEN
+    if text:
+        assert "riga numero 199 " in text
+
+
+def test_a_long_line_is_shortened_not_dropped():
+    d = Digest()
+    d.add("Buddy", "a" * 1000)
+    line = d.render().splitlines()[-1]
+    assert len(line) <= len("Buddy: ") + dg._LINE_CHARS and line.endswith("…")
+
+
+def test_nothing_said_or_no_budget_means_nothing_carried():
+    assert Digest().render() == ""
+    off = Digest(max_tokens=0)
+    off.add(dg.STUDENT, "ciao")
+    assert off.render() == "" and len(off) == 0
+
+
+# --------------------------------------------------------------------- the client
+def _client(d, parked=False):
+    c = AzureRealtimeClient(
+        ws_url="wss://x", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"}, digest=d, standby=parked,
+    )
+    c.queued = []
+    c._enqueue = lambda msg, kind=None: c.queued.append(json.loads(msg))
+    return c
+
+
+def test_a_fresh_conversation_is_told_once_as_a_system_item():
+    d = Digest()
+    d.add(dg.STUDENT, "ho un problema con le equazioni")
+    c = _client(d)
+    c._carry_over()
+    (msg,) = c.queued
+    assert msg["type"] == "conversation.item.create" and msg["item"]["role"] == "system"
+    assert "le equazioni" in msg["item"]["content"][0]["text"]
+
+
+@pytest.mark.asyncio
+async def test_a_parked_session_is_told_what_was_said_while_it_waited():
+    d = Digest()
+    c = _client(d, parked=True)
+    c._ws = object()
+    c._safe_send = lambda msg: asyncio.sleep(0)
+    d.add(dg.STUDENT, "voglio Galileo, parliamo dei pianeti")
+    c._activate()
+    assert [m["item"]["role"] for m in c.queued] == ["system"]
+    assert "pianeti" in c.queued[0]["item"]["content"][0]["text"]
@@ -0,0 +1,125 @@
+"""A slow answer is announced by a soft cue, not by dead air.
+
+Between the end of the child's turn and the first audio of the reply there was
+nothing to hear; on a slow link long enough for a child to think Buddy had not
+heard and say it all again. A short pre-rendered cue now fills the wait once it
+outlasts a delay, and is cut the moment the real answer plays. How long each
+wait was is measured every turn.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+from reachy_mini_mirrorbuddy import earcons
+from reachy_mini_mirrorbuddy.audio_io import AudioIO
+from reachy_mini_mirrorbuddy.azure_realtime import AzureRealtimeClient
+from reachy_mini_mirrorbuddy.playback import PlaybackEngine
+
+
+def test_cues_are_rendered_once_ready_for_the_speaker():
+    cue = earcons.render(earcons.LISTENING, 16000, 3.2)
+    assert cue.dtype == np.float32 and not cue.flags.writeable
+    assert 0.0 < float(np.abs(cue).max()) < 1.0
+    assert earcons.render(earcons.LISTENING, 16000, 3.2) is cue
+    assert earcons.render(earcons.THINKING, 16000, 3.2).size < 16000  # well under a second
+
+
+def test_rendered_audio_skips_the_render_step():
+    rendered, pushed = [], []
+    engine = PlaybackEngine(lambda s, r: rendered.append(s) or s.astype(np.float32), pushed.append)
+    engine.submit(np.zeros(160, dtype=np.float32), 16000)
+    assert rendered == [] and sum(p.size for p in pushed) == 160
+
+
+# --------------------------------------------------------------------- the speaker
+@pytest.fixture
+def io(robot):
+    io = AudioIO(robot, on_input_pcm16=lambda b: None, voice_gate=False, earcon_delay_ms=500)
+    io._probe_rates()
+    return io
+
+
+def _reply(io):
+    io.play_output(np.zeros(2400, dtype=np.int16).tobytes())
+
+
+def test_a_quick_answer_needs_no_cue(io):
+    io.expect_reply()
+    io._check_earcon(io._reply_wait_from + 0.3)
+    _reply(io)
+    counters = io.earcon_counters()
+    assert counters["replies"] == 1 and counters["cued"] == 0
+    assert io.robot.media.flushes == 0
+
+
+def test_a_slow_answer_is_cued_and_the_cue_cut(io):
+    io.expect_reply()
+    io._reply_wait_from -= 0.6  # the turn ended 600 ms ago
+    io._earcon_due -= 0.6
+    io._check_earcon(time.monotonic())
+    cue = earcons.render(earcons.LISTENING, 16000, io.output_gain)
+    assert sum(p.size for p in io.robot.media.pushed) == cue.size
+    _reply(io)
+    assert io.robot.media.flushes == 1  # the cue gave way to the answer
+    counters = io.earcon_counters()
+    assert counters["cued"] == 1 and 0.0 <= counters["cued_s"] < 0.05
+    assert counters["latency_p50_s"] == pytest.approx(0.6, abs=0.05)
+
+
+def test_a_long_wait_gets_a_few_cues_then_silence(io):
+    io.expect_reply()
+    t = io._reply_wait_from
+    for step in range(40):
+        io.playback.clear()  # each cue has finished playing
+        io._check_earcon(t + 0.5 + step * 0.5)
+    assert io._earcon_cues == 3
+
+
+def test_no_cue_when_no_answer_is_coming(io):
+    io.expect_reply()
+    io.cancel_reply()
+    io._check_earcon(io._reply_wait_from + 10.0)
+    assert io.robot.media.pushed == []
+
+
+def test_no_cue_while_resting(io):
+    io.is_resting = lambda: True
+    io.expect_reply()
+    io._check_earcon(io._reply_wait_from + 10.0)
+    assert io.robot.media.pushed == [] and not io._earcon_due
+
+
+# --------------------------------------------------------------------- the client
+@pytest.mark.asyncio
+async def test_the_client_says_when_a_reply_is_awaited():
+    waits = []
+    c = AzureRealtimeClient(
+        ws_url="wss://x", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"}, on_awaiting_reply=waits.append,
+    )
+    await c._handle_event({"type": "input_audio_buffer.speech_stopped"})
+    await c._handle_event(
+        {"type": "conversation.item.input_audio_transcription.completed", "transcript": " "}
+    )
+    assert waits == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_a_response_without_audio_ends_the_wait():
+    waits = []
+    c = AzureRealtimeClient(
+        ws_url="wss://x", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"}, on_awaiting_reply=waits.append,
+    )
+    c._safe_send = lambda msg: asyncio.sleep(0)
+    await c._handle_event({"type": "response.created"})
+    await c._handle_event({"type": "response.done", "response": {"status": "completed"}})
+    assert waits == [False]  # a tool call only: no answer to cue for
+    await c._handle_event({"type": "response.created"})
+    await c._handle_event({"type": "response.output_audio.delta", "delta": "AAA="})
+    await c._handle_event({"type": "response.done", "response": {"status": "completed"}})
+    assert waits == [False]
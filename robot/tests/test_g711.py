@@ -0,0 +1,89 @@
+"""G.711 on the wire: a sixth of the bandwidth, and the same int16 audio path inside.
+
+On a weak home Wi-Fi the realtime audio is the biggest thing on the air. μ-law
+and A-law at 8 kHz cut it to a sixth, but only if the session, the mic encoder
+and the speaker decoder all agree — and the barge-in, gate and lip-sync keep
+working on plain int16 samples.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from reachy_mini_mirrorbuddy.audio_dsp import g711_decode, g711_encode
+from reachy_mini_mirrorbuddy.audio_io import AudioIO
+from reachy_mini_mirrorbuddy.mic_chain import MicChain
+from reachy_mini_mirrorbuddy.rt_messages import session_update
+
+
+@pytest.mark.parametrize("law,silence", [("pcmu", 0xFF), ("pcma", 0xD5)])
+def test_silence_encodes_to_the_standard_code(law, silence):
+    assert g711_encode(np.zeros(4, dtype=np.int16), law) == bytes([silence]) * 4
+
+
+@pytest.mark.parametrize("law", ["pcmu", "pcma"])
+def test_a_round_trip_keeps_the_voice(law):
+    t = np.arange(8000) / 8000
+    voice = (np.sin(2 * np.pi * 220 * t) * 12000).astype(np.int16)
+    back = g711_decode(g711_encode(voice, law), law).astype(np.float64)
+    noise = back - voice
+    snr = 10 * np.log10(np.mean(voice.astype(np.float64) ** 2) / np.mean(noise**2))
+    assert snr > 30  # companding noise, not distortion
+
+
+@pytest.mark.parametrize("law", ["pcmu", "pcma"])
+def test_every_sample_encodes_and_the_decoder_is_monotonic(law):
+    every = np.arange(-32768, 32768, dtype=np.int32).astype(np.int16)
+    codes = g711_encode(every, law)
+    assert len(codes) == every.size  # one byte per sample, no overflow at the extremes
+    back = g711_decode(codes, law)
+    assert np.all(np.diff(back.astype(np.int32)) >= 0)
+
+
+def test_an_unknown_law_is_refused():
+    with pytest.raises(ValueError):
+        g711_encode(np.zeros(1, dtype=np.int16), "mp3")
+
+
+@pytest.mark.parametrize(
+    "fmt,ga,preview",
+    [
+        ("pcm16", {"type": "audio/pcm", "rate": 24000}, "pcm16"),
+        ("pcmu", {"type": "audio/pcmu"}, "g711_ulaw"),
+        ("pcma", {"type": "audio/pcma"}, "g711_alaw"),
+    ],
+)
+def test_the_session_negotiates_the_format_both_ways(fmt, ga, preview):
+    args = ("hi", "alloy", {"type": "server_vad"}, None)
+    audio = session_update(*args, use_ga=True, audio_format=fmt)["session"]["audio"]
+    assert audio["input"]["format"] == ga and audio["output"]["format"] == ga
+    legacy = session_update(*args, use_ga=False, audio_format=fmt)["session"]
+    assert legacy["input_audio_format"] == legacy["output_audio_format"] == preview
+
+
+def test_the_mic_chain_sends_one_byte_per_8khz_sample():
+    chain = MicChain(16000, 8000, encoder=lambda pcm: g711_encode(pcm, "pcmu"))
+    sent = 0
+    for _ in range(50):  # one second of 20 ms blocks
+        chain.process(np.full(320, 1000, dtype=np.int16))
+        sent += len(chain.serialise())
+    assert abs(sent - 8000) <= 8  # vs 48000 bytes of PCM16 at 24 kHz
+
+
+def test_model_speech_in_g711_is_decoded_for_the_speaker(robot):
+    io = AudioIO(robot, on_input_pcm16=lambda b: None, audio_format="pcma", voice_gate=False)
+    io._probe_rates()
+    t = np.arange(800) / 8000
+    speech = (np.sin(2 * np.pi * 300 * t) * 8000).astype(np.int16)
+    io.play_output(g711_encode(speech, "pcma"))  # 100 ms at 8 kHz
+    out = np.concatenate(robot.media.pushed)
+    assert abs(out.size - 1600) <= 2  # 100 ms at the 16 kHz speaker
+    assert np.max(np.abs(out)) > 0.1  # a voice, not garbage-as-int16 or silence
+
+
+def test_local_pcm16_sounds_still_play_at_24khz_under_g711(robot):
+    io = AudioIO(robot, on_input_pcm16=lambda b: None, audio_format="pcmu", voice_gate=False)
+    io._probe_rates()
+    io.play(np.zeros(2400, dtype=np.int16).tobytes())  # the bell: 100 ms at 24 kHz
+    out = np.concatenate(robot.media.pushed)
+    assert abs(out.size - 1600) <= 2
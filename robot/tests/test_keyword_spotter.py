@@ -0,0 +1,247 @@
+"""Stop and wake words are heard on the robot, before Whisper has had its say.
+
+The transcript takes hundreds of milliseconds to come back, and while the robot
+rests it is the only way back at all. The mic thread now matches a few enrolled
+recordings of each word itself: a stop hushes Buddy at once, a wake lifts the
+rest at once — and the transcript that follows still confirms either, so a false
+alarm never costs the child a turn.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import tracemalloc
+import wave
+
+import numpy as np
+import pytest
+
+from reachy_mini_mirrorbuddy import rt_messages, session_flow
+from reachy_mini_mirrorbuddy.azure_realtime import AzureRealtimeClient
+from reachy_mini_mirrorbuddy.keyword_spotter import KeywordSpotter, action_for, mfcc
+
+RATE = 16000
+BLOCK = 320
+DONE = "conversation.item.input_audio_transcription.completed"
+
+# Crude vowel sequences (first two formants): enough to tell words apart.
+ZITTO = [(300, 2300), (300, 2300), (500, 1000), (450, 900)]
+BUDDY = [(650, 1200), (650, 1200), (300, 2200)]
+OTHER = [(800, 1300), (800, 1300), (350, 800), (350, 800)]
+
+
+def _word(formants, seed=0, jitter=0.08) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    parts = []
+    f0 = 240 * (1 + rng.uniform(-jitter, jitter))
+    for f1, f2 in formants:
+        n = int(RATE * 0.12 * (1 + rng.uniform(-jitter, jitter)))
+        t = np.arange(n) / RATE
+        seg = np.zeros(n)
+        for h in range(1, 20):
+            fh = h * f0
+            amp = np.exp(-(((fh - f1) / 150) ** 2)) + 0.6 * np.exp(-(((fh - f2) / 250) ** 2)) + 0.02
+            seg += amp * np.sin(2 * np.pi * fh * t + rng.uniform(0, 6))
+        parts.append(seg)
+    s = np.concatenate(parts)
+    return (s * np.hanning(s.size) ** 0.3 / np.abs(s).max() * 8000).astype(np.float32)
+
+
+def _spotter() -> KeywordSpotter:
+    spotter = KeywordSpotter(RATE)
+    for i in range(3):
+        spotter.add_template("zitto", _word(ZITTO, seed=i), RATE)
+        spotter.add_template("buddy", _word(BUDDY, seed=10 + i), RATE)
+    return spotter
+
+
+def _stream(spotter, word_audio) -> tuple[str | None, float]:
+    """Feed quiet + word + quiet in 20 ms blocks; return the hit and its delay in ms."""
+    rng = np.random.default_rng(99)
+    lead = rng.normal(0, 50, RATE // 2)
+    audio = np.concatenate([lead, word_audio, rng.normal(0, 50, RATE // 2)]).astype(np.float32)
+    word_end = (lead.size + word_audio.size) / RATE
+    for start in range(0, audio.size - BLOCK + 1, BLOCK):
+        block = audio[start:start + BLOCK]
+        voiced = float(np.sqrt(np.mean(block**2))) / 32768.0 > 0.01
+        now = (start + BLOCK) / RATE
+        hit = spotter.feed(block, voiced, now=now)
+        if hit:
+            return hit, (now - word_end) * 1000.0
+    return None, 0.0
+
+
+@pytest.mark.parametrize("formants,word", [(ZITTO, "zitto"), (BUDDY, "buddy")])
+def test_an_enrolled_word_is_spotted_as_it_ends(formants, word):
+    hit, delay_ms = _stream(_spotter(), _word(formants, seed=50))
+    assert hit == word
+    assert delay_ms < 150  # at the end of the word, not a server round-trip later
+
+
+@pytest.mark.parametrize("audio", [_word(OTHER, seed=52), np.random.default_rng(1).normal(0, 3000, RATE // 2)])
+def test_other_speech_and_noise_are_not_keywords(audio):
+    assert _stream(_spotter(), audio.astype(np.float32))[0] is None
+
+
+def test_silence_costs_no_matching():
+    spotter = _spotter()
+    for i in range(100):
+        spotter.feed(np.zeros(BLOCK, dtype=np.float32), False, now=i * 0.02)
+    assert spotter.checks == 0
+
+
+def test_the_stream_is_analysed_hop_by_hop_as_a_whole_recording_would_be():
+    spotter = _spotter()
+    audio = np.concatenate([_word(ZITTO, seed=7), _word(BUDDY, seed=8)])
+    sizes = np.random.default_rng(3).integers(1, 900, 200)
+    start = 0
+    for size in sizes:
+        spotter.feed(audio[start:start + size], False, now=10.0)  # nobody talking: no matching
+        start += size
+        if start >= audio.size:
+            break
+    whole = mfcc(audio, RATE)[-spotter._max_frames:]
+    assert spotter._feats.shape == whole.shape
+    np.testing.assert_allclose(spotter._feats, whole, rtol=1e-3, atol=1e-3)
+
+
+def test_steady_state_blocks_allocate_no_spectra():
+    spotter = _spotter()
+    block = np.random.default_rng(4).normal(0, 50, BLOCK).astype(np.float32)
+    for i in range(300):  # warm up, and wrap the ring at least once
+        spotter.feed(block, False, now=10.0 + i * 0.02)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        for i in range(300):
+            spotter.feed(block, False, now=20.0 + i * 0.02)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    assert peak < 4096  # ~40 KB of concatenations and spectra before
+
+
+def test_templates_load_from_a_folder_per_word(tmp_path):
+    for word, formants in (("zitto", ZITTO), ("buddy", BUDDY)):
+        folder = tmp_path / word
+        folder.mkdir()
+        for i in range(2):
+            with wave.open(str(folder / f"take{i}.wav"), "wb") as w:
+                w.setnchannels(1)
+                w.setsampwidth(2)
+                w.setframerate(RATE)
+                w.writeframes(_word(formants, seed=i).astype(np.int16).tobytes())
+    (tmp_path / "zitto" / "notes.txt").write_text("ignored")
+    spotter = KeywordSpotter(RATE)
+    assert spotter.load_dir(tmp_path) == 4
+    assert spotter.words == ["buddy", "zitto"]
+    assert spotter.threshold_for("zitto") > 0
+
+
+def test_words_map_to_the_transcript_actions():
+    assert action_for("zitto") == session_flow.REST
+    assert action_for("basta") == session_flow.PAUSE
+    assert action_for("buddy") == session_flow.WAKE
+    assert action_for("ciao") is None
+
+
+# --------------------------------------------------------------------- the client
+@pytest.fixture
+def client():
+    c = AzureRealtimeClient(
+        ws_url="wss://x", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"},
+    )
+    c.sent, c.queued, c.flushed, c.slept, c.woken = [], [], 0, 0, 0
+
+    async def capture(msg):
+        c.sent.append(msg)
+
+    def count(name):
+        def cb():
+            setattr(c, name, getattr(c, name) + 1)
+        return cb
+
+    c._safe_send = capture
+    c._enqueue = lambda msg, kind=None: c.queued.append(msg)
+    c.on_speech_started = count("flushed")
+    c.on_sleep = count("slept")
+    c.on_wake = count("woken")
+    return c
+
+
+def test_a_spotted_stop_hushes_buddy_at_once(client):
+    client._responding = True
+    client.local_keyword(session_flow.REST)
+    assert client._quiet and client._suppress
+    assert rt_messages.CANCEL in client.queued
+    assert client.flushed == 1
+    assert not client._asleep  # the rest itself waits for the transcript
+
+
+@pytest.mark.asyncio
+async def test_the_transcript_confirms_a_spotted_rest(client):
+    client.local_keyword(session_flow.REST)
+    await client._handle_event({"type": DONE, "transcript": "zitto"})
+    assert client._asleep and client.slept == 1
+
+
+@pytest.mark.asyncio
+async def test_a_false_stop_costs_only_the_sentence(client):
+    client.local_keyword(session_flow.PAUSE)
+    await client._handle_event({"type": DONE, "transcript": "quanto fa sette per otto?"})
+    assert not client._quiet
+    assert any('"response.create"' in m for m in client.sent)  # the question is answered
+
+
+def test_a_spotted_wake_lifts_the_rest_silently(client):
+    client._asleep = True
+    client.local_keyword(session_flow.WAKE)
+    assert not client._asleep and client.woken == 1
+    assert client.queued == [] and client.sent == []  # nothing said yet
+
+
+@pytest.mark.asyncio
+async def test_the_transcript_greets_after_a_spotted_wake(client):
+    client._asleep = True
+    client.local_keyword(session_flow.WAKE)
+    await client._handle_event({"type": DONE, "transcript": "Buddy!"})
+    assert any(rt_messages.WAKE_INSTR[:30] in m for m in client.sent)
+    assert client.woken == 1  # the body woke once, on the spotted word
+
+
+@pytest.mark.asyncio
+async def test_an_unconfirmed_wake_goes_back_to_rest(client):
+    client._asleep = True
+    since = client._asleep_since
+    time.sleep(0.01)
+    client.local_keyword(session_flow.WAKE)
+    await client._handle_event({"type": DONE, "transcript": "e poi la televisione ha detto"})
+    assert client._asleep and client.slept == 1
+    assert client._asleep_since == since  # the rest timeout keeps counting from its start
+    assert client.sent == []
+
+
+def test_a_stop_is_ignored_while_resting(client):
+    client._asleep = True
+    client.local_keyword(session_flow.REST)
+    assert client.flushed == 0 and not client._quiet
+
+
+def test_a_spotted_word_is_handled_on_the_client_loop(client):
+    import asyncio
+
+    loop = asyncio.new_event_loop()
+    seen = []
+    client._loop = loop
+    client._asleep = True
+    client.on_wake = lambda: seen.append(threading.current_thread())
+    try:
+        client.local_keyword(session_flow.WAKE)
+        assert seen == [] and client._asleep  # nothing done on the mic thread
+        loop.run_until_complete(asyncio.sleep(0))
+    finally:
+        loop.close()
+    assert seen == [threading.current_thread()] and not client._asleep
@@ -11,6 +11,7 @@ instant the child wants it to, and it must never require a body that works.
 
 from __future__ import annotations
 
+import numpy as np
 import pytest
 from reachy_mini_mirrorbuddy import meditation
 from reachy_mini_mirrorbuddy.azure_realtime import AzureRealtimeClient
@@ -32,26 +33,59 @@ def client():
     c._safe_send = capture
     # Without a socket _enqueue drops everything, which would make every
     # "it stayed silent" assertion pass for the wrong reason.
-    c._enqueue = c.sent.append
+    c._enqueue = lambda msg, kind=None: c.sent.append(msg)
     return c
 
 
 class TestTheBell:
     def test_the_bell_is_real_audio(self):
-        pcm = meditation.bell_pcm16(seconds=1.0, sample_rate=24000)
-        assert len(pcm) == 2 * 24000  # 16-bit mono
+        out = meditation.speaker_bell(1.0, 24000, 3.2)
+        assert out.dtype == np.float32 and out.size == 24000  # mono, at the speaker rate
+        assert float(np.abs(out).max()) > 0.3
 
     def test_the_bell_fades_instead_of_stopping(self):
         # A bell cut off mid-ring is a door slamming in a room asked to be quiet.
-        pcm = meditation.bell_pcm16(seconds=1.0, sample_rate=24000)
-        head = max(abs(int.from_bytes(pcm[i:i + 2], "little", signed=True)) for i in range(0, 2000, 2))
-        tail = max(abs(int.from_bytes(pcm[i:i + 2], "little", signed=True)) for i in range(len(pcm) - 2000, len(pcm), 2))
-        assert tail < head / 10
+        out = np.abs(meditation.speaker_bell(2.0, 24000, 1.0))
+        assert out[-1000:].max() < out[:1000].max() / 10
 
     def test_the_bell_never_clips(self):
-        pcm = meditation.bell_pcm16(seconds=2.0, sample_rate=24000)
-        peak = max(abs(int.from_bytes(pcm[i:i + 2], "little", signed=True)) for i in range(0, len(pcm), 2))
-        assert peak <= 32767
+        assert float(np.abs(meditation.speaker_bell(2.0, 24000, 8.0)).max()) < 1.0
+
+    def test_the_bell_sounds_as_it_always_did(self):
+        # The vectorised bell is the same strike the per-sample loop produced,
+        # through the same soft clip as speech.
+        import math
+
+        gain = 3.2
+        out = meditation.speaker_bell(1.0, 24000, gain)
+        peak = sum(a for _, a in meditation._PARTIALS)
+        for i in (0, 17, 1000, 12345, 23999):
+            t = i / 24000
+            s = sum(a * math.sin(2 * math.pi * meditation._FUNDAMENTAL_HZ * r * t)
+                    for r, a in meditation._PARTIALS)
+            strike = s / peak * math.exp(-meditation._DECAY * t) * 0.7
+            assert abs(float(out[i]) - math.tanh(strike * gain * 0.85)) < 1e-5
+
+    def test_the_bell_is_rendered_once_per_length_and_rate(self):
+        first = meditation.speaker_bell(3.0, 16000, 3.2)
+        assert meditation.speaker_bell(3.0, 16000, 3.2) is first
+        assert first.dtype == np.float32 and first.size == 48000 and not first.flags.writeable
+
+    def test_the_bell_skips_resampling_and_lip_sync(self, robot):
+        from reachy_mini_mirrorbuddy.audio_io import AudioIO
+
+        class Body:
+            fed = 0
+
+            def feed(self, audio, rate):
+                self.fed += 1
+
+        body = Body()
+        io = AudioIO(robot, on_input_pcm16=lambda b: None, movements=body, voice_gate=False)
+        io.play_bell(0.5)
+        pushed = np.concatenate(robot.media.pushed)
+        assert np.array_equal(pushed, meditation.speaker_bell(0.5, 16000, io.output_gain))
+        assert body.fed == 0  # the antennas do not "talk" along with a bell
 
 
 class TestSilenceIsImposedNotRequested:
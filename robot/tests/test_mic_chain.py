@@ -0,0 +1,125 @@
+"""The mic chain decides barge-in, so it must be cheap, steady and exact.
+
+It runs on the thread that notices the child speaking over Buddy. Every
+temporary array it leaves behind is garbage collected on that thread, at a time
+nobody chose — so the chain writes into buffers it owns, and it must still
+produce exactly what the old one-liner-per-step loop produced.
+"""
+
+from __future__ import annotations
+
+import tracemalloc
+
+import numpy as np
+import pytest
+from reachy_mini_mirrorbuddy.mic_chain import STAGES, MicChain
+
+
+def _old_rms_and_int16(sample) -> tuple[float, np.ndarray]:
+    """The loop as it was before the chain: the reference behaviour."""
+    audio = sample if isinstance(sample, np.ndarray) else np.frombuffer(sample, dtype=np.int16)
+    if audio.ndim == 2:
+        audio = audio.mean(axis=1)
+    if audio.dtype != np.int16:
+        if np.issubdtype(audio.dtype, np.floating):
+            audio = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+        else:
+            audio = audio.astype(np.int16)
+    rms = float(np.sqrt(np.mean((audio.astype(np.float32) / 32768.0) ** 2)))
+    return rms, audio
+
+
+def _voice(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (np.sin(np.arange(n) * 0.07) * 0.4 + rng.normal(0, 0.05, n)).astype(np.float32)
+
+
+@pytest.mark.parametrize(
+    "sample",
+    [
+        (_voice(320) * 32767).astype(np.int16),
+        (_voice(320) * 32767).astype(np.int16).tobytes(),
+        np.stack([_voice(320), _voice(320, 1)], axis=1),  # stereo float32
+        _voice(320) * 3.0,  # a float block that clips
+    ],
+    ids=["int16", "bytes", "stereo-float", "clipping"],
+)
+def test_the_rms_matches_the_old_loop(sample):
+    chain = MicChain(16000, 16000)
+    expected_rms, expected_pcm = _old_rms_and_int16(sample)
+    assert chain.process(sample) == pytest.approx(expected_rms, rel=1e-3, abs=1e-5)
+    pcm = np.frombuffer(chain.serialise(), dtype=np.int16)
+    assert np.max(np.abs(pcm.astype(np.int32) - expected_pcm)) <= 1  # rounding only
+
+
+def test_stereo_int16_is_averaged_not_mistaken_for_floats():
+    """The old loop's float64 mean made int16 stereo look like ±1.0 floats, so any
+    such block was clipped to full scale and read as a shout."""
+    mono = (_voice(320) * 32767).astype(np.int16)
+    chain = MicChain(16000, 16000)
+    rms = chain.process(np.stack([mono, mono], axis=1))
+    expected = float(np.sqrt(np.mean((mono.astype(np.float32) / 32768.0) ** 2)))
+    assert rms == pytest.approx(expected, rel=1e-3)
+
+
+def test_the_output_is_at_the_realtime_rate():
+    chain = MicChain(16000, 24000)
+    total = 0
+    for _ in range(50):
+        chain.process((_voice(320) * 32767).astype(np.int16))
+        total += len(chain.serialise()) // 2
+    assert abs(total - 50 * 480) <= 1
+
+
+def test_steady_state_blocks_allocate_nothing_but_the_wire_bytes():
+    chain = MicChain(16000, 24000)
+    block = np.stack([_voice(320), _voice(320, 1)], axis=1)
+    for _ in range(5):  # warm the caches
+        chain.process(block)
+        chain.serialise()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for _ in range(50):
+            chain.process(block)
+            chain.serialise()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    grown = sum(s.size_diff for s in after.compare_to(before, "filename") if s.size_diff > 0)
+    assert grown < 4096  # no per-block arrays retained or piling up
+
+
+def test_a_bigger_block_grows_the_buffers_once():
+    chain = MicChain(16000, 24000)
+    big = (_voice(16000) * 32767).astype(np.int16)
+    chain.process(big)
+    assert len(chain.serialise()) // 2 == pytest.approx(24000, abs=2)
+
+
+def test_hops_are_10ms_whatever_the_block_size_and_carry_across_blocks():
+    rng = np.random.default_rng(5)
+    audio = (rng.normal(0, 0.1, 16000) * 32767).astype(np.int16)
+    expected = np.sqrt(np.mean((audio.astype(np.float64).reshape(100, 160) / 32768.0) ** 2, axis=1))
+    for block in (160, 256, 1024):  # 10 ms, 16 ms and 64 ms blocks
+        chain = MicChain(16000, 24000)
+        got = []
+        for start in range(0, audio.size, block):
+            chain.process(audio[start:start + block])
+            got.extend(chain.hops.tolist())
+        assert len(got) == 100
+        np.testing.assert_allclose(got, expected, rtol=1e-4)
+
+
+def test_every_stage_is_timed():
+    chain = MicChain(16000, 24000)
+    for _ in range(10):
+        chain.process((_voice(320) * 32767).astype(np.int16))
+        chain.serialise()
+    times = chain.timer.snapshot()
+    assert tuple(times) == STAGES
+    assert all(v >= 0 for v in times.values())
+    assert chain.timer.blocks == 10
+    assert "µs/block" in chain.timer.describe()
+    chain.timer.reset()
+    assert chain.timer.blocks == 0
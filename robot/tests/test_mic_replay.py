@@ -0,0 +1,136 @@
+"""What the child says during a reconnect reaches the next session.
+
+A Wi-Fi drop or the 60-minute session expiry used to throw away every mic
+packet until the new socket was up: a question asked in those seconds was never
+heard. The audio is now held, time-stamped and bounded, and appended right
+after the next ``session.update`` — unless it has grown too old to answer.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from reachy_mini_mirrorbuddy.azure_realtime import AzureRealtimeClient
+from reachy_mini_mirrorbuddy.mic_replay import MicReplay
+
+BPS = 48000  # PCM16 at 24 kHz
+PACKET = b"\x01\x00" * 2400  # 100 ms
+
+
+def test_nothing_is_held_while_connected():
+    replay = MicReplay(BPS)
+    assert replay.offer(PACKET, now=0.0) is False
+    assert replay.release(now=1.0) == b""
+    assert replay.gaps == 0
+
+
+def test_speech_in_the_gap_is_replayed_in_order():
+    replay = MicReplay(BPS)
+    replay.hold(now=10.0)
+    parts = [bytes([i]) * 4800 for i in range(5)]
+    for i, part in enumerate(parts):
+        assert replay.offer(part, now=10.5 + i * 0.1)
+    out = replay.release(now=12.0)
+    assert out == b"".join(parts)
+    assert replay.last_gap_s == pytest.approx(2.0)
+    assert replay.replayed_s == pytest.approx(0.5)
+    assert replay.offer(PACKET, now=12.1) is False  # live again
+
+
+def test_the_ring_is_bounded_oldest_out():
+    replay = MicReplay(BPS, max_s=1.0)
+    replay.hold(now=0.0)
+    for i in range(30):  # 3 s of speech into a 1 s ring
+        replay.offer(bytes([i]) * 4800, now=i * 0.1)
+    out = replay.release(now=3.0)
+    assert len(out) == BPS
+    assert out[-1] == 29
+    assert replay.dropped_s == pytest.approx(2.0)
+
+
+def test_stale_speech_is_dropped_with_the_rest_of_its_sentence():
+    replay = MicReplay(BPS, max_age_s=5.0)
+    replay.hold(now=0.0)
+    for i in range(20):  # one sentence from t=0 to t=2, straddling the age limit
+        replay.offer(PACKET, now=i * 0.1)
+    for i in range(5):  # a new one after a pause
+        replay.offer(b"\x02\x00" * 2400, now=5.0 + i * 0.1)
+    out = replay.release(now=6.0)
+    assert out == b"\x02\x00" * 12000  # only the second sentence, whole
+    assert replay.dropped_s == pytest.approx(2.0)
+
+
+def test_without_pauses_fresh_speech_is_not_dropped_with_the_stale():
+    replay = MicReplay(BPS, max_age_s=5.0)  # MIRRORBUDDY_VOICE_GATE=0: the mic never pauses
+    replay.hold(now=0.0)
+    for i in range(100):
+        replay.offer(PACKET, now=i * 0.1)
+    out = replay.release(now=10.0)
+    assert len(out) == BPS * 5  # the last 5 s, still fresh
+    assert replay.dropped_s == pytest.approx(5.0)
+
+
+# --------------------------------------------------------------------- the client
+@pytest.fixture
+def client(monkeypatch):
+    c = AzureRealtimeClient(
+        ws_url="wss://x", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"},
+    )
+    c.live = []
+    c._enqueue = lambda msg, kind=None: c.live.append(msg)
+
+    async def no_sleep(d):
+        pass
+
+    monkeypatch.setattr(asyncio, "sleep", no_sleep)
+    return c
+
+
+@pytest.mark.asyncio
+async def test_a_dropped_session_holds_the_mic_until_the_next_one(client):
+    async def connect():
+        client._ready.set()  # the first session came up, then dropped
+        client._stop.set()
+
+    client._connect_and_listen = connect
+    client._stop.clear()
+    await client._session_loop()
+    assert not client._replay.holding  # a deliberate stop is not a gap
+
+    async def drop():
+        client._ready.set()
+        if client.connects == 1:
+            client._stop.set()
+        client.connects += 1
+
+    client.connects = 0
+    client._stop.clear()
+    client._connect_and_listen = drop
+    await client._session_loop()
+    assert client._replay.holding
+    client.send_audio_pcm16(PACKET)
+    assert client.live == []  # kept, not thrown at a dead socket
+
+
+class _WS:
+    def __init__(self):
+        self.sent: list[dict] = []
+
+    async def send(self, msg, text=None):
+        self.sent.append(json.loads(msg))
+
+
+@pytest.mark.asyncio
+async def test_the_gap_is_replayed_before_any_live_audio(client):
+    client._replay.hold()
+    client.send_audio_pcm16(PACKET)
+    client.send_audio_pcm16(PACKET)
+    ws = _WS()
+    await client._replay_gap(ws)
+    assert [m["type"] for m in ws.sent] == ["input_audio_buffer.append"]
+    assert client.replay_counters()["replayed_s"] == pytest.approx(0.2)
+    client.send_audio_pcm16(PACKET)
+    assert len(client.live) == 1  # and then the mic is live again
@@ -0,0 +1,114 @@
+"""Outbound messages go out in order of what cannot wait.
+
+Every message used to be its own coroutine on the loop, in no particular order:
+a cancel on barge-in queued behind mic audio, and a homework photo held up the
+mic for as long as it took to upload. One sender now drains three queues —
+control, then audio, then images — drops mic audio too old to matter and paces
+large images so the mic keeps flowing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+from reachy_mini_mirrorbuddy import outbox
+from reachy_mini_mirrorbuddy.azure_realtime import AzureRealtimeClient
+from reachy_mini_mirrorbuddy.outbox import AUDIO, CONTROL, IMAGE, Outbox
+
+PHOTO = "i" * 100_000
+
+
+async def _drain(box: Outbox, sent: list, until: int, on_send=None) -> None:
+    async def send(msg):
+        sent.append(msg)
+        if on_send:
+            on_send(msg)
+
+    task = asyncio.ensure_future(box.run(send))
+    for _ in range(200):
+        if len(sent) >= until:
+            break
+        await asyncio.sleep(0.005)
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_control_goes_before_audio_before_images():
+    box = Outbox()
+    for i in range(3):
+        box.put(f"a{i}", AUDIO)
+    box.put("photo", IMAGE)
+    box.put("cancel", CONTROL)
+    sent = []
+    await _drain(box, sent, 5)
+    assert sent == ["cancel", "a0", "a1", "a2", "photo"]
+
+
+@pytest.mark.asyncio
+async def test_stale_mic_audio_is_dropped_not_sent_late():
+    box = Outbox(audio_max_age_s=0.01)
+    box.put("old", AUDIO)
+    time.sleep(0.03)
+    box.put("fresh", AUDIO)
+    sent = []
+    await _drain(box, sent, 1)
+    assert sent == ["fresh"]
+    assert box.counters()[AUDIO]["dropped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_the_mic_catches_up_between_large_images():
+    box = Outbox(image_gap_s=0.05)
+    box.put(PHOTO + "1", IMAGE)
+    box.put(PHOTO + "2", IMAGE)
+    sent, at = [], {}
+
+    def on_send(msg):
+        at[msg[-1]] = time.monotonic()
+        if msg == PHOTO + "1":
+            box.put("mic", AUDIO)  # captured while the first photo was uploading
+
+    await _drain(box, sent, 3, on_send)
+    assert [m[-3:] for m in sent] == ["ii1", "mic", "ii2"]
+    assert at["2"] - at["1"] >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_an_idle_sender_is_woken_from_another_thread():
+    box = Outbox()
+    sent = []
+
+    async def send(msg):
+        sent.append(msg)
+
+    task = asyncio.ensure_future(box.run(send))
+    await asyncio.sleep(0.01)  # nothing queued: the sender waits
+    threading.Thread(target=box.put, args=("cancel",)).start()
+    for _ in range(100):
+        if sent:
+            break
+        await asyncio.sleep(0.005)
+    task.cancel()
+    assert sent == ["cancel"]
+    counters = box.counters()[CONTROL]
+    assert counters["sent"] == 1 and counters["latency_p50_ms"] < 500
+
+
+def test_the_client_files_each_message_in_its_class():
+    c = AzureRealtimeClient(
+        ws_url="wss://x", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"},
+    )
+    c.send_audio_pcm16(b"\0\0")  # no socket: nothing is queued for later
+    assert c._outbox.depth(AUDIO) == 0
+    c._ws = object()
+    c.send_audio_pcm16(b"\0\0")
+    c.send_image_jpeg(b"\xff\xd8jpeg", "leggi")
+    c.local_barge_in()
+    c._responding = True
+    c.local_barge_in()
+    assert (c._outbox.depth(CONTROL), c._outbox.depth(AUDIO), c._outbox.depth(IMAGE)) == (1, 1, 2)
+    assert set(c.outbox_counters()) == {outbox.CONTROL, outbox.AUDIO, outbox.IMAGE}
@@ -0,0 +1,80 @@
+"""Mic audio goes upstream in fixed packets, never held back at a turn boundary.
+
+Every packet costs a base64 pass, a JSON dump and a thread hop, so fewer and
+larger is cheaper — but a child interrupting Buddy must not wait for a packet
+to fill before the server hears him.
+"""
+
+from __future__ import annotations
+
+from reachy_mini_mirrorbuddy.packetizer import MAX_PACKET_MS, MicPacketizer
+
+RATE = 24000
+MS = RATE * 2 // 1000  # bytes of PCM16 per millisecond
+
+
+def _packetizer(packet_ms: float = 40.0):
+    sent: list[bytes] = []
+    return MicPacketizer(sent.append, packet_ms, RATE), sent
+
+
+def test_small_blocks_become_fixed_packets():
+    p, sent = _packetizer(40)
+    for _ in range(10):
+        p.push(b"\x01" * (10 * MS))  # 10 ms blocks from the media server
+    assert [len(x) for x in sent] == [40 * MS, 40 * MS]
+    assert p.pending == 20 * MS
+
+
+def test_a_big_block_is_cut_into_several_packets():
+    p, sent = _packetizer(20)
+    p.push(b"\x02" * (50 * MS))
+    assert [len(x) for x in sent] == [20 * MS, 20 * MS]
+    assert p.pending == 10 * MS
+
+
+def test_no_byte_is_lost_or_reordered():
+    p, sent = _packetizer(30)
+    data = bytes(range(256)) * 40
+    for i in range(0, len(data), 374):
+        p.push(data[i:i + 374])
+    p.flush()
+    assert b"".join(sent) == data
+
+
+def test_a_flush_sends_the_partial_packet_now():
+    p, sent = _packetizer(100)
+    p.push(b"\x03" * (10 * MS))
+    assert sent == []
+    p.flush()
+    assert [len(x) for x in sent] == [10 * MS]
+    p.flush()  # nothing pending: nothing sent
+    assert len(sent) == 1
+
+
+def test_a_flush_requested_from_another_thread_lands_on_the_next_push():
+    p, sent = _packetizer(100)
+    p.push(b"\x04" * (10 * MS))
+    p.request_flush()
+    assert sent == []  # the mic thread owns the buffer
+    p.push(b"\x04" * (10 * MS))
+    assert [len(x) for x in sent] == [20 * MS]
+
+
+def test_packets_never_split_a_sample():
+    p, sent = _packetizer(12.34)
+    p.push(b"\x05" * (100 * MS))
+    assert all(len(x) % 2 == 0 for x in sent)
+
+
+def test_the_length_is_kept_sane():
+    p, _ = _packetizer(10_000)
+    assert p.packet_ms == MAX_PACKET_MS
+
+
+def test_fewer_frames_for_the_same_second_of_audio():
+    p, sent = _packetizer(100)
+    for _ in range(50):
+        p.push(b"\x06" * (20 * MS))  # one second in 20 ms blocks
+    assert len(sent) == 10  # 50 appends became 10
+    assert p.packets == 10 and p.bytes == 1000 * MS
@@ -0,0 +1,161 @@
+"""Same voice, new persona: switched over the open socket, not by reconnecting.
+
+``talk_as_friend`` and ``back_to_study`` share the Buddy voice, and several
+Maestri share one too, yet every switch tore down the websocket, lost the
+conversation and paid a full connect. Only a new voice needs a new session.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+from reachy_mini_mirrorbuddy import rt_messages
+from reachy_mini_mirrorbuddy.azure_realtime import AzureRealtimeClient
+from reachy_mini_mirrorbuddy.mirrorbuddy_client import Maestro
+from reachy_mini_mirrorbuddy.standby import Standby
+
+
+def _maestro(mid, voice="coral", greeting=""):
+    return Maestro(
+        id=mid, name=mid, display_name=mid.title(), subject="", specialty="", voice=voice,
+        voice_instructions="", teaching_style="", system_prompt="", greeting=greeting,
+    )
+
+
+@pytest.mark.parametrize("use_ga", [True, False])
+def test_the_update_changes_who_the_model_is_not_its_voice(use_ga):
+    msg = rt_messages.persona_update("sei Curie", [{"name": "t"}], use_ga)
+    session = msg["session"]
+    assert msg["type"] == "session.update" and session["instructions"] == "sei Curie"
+    assert session["tools"] == [{"name": "t"}]
+    assert "voice" not in json.dumps(msg)
+
+
+@pytest.fixture
+def client():
+    c = AzureRealtimeClient(
+        ws_url="wss://x", api_key="k", instructions="sei Buddy", voice="coral",
+        turn_detection={"type": "server_vad"}, greeting="Ciao!",
+    )
+    c.queued, c.sent = [], []
+    c._enqueue = lambda msg, kind=None: c.queued.append(json.loads(msg))
+
+    async def send(msg):
+        c.sent.append(json.loads(msg))
+
+    c._safe_send = send
+    return c
+
+
+def test_no_live_session_means_no_update(client):
+    assert not client.update_persona("sei Curie", "Salve!")
+    assert client.queued == [] and client.instructions == "sei Buddy"
+
+
+@pytest.mark.asyncio
+async def test_the_new_persona_greets_once_the_update_is_confirmed(client):
+    client._ws = object()
+    client._ready.set()
+
+    assert client.update_persona("sei Curie", "Salve, sono Marie!")
+    assert client.queued[-1]["session"]["instructions"] == "sei Curie"
+    assert client.sent == [] and not client.wait_updated(0)
+
+    await client._handle_event({"type": "session.updated"})
+    assert client.wait_updated(0)
+    assert client.sent[-1]["type"] == "response.create"
+    assert "Salve, sono Marie!" in json.dumps(client.sent[-1])
+
+    await client._handle_event({"type": "session.updated"})  # not a second greeting
+    assert len(client.sent) == 1
+
+
+# --------------------------------------------------------------------- the controller
+class Live:
+    """The current client: same surface as AzureRealtimeClient for a switch."""
+
+    def __init__(self, voice, confirms=True):
+        self.voice = voice
+        self.confirms = confirms
+        self.updates = []
+        self.stopped = False
+
+    def update_persona(self, instructions, greeting):
+        self.updates.append((instructions, greeting))
+        return True
+
+    def wait_updated(self, timeout):
+        return self.confirms
+
+    def stop(self):
+        self.stopped = True
+
+    def join(self):
+        pass
+
+
+class Fresh(Live):
+    instructions = ""
+    send_audio_pcm16 = local_barge_in = local_keyword = truncate_heard = None
+
+    def start(self):
+        pass
+
+    def activate(self):
+        pass
+
+    def wait_ready(self, timeout):
+        return True
+
+
+class Quiet:
+    def __getattr__(self, name):
+        return lambda *a, **k: None
+
+
+def _controller(live):
+    from reachy_mini_mirrorbuddy.controller import Controller
+
+    c = Controller.__new__(Controller)
+    c.cfg = type("Cfg", (), {"STUDENT_NAME": "Mario", "BUDDY_VOICE": "coral"})()
+    c.audio, c.movements = Quiet(), Quiet()
+    c.maestro, c.maestri = _maestro("buddy"), []
+    c._client = live
+    c._switch_lock = threading.Lock()
+    c._switch_times = {}
+    c._instructions_for = lambda m: f"be {m.id}"
+    c.built = []
+    c._build_client = lambda m, parked=False: c.built.append(Fresh(m.voice)) or c.built[-1]
+    c._standby = Standby(lambda m: Fresh(m.voice), max_sessions=0)
+    return c
+
+
+def test_the_same_voice_switches_in_place():
+    live = Live("coral")
+    c = _controller(live)
+    c._switch_to(_maestro("friend", greeting="Eccomi!"))
+
+    assert live.updates == [("be friend", "Eccomi!")]
+    assert c._client is live and not live.stopped and c.built == []
+    assert c.maestro.id == "friend"
+    assert c.switch_counters()["in place"]["count"] == 1
+
+
+def test_a_new_voice_reconnects():
+    live = Live("coral")
+    c = _controller(live)
+    c._switch_to(_maestro("curie", voice="sage"))
+
+    assert live.updates == [] and live.stopped
+    assert c._client is c.built[0]
+    assert list(c.switch_counters()) == ["new session"]
+
+
+def test_an_unconfirmed_update_falls_back_to_a_reconnect():
+    live = Live("coral", confirms=False)
+    c = _controller(live)
+    c._switch_to(_maestro("friend"))
+
+    assert live.stopped and c._client is c.built[0]
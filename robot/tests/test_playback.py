@@ -0,0 +1,148 @@
+"""Speech reaches the speaker from its own thread, a short lead ahead of the ear.
+
+Playing a delta used to mean rendering it and pushing it to the device right on
+the realtime client's event loop, so a slow push delayed the very cancel that
+should stop it. And the deltas arrive faster than realtime: the device queue
+grew to seconds that a barge-in then had to flush, while the mic loop — which
+only watches for a voice while Buddy "speaks" — had long stopped listening.
+"""
+
+from __future__ import annotations
+
+import time
+
+import numpy as np
+from reachy_mini_mirrorbuddy.audio_io import AudioIO
+from reachy_mini_mirrorbuddy.playback import PlaybackEngine
+
+RATE = 16000
+
+
+class _Device:
+    def __init__(self, push_s: float = 0.0):
+        self.push_s = push_s
+        self.pushed: list[np.ndarray] = []
+
+    def push(self, block):
+        if self.push_s:
+            time.sleep(self.push_s)
+        self.pushed.append(block)
+
+    def seconds(self) -> float:
+        return sum(b.size for b in self.pushed) / RATE
+
+
+def _engine(device: _Device, **kw) -> PlaybackEngine:
+    engine = PlaybackEngine(lambda a, rate: a.astype(np.float32), device.push, out_rate=RATE, **kw)
+    engine.start()
+    return engine
+
+
+def _speech(seconds: float) -> np.ndarray:
+    return np.full(int(RATE * seconds), 0.1, dtype=np.float32)
+
+
+def test_submitting_never_waits_on_the_speaker():
+    device = _Device(push_s=0.02)
+    engine = _engine(device)
+    try:
+        start = time.perf_counter()
+        for _ in range(20):
+            engine.submit(_speech(0.1), RATE)
+        assert time.perf_counter() - start < 0.05  # 2 s of speech queued at once
+        assert engine.depth_s > 1.5
+    finally:
+        engine.stop()
+
+
+def test_a_slow_device_never_holds_up_the_other_threads():
+    device = _Device(push_s=0.3)
+    engine = _engine(device)
+    try:
+        engine.submit(_speech(0.5), RATE)
+        time.sleep(0.05)  # the worker is inside its first push
+        start = time.perf_counter()
+        engine.position()
+        engine.submit(_speech(0.1), RATE)
+        engine.clear()
+        assert time.perf_counter() - start < 0.05
+        time.sleep(0.35)
+        assert device.seconds() <= 0.02 + 1e-6  # the slice in flight, then nothing
+    finally:
+        engine.stop()
+
+
+def test_only_the_lead_is_ever_queued_in_hardware():
+    device = _Device()
+    engine = _engine(device, lead_ms=60)
+    ahead: list[float] = []
+    push = device.push
+
+    def measure(block):
+        push(block)
+        ahead.append(engine.device_s)
+
+    engine.push = measure
+    try:
+        engine.submit(_speech(0.5), RATE)
+        time.sleep(0.3)
+        assert 0.1 < device.seconds() < 0.45  # paced in real time, not dumped at once
+        assert max(ahead) <= 0.06 + 1e-3
+    finally:
+        engine.stop()
+
+
+def test_a_cut_leaves_only_the_lead_to_flush():
+    device = _Device()
+    engine = _engine(device, lead_ms=100)
+    try:
+        engine.submit(_speech(3.0), RATE)
+        time.sleep(0.05)
+        engine.clear()
+        pushed = device.seconds()
+        time.sleep(0.1)
+        assert device.seconds() == pushed  # nothing after the cut
+        assert pushed < 0.25  # vs 3 s sitting in the device before
+        assert engine.depth_s == 0.0 and not engine.busy()
+    finally:
+        engine.stop()
+
+
+def test_a_late_chunk_mid_sentence_counts_as_an_underrun():
+    device = _Device()
+    engine = _engine(device, lead_ms=60)
+    try:
+        engine.submit(_speech(0.1), RATE)
+        time.sleep(0.25)  # the device ran dry 150 ms ago
+        engine.submit(_speech(0.1), RATE)
+        time.sleep(0.05)
+        assert engine.underruns == 1
+        assert 0.05 < engine.underrun_s < 0.3
+    finally:
+        engine.stop()
+
+
+def test_the_queue_is_bounded():
+    device = _Device()
+    engine = _engine(device, max_queue_s=1.0)
+    try:
+        for _ in range(30):
+            engine.submit(_speech(0.1), RATE)
+        assert engine.depth_s <= 1.0 + 1e-6
+        assert engine.overflow_s > 1.5
+    finally:
+        engine.stop()
+
+
+def test_buddy_counts_as_speaking_until_the_device_is_done(robot):
+    io = AudioIO(robot, on_input_pcm16=lambda b: None, voice_gate=False)
+    io._probe_rates()
+    io.playback.start()
+    try:
+        io.play(np.zeros(24000, dtype=np.int16).tobytes())  # 1 s, delivered at once
+        time.sleep(0.5)
+        assert time.monotonic() < io._playing_until  # the old 250 ms TTL had expired
+        io.interrupt()
+        assert io._playing_until == 0.0 and not io.playback.busy()
+    finally:
+        io.playback.stop()
@@ -0,0 +1,99 @@
+"""The live audio streams are resampled chunk by chunk, and must not notice.
+
+The mic and speaker paths used to run ``resample_poly`` on every block on its
+own: a fresh filter design each time and a filter that restarted from silence at
+every block edge — a tick twenty times a second that the child hears as a rough
+voice. The streaming resampler must sound like one long resample of the whole
+signal, whatever the block sizes are.
+"""
+
+from __future__ import annotations
+
+from math import gcd
+
+import numpy as np
+import pytest
+from reachy_mini_mirrorbuddy.resampler import StreamingResampler, polyphase_taps
+from scipy.signal import resample_poly
+
+RATE_PAIRS = [(16000, 24000), (24000, 48000), (24000, 16000), (44100, 24000)]
+
+
+def _tone(rate: int, seconds: float = 1.0) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    return (np.sin(2 * np.pi * 440 * t) * 10000).astype(np.int16)
+
+
+def _stream(resampler: StreamingResampler, audio: np.ndarray, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    out, i = [], 0
+    while i < audio.size:
+        n = int(rng.integers(80, 800))
+        out.append(resampler.process(audio[i:i + n]))
+        i += n
+    return np.concatenate(out)
+
+
+@pytest.mark.parametrize(("src", "dst"), RATE_PAIRS)
+def test_chunked_output_matches_one_long_resample(src, dst):
+    audio = _tone(src)
+    streamed = _stream(StreamingResampler(src, dst), audio)
+    g = gcd(src, dst)
+    up, down = dst // g, src // g
+    reference = resample_poly(audio.astype(np.float64), up, down)
+    # The stream is causal, so it lags by the filter's group delay.
+    delay = (10 * max(up, down)) // down
+    n = min(streamed.size - delay, reference.size) - 200
+    err = np.max(np.abs(streamed[delay + 200:delay + n] - reference[200:n]))
+    assert err < 1.0  # float32 rounding on a ±10000 signal: no seams anywhere
+
+
+@pytest.mark.parametrize(("src", "dst"), RATE_PAIRS)
+def test_no_samples_are_lost_or_invented(src, dst):
+    streamed = _stream(StreamingResampler(src, dst), _tone(src, seconds=2.0))
+    assert abs(streamed.size - 2 * dst) <= 1
+
+
+def test_matching_rates_pass_through_untouched():
+    audio = _tone(24000, 0.1)
+    out = StreamingResampler(24000, 24000).process(audio)
+    assert np.array_equal(out, audio.astype(np.float32))
+
+
+def test_a_preallocated_buffer_is_filled_in_place():
+    r = StreamingResampler(16000, 24000)
+    buf = np.zeros(r.output_size(320), dtype=np.float32)
+    out = r.process(_tone(16000, 0.02), out=buf)
+    assert out.base is buf or out is buf
+
+
+def test_the_filter_is_designed_once_per_rate_pair():
+    assert polyphase_taps(3, 2) is polyphase_taps(3, 2)
+    assert StreamingResampler(16000, 24000)._taps is StreamingResampler(16000, 24000)._taps
+
+
+def test_reset_starts_again_from_silence():
+    r = StreamingResampler(16000, 24000)
+    first = r.process(_tone(16000, 0.05))
+    r.process(_tone(16000, 0.05))
+    r.reset()
+    assert np.allclose(r.process(_tone(16000, 0.05)), first)
+
+
+class TestDrift:
+    def test_a_fast_source_loses_a_sample_now_and_then(self):
+        r = StreamingResampler(16000, 24000)
+        r.set_drift_ppm(1000)  # 0.1% fast: one sample in a thousand is surplus
+        out = _stream(r, _tone(16000, 2.0))
+        assert 48000 - out.size == pytest.approx(48, abs=2)
+
+    def test_a_slow_source_gains_a_sample_now_and_then(self):
+        r = StreamingResampler(16000, 24000)
+        r.set_drift_ppm(-1000)
+        out = _stream(r, _tone(16000, 2.0))
+        assert out.size - 48000 == pytest.approx(48, abs=2)
+
+    def test_an_absurd_estimate_is_clamped(self):
+        r = StreamingResampler(16000, 24000)
+        r.set_drift_ppm(50000)
+        assert r.drift_ppm <= 1000
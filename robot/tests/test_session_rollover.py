@@ -0,0 +1,160 @@
+"""The hourly session expiry is met with a successor, not with a deaf robot.
+
+Azure closes every realtime session at 60 minutes, and the reconnect that
+followed left the robot deaf for seconds, often mid-sentence. A successor is
+now opened ahead of the expiry and taken over at a quiet moment: the mic goes
+to the new socket and the old one is closed behind it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+import websockets
+from reachy_mini_mirrorbuddy import azure_realtime
+from reachy_mini_mirrorbuddy.azure_realtime import AzureRealtimeClient
+
+
+@pytest.fixture
+def client():
+    return AzureRealtimeClient(
+        ws_url="ws://x", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"},
+    )
+
+
+class TestAQuietMoment:
+    def test_nothing_in_flight_for_a_while_is_quiet(self, client):
+        now = time.monotonic()
+        assert client._quiet_moment(now)
+        client._last_event_at = now
+        assert not client._quiet_moment(now)
+        assert client._quiet_moment(now + azure_realtime._ROLLOVER_SETTLE_S)
+
+    def test_a_reply_or_a_turn_in_flight_is_not(self, client):
+        later = time.monotonic() + 60.0
+        client._responding = True
+        assert not client._quiet_moment(later)
+        client._responding = False
+        client._in_turn = True
+        assert not client._quiet_moment(later)
+
+    @pytest.mark.asyncio
+    async def test_a_turn_lasts_until_its_transcript(self, client):
+        client._safe_send = lambda msg: asyncio.sleep(0)
+        await client._handle_event({"type": "input_audio_buffer.speech_started"})
+        await client._handle_event({"type": "input_audio_buffer.speech_stopped"})
+        assert client._in_turn
+        await client._handle_event(
+            {"type": "conversation.item.input_audio_transcription.completed", "transcript": ""}
+        )
+        assert not client._in_turn
+
+    @pytest.mark.asyncio
+    async def test_a_failed_transcript_ends_the_turn_too(self, client):
+        client._safe_send = lambda msg: asyncio.sleep(0)
+        await client._handle_event({"type": "input_audio_buffer.speech_started"})
+        await client._handle_event(
+            {"type": "conversation.item.input_audio_transcription.failed", "error": {"code": "x"}}
+        )
+        assert not client._in_turn
+
+    def test_something_just_asked_is_not(self, client):
+        client._ws = object()
+        client._outbox.put = lambda msg, kind: None
+        client.speak_now("di' ciao")
+        assert not client._quiet_moment(time.monotonic())
+
+
+@pytest.mark.asyncio
+async def test_a_successor_ages_from_its_own_connect(client):
+    aged_from = []
+
+    async def rollover(ws, born):
+        aged_from.append(born)
+        client._successor = ("successor", 42.0)  # opened at 42, taken over later
+
+    class Expiring:
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            await asyncio.sleep(0)  # the rollover runs
+            raise StopAsyncIteration
+
+    client._rollover = rollover
+    assert await client._listen(Expiring(), 7.0) == ("successor", 42.0)
+    assert aged_from == [7.0]
+
+
+def test_the_session_rolls_over_without_losing_the_mic(monkeypatch):
+    monkeypatch.setattr(azure_realtime, "_SESSION_MAX_S", 2.0)
+    monkeypatch.setattr(azure_realtime, "_ROLLOVER_SETTLE_S", 0.05)
+    monkeypatch.setattr(azure_realtime, "_ROLLOVER_POLL_S", 0.01)
+    monkeypatch.setattr(azure_realtime, "_ROLLOVER_FORCE_S", 0.5)
+    sessions: list[list[dict]] = []
+    closed: list[int] = []
+    up = threading.Event()
+    box: dict = {}
+
+    async def handler(ws):
+        n = len(sessions)
+        sessions.append([])
+        try:
+            async for raw in ws:
+                msg = json.loads(raw)
+                sessions[n].append(msg)
+                if msg["type"] == "session.update":
+                    await ws.send(json.dumps({"type": "session.updated"}))
+        except websockets.ConnectionClosed:
+            pass
+        closed.append(n)
+
+    def serve():
+        async def main():
+            async with websockets.serve(handler, "127.0.0.1", 0) as server:
+                box["port"] = server.sockets[0].getsockname()[1]
+                box["stop"] = asyncio.get_running_loop().create_future()
+                box["loop"] = asyncio.get_running_loop()
+                up.set()
+                await box["stop"]
+        asyncio.run(main())
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    assert up.wait(5.0)
+    c = AzureRealtimeClient(
+        ws_url=f"ws://127.0.0.1:{box['port']}", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"}, rollover_margin_s=1.9,
+    )
+    try:
+        c.start()
+        assert c.wait_ready(5.0)
+        deadline = time.monotonic() + 5.0
+        while c.rollover_counters()["rollovers"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert c.rollover_counters()["rollovers"] >= 1
+        c.send_audio_pcm16(b"\x01\x00" * 240)
+        deadline = time.monotonic() + 2.0
+        while time.monotonic() < deadline:
+            if any(m["type"] == "input_audio_buffer.append" for m in sessions[-1]):
+                break
+            time.sleep(0.02)
+    finally:
+        c.stop()
+        c.join()
+        box["loop"].call_soon_threadsafe(box["stop"].set_result, None)
+        thread.join(5.0)
+
+    first, latest = sessions[0], sessions[-1]
+    assert 0 in closed  # the expiring socket was closed behind the successor
+    assert latest[0]["type"] == "session.update"
+    assert latest[0]["session"]["instructions"] == "i"
+    assert any(m["type"] == "input_audio_buffer.append" for m in latest)
+    # The greeting belongs to the first session only: the child hears no second hello.
+    assert any(m["type"] == "response.create" for m in first)
+    assert not any(m["type"] == "response.create" for m in latest)
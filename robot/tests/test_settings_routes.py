@@ -82,3 +82,49 @@ def test_the_settings_page_offers_the_speaker_volume_control() -> None:
 
     assert 'id="MIRRORBUDDY_VOLUME"' in PAGE
     assert "MIRRORBUDDY_VOLUME" in PAGE.split("const ids=")[1][:400]
+
+
+def test_calibration_needs_the_running_microphone(client: TestClient) -> None:
+    from reachy_mini_mirrorbuddy import settings_ui
+
+    settings_ui.attach_audio(None)
+    assert client.post("/api/calibrate").status_code == 409
+    assert client.get("/api/calibrate").json() == {"phase": "idle"}
+
+
+def test_a_calibration_stores_the_threshold(client: TestClient, tmp_path: Path) -> None:
+    import numpy as np
+
+    from reachy_mini_mirrorbuddy import settings_ui
+    from reachy_mini_mirrorbuddy.audio_io import AudioIO
+
+    io = AudioIO(robot=object(), on_input_pcm16=lambda _b: None)
+    settings_ui.attach_audio(io)
+    try:
+        assert client.post("/api/calibrate").json()["phase"] == "room"
+        for _ in range(200):
+            io.note_calibration_hops(np.full(2, 0.005), 10.0, speaking=False)
+        for _ in range(400):
+            io.note_calibration_hops(np.full(2, 0.05), 10.0, speaking=False)
+        assert client.get("/api/calibrate").json()["phase"] == "done"
+        assert "MIRRORBUDDY_BARGE_RMS=" in (tmp_path / ".env").read_text()
+    finally:
+        settings_ui.attach_audio(None)
+
+
+def test_a_calibration_is_refused_while_buddy_talks(client: TestClient) -> None:
+    import time
+
+    from reachy_mini_mirrorbuddy import settings_ui
+    from reachy_mini_mirrorbuddy.audio_io import AudioIO
+
+    io = AudioIO(robot=object(), on_input_pcm16=lambda _b: None)
+    io._playing_until = time.monotonic() + 5.0
+    settings_ui.attach_audio(io)
+    try:
+        r = client.post("/api/calibrate")
+        assert r.status_code == 409
+        assert r.json()["busy"] is True and "parlando" in r.json()["error"]
+        assert io.calibration is None
+    finally:
+        settings_ui.attach_audio(None)
@@ -0,0 +1,160 @@
+"""Fixed lines are spoken by the model once per voice, then played locally.
+
+The greeting came back at every reconnect and every Maestro switch, and the
+wake and farewell lines follow fixed instructions: each time a full model
+round-trip before the child heard a word. The audio of those responses is now
+kept, keyed by voice and instructions, and replayed at once — with the
+transcript added to the conversation so the model knows it was said.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+
+import pytest
+from reachy_mini_mirrorbuddy import rt_messages
+from reachy_mini_mirrorbuddy.azure_realtime import AzureRealtimeClient
+from reachy_mini_mirrorbuddy.speech_cache import SpeechCache
+
+
+def test_lines_are_kept_per_voice_and_text():
+    cache = SpeechCache()
+    assert cache.put("coral", "ciao", [b"ab", b"cd"], "Ciao!")
+    assert cache.get("coral", "ciao").chunks == (b"ab", b"cd")
+    assert cache.get("verse", "ciao") is None
+    assert cache.counters()["hits"] == 1 and cache.counters()["misses"] == 1
+
+
+def test_the_least_recently_used_line_goes_first():
+    cache = SpeechCache(max_bytes=10)
+    cache.put("v", "a", [b"x" * 4], "A")
+    cache.put("v", "b", [b"x" * 4], "B")
+    cache.get("v", "a")  # used again: "b" is now the oldest
+    cache.put("v", "c", [b"x" * 4], "C")
+    assert cache.get("v", "b") is None
+    assert cache.get("v", "a") and cache.get("v", "c")
+    assert cache.bytes == 8 and cache.evictions == 1
+
+
+def test_nothing_worth_keeping_is_refused():
+    cache = SpeechCache(max_bytes=10)
+    assert not cache.put("v", "a", [b"x" * 11], "A")  # could never fit
+    assert not cache.put("v", "a", [b"x"], "  ")  # the model would not know what was said
+    assert len(cache) == 0
+
+
+# --------------------------------------------------------------------- the client
+@pytest.fixture
+def client():
+    c = AzureRealtimeClient(
+        ws_url="wss://x", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"}, greeting="Ciao, sono Buddy!",
+    )
+    c.sent, c.played = [], []
+
+    async def send(msg):
+        c.sent.append(json.loads(msg))
+
+    c._safe_send = send
+    c.on_output_audio = lambda data, item_id: c.played.append(data)
+    return c
+
+
+def _created(client):
+    """``response.created`` for the last request sent, echoing its metadata as the server does."""
+    asked = client.sent[-1].get("response") or {}
+    return {"type": "response.created", "response": {"metadata": asked.get("metadata")}}
+
+
+async def _speak(client, chunks, transcript="Ciao, sono Buddy!", status="completed"):
+    await client._handle_event(_created(client))
+    for chunk in chunks:
+        await client._handle_event(
+            {"type": "response.output_audio.delta", "delta": base64.b64encode(chunk).decode()}
+        )
+    await client._handle_event({"type": "response.output_audio_transcript.done", "transcript": transcript})
+    await client._handle_event({"type": "response.done", "response": {"status": status}})
+
+
+@pytest.mark.asyncio
+async def test_the_second_greeting_is_played_without_the_model(client):
+    await client._greet()
+    assert client.sent[-1]["type"] == "response.create"
+    await _speak(client, [b"\x01\x00" * 10, b"\x02\x00" * 10])
+
+    client.sent.clear()
+    client.played.clear()
+    client._reset_session_state()  # a reconnect
+    await client._greet()
+    (said,) = client.sent
+    item_id = said["item"]["id"]
+    assert said == rt_messages.assistant_message("Ciao, sono Buddy!", use_ga=True, item_id=item_id)
+    assert client.played == [b"\x01\x00" * 10, b"\x02\x00" * 10]
+
+
+@pytest.mark.asyncio
+async def test_a_cached_line_cut_short_keeps_only_what_was_heard(client):
+    line = "Eccomi, sono di nuovo qui con te!"
+    audio = b"\0\0" * 24000  # one second at the wire rate
+    client._speech_cache.put("coral", rt_messages.WAKE_INSTR, [audio], line)
+    heard = []
+    client.on_output_audio = lambda data, item_id: heard.append(item_id)
+    client._enqueue = lambda msg, kind=None: client.sent.append(json.loads(msg))
+    await client._speak_fixed(rt_messages.WAKE_INSTR)  # the first audio of the session
+    item_id = client.sent[-1]["item"]["id"]
+    assert heard == [item_id]
+    client.truncate_heard(item_id, 500, unplayed=True)  # a barge-in half way through
+    delete, again = client.sent[-2:]
+    assert delete == rt_messages.item_delete(item_id)  # a text item cannot be truncated
+    assert again["item"]["content"][0]["text"] == "Eccomi, sono di"
+    assert again["item"]["id"] != item_id
+    assert not any(m["type"] == "conversation.item.truncate" for m in client.sent)
+    client.truncate_heard(item_id, 800, unplayed=True)  # already trimmed
+    assert client.sent[-1] is again
+
+
+@pytest.mark.asyncio
+async def test_a_line_cut_short_is_not_kept(client):
+    await client._greet()
+    await client._handle_event(_created(client))
+    await client._handle_event(
+        {"type": "response.output_audio.delta", "delta": base64.b64encode(b"\0\0").decode()}
+    )
+    client.local_barge_in()
+    await client._handle_event({"type": "response.done", "response": {"status": "cancelled"}})
+    assert len(client._speech_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_a_rejected_greeting_does_not_cache_the_next_answer(client):
+    await client._greet()
+    await client._handle_event({"type": "error", "error": {"code": "conversation_already_has_active_response"}})
+    await client._handle_event({"type": "response.done", "response": {"status": "completed"}})
+    await client._request_response()
+    await _speak(client, [b"\0\0"], transcript="La risposta a 7x8 e' 56.")
+    assert len(client._speech_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_an_ordinary_answer_is_never_kept(client):
+    await client._request_response()
+    await _speak(client, [b"\0\0"], transcript="Il Po è il fiume più lungo d'Italia.")
+    assert len(client._speech_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_a_cached_farewell_still_ends_in_rest(client):
+    client._loop = asyncio.get_running_loop()
+    client._speech_cache.put("coral", rt_messages.FAREWELL_INSTR, [b"\0\0" * 240], "Ciao, a presto!")
+    slept = []
+    client.on_sleep = lambda: slept.append(True)
+    client._ready.set()
+    await client._handle_event(
+        {"type": "conversation.item.input_audio_transcription.completed", "transcript": "abbiamo finito"}
+    )
+    assert client.sent[-1]["item"]["role"] == "assistant"
+    assert not slept  # the goodbye is still playing
+    await asyncio.sleep(0.05)  # 10 ms of audio
+    assert slept and client._asleep
@@ -0,0 +1,179 @@
+"""A switch to a Maestro whose session is already open only has to greet.
+
+Every professor switch used to open a socket, configure it and wait for
+``session.updated`` while the child sat in silence. Sessions are now opened
+ahead of time for the likely next Maestro, parked without greeting, and taken
+by the switch when the guess was right.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+
+import pytest
+from reachy_mini_mirrorbuddy.azure_realtime import AzureRealtimeClient
+from reachy_mini_mirrorbuddy.digest import Digest
+from reachy_mini_mirrorbuddy.mirrorbuddy_client import Maestro
+from reachy_mini_mirrorbuddy.standby import Standby
+
+
+class FakeClient:
+    def __init__(self, maestro, instructions="i"):
+        self.maestro = maestro
+        self.voice = maestro.voice
+        self.instructions = instructions
+        self.started = self.stopped = False
+
+    def start(self):
+        self.started = True
+
+    def stop(self):
+        self.stopped = True
+
+
+def _maestro(mid):
+    return Maestro(
+        id=mid, name=mid, display_name=mid.title(), subject="", specialty="", voice="coral",
+        voice_instructions="", teaching_style="", system_prompt="", greeting="",
+    )
+
+
+@pytest.fixture
+def built():
+    return []
+
+
+@pytest.fixture
+def standby(built):
+    def build(m):
+        built.append(FakeClient(m))
+        return built[-1]
+    return Standby(build, max_sessions=1)
+
+
+def test_a_parked_session_is_taken_by_the_switch(standby, built):
+    standby.warm(_maestro("curie"))
+    standby.warm(_maestro("curie"))  # already parked: no second socket
+    assert len(built) == 1 and built[0].started
+    assert standby.take(_maestro("curie"), "i") is built[0]
+    assert standby.counters()["hit_rate"] == 1.0 and len(standby) == 0
+
+
+def test_no_more_than_the_cap_is_ever_open(standby, built):
+    standby.warm(_maestro("curie"))
+    standby.warm(_maestro("euclide"))
+    assert built[0].stopped and not built[1].stopped
+    assert standby.take(_maestro("curie"), "i") is None
+    assert standby.counters()["misses"] == 1
+
+
+def test_a_session_with_stale_instructions_is_closed_not_used(standby, built):
+    standby.warm(_maestro("curie"))
+    assert standby.take(_maestro("curie"), "someone new joined the room") is None
+    assert built[0].stopped
+    assert standby.counters()["discarded"] == 1
+
+
+def test_an_old_session_is_replaced(built):
+    standby = Standby(lambda m: built.append(FakeClient(m)) or built[-1], max_age_s=0.0)
+    standby.warm(_maestro("curie"))
+    standby.warm(_maestro("curie"))
+    assert len(built) == 2 and built[0].stopped
+
+
+def test_zero_sessions_turns_it_off(built):
+    standby = Standby(lambda m: built.append(FakeClient(m)) or built[-1], max_sessions=0)
+    standby.warm(_maestro("curie"))
+    assert not built and standby.take(_maestro("curie"), "i") is None
+
+
+# --------------------------------------------------------------------- the client
+def _client(parked):
+    c = AzureRealtimeClient(
+        ws_url="wss://x", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"}, greeting="Ciao!", standby=parked,
+    )
+    c.sent = []
+
+    async def send(msg):
+        c.sent.append(json.loads(msg))
+
+    c._safe_send = send
+    return c
+
+
+@pytest.mark.asyncio
+async def test_a_parked_session_is_ready_but_silent_until_taken():
+    c = _client(parked=True)
+    await c._handle_event({"type": "session.updated"})
+    assert c.wait_ready(0) and c.sent == []
+
+    c._loop = asyncio.get_running_loop()
+    c.activate()
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert [m["type"] for m in c.sent] == ["response.create"]
+
+
+@pytest.mark.asyncio
+async def test_taken_before_it_is_ready_it_greets_on_ready():
+    c = _client(parked=True)
+    c.activate()  # no loop yet
+    await c._handle_event({"type": "session.updated"})
+    assert [m["type"] for m in c.sent] == ["response.create"]
+
+
+@pytest.mark.asyncio
+async def test_the_childs_words_are_reported_before_they_are_acted_on():
+    c = _client(parked=False)
+    heard = []
+    c.on_user_transcript = heard.append
+    await c._handle_event({"type": "conversation.item.input_audio_transcription.completed",
+                           "transcript": " voglio la professoressa Curie "})
+    assert heard == ["voglio la professoressa Curie"]
+
+
+# --------------------------------------------------------------------- the controller
+def test_the_switch_uses_the_parked_session():
+    from reachy_mini_mirrorbuddy.controller import Controller
+
+    class Parked(FakeClient):
+        activated = False
+
+        def activate(self):
+            self.activated = True
+
+        def wait_ready(self, timeout):
+            return True
+
+        def join(self):
+            pass
+
+        send_audio_pcm16 = local_barge_in = local_keyword = truncate_heard = None
+
+    class Quiet:
+        def __getattr__(self, name):
+            return lambda *a, **k: None
+
+    curie = _maestro("curie")
+    c = Controller.__new__(Controller)
+    c.cfg = type("Cfg", (), {"STUDENT_NAME": "Mario", "BUDDY_VOICE": "coral"})()
+    c.audio, c.movements = Quiet(), Quiet()
+    c.maestro, c.maestri = _maestro("buddy"), [curie]
+    c._client = None
+    c._switch_lock = threading.Lock()
+    c._switch_times = {}
+    c._digest = Digest()
+    c._instructions_for = lambda m: f"be {m.id}"
+    c._build_client = lambda m, parked=False: pytest.fail("opened a new session")
+    c._standby = Standby(lambda m: Parked(m, f"be {m.id}"))
+
+    c._on_user_transcript("posso parlare con Curie?")
+    parked = c._standby._parked["curie"][1]
+    c._standby.build = lambda m: FakeClient(m)  # what _warm_next parks after the switch
+    c._switch_to(curie)
+
+    assert c._client is parked and parked.activated
+    assert c.maestro is curie and c.standby_counters()["hits"] == 1
@@ -0,0 +1,117 @@
+"""After a cut, the conversation keeps only what the child actually heard.
+
+The server still held the whole assistant reply after a barge-in, including the
+part that never left the speaker: every interrupted turn grew the context, and
+the model went on to refer to things it had never actually said. The speaker
+now counts how much of each item it played, and the client truncates the item
+there.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import time
+
+import numpy as np
+import pytest
+from reachy_mini_mirrorbuddy.audio_io import AudioIO
+from reachy_mini_mirrorbuddy.azure_realtime import AzureRealtimeClient
+from reachy_mini_mirrorbuddy.rt_messages import item_truncate
+
+
+def test_the_truncate_message_matches_the_protocol():
+    assert item_truncate("item_1", 1234) == {
+        "type": "conversation.item.truncate",
+        "item_id": "item_1",
+        "content_index": 0,
+        "audio_end_ms": 1234,
+    }
+
+
+# --------------------------------------------------------------------- the client
+@pytest.fixture
+def client():
+    c = AzureRealtimeClient(
+        ws_url="wss://x", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"},
+    )
+    c.played, c.queued = [], []
+    c.on_output_audio = lambda data, item_id: c.played.append(item_id)
+    c._enqueue = lambda msg, kind=None: c.queued.append(msg)
+    return c
+
+
+def _delta(item_id=None) -> dict:
+    event = {"type": "response.output_audio.delta", "delta": base64.b64encode(b"\0\0").decode()}
+    if item_id:
+        event["item_id"] = item_id
+    return event
+
+
+@pytest.mark.asyncio
+async def test_audio_is_played_with_the_item_it_belongs_to(client):
+    await client._handle_event(
+        {"type": "response.output_item.added", "item": {"type": "message", "id": "msg_1"}}
+    )
+    await client._handle_event(_delta("msg_1"))
+    await client._handle_event(_delta())  # a delta without its id: the item announced
+    assert client.played == ["msg_1", "msg_1"]
+
+
+@pytest.mark.asyncio
+async def test_a_cut_truncates_the_item_where_playback_stopped(client):
+    await client._handle_event(
+        {"type": "response.output_item.added", "item": {"type": "message", "id": "msg_1"}}
+    )
+    client.truncate_heard("msg_1", 1500, unplayed=True)
+    assert [json.loads(m) for m in client.queued] == [item_truncate("msg_1", 1500)]
+
+
+@pytest.mark.asyncio
+async def test_a_reply_heard_to_the_end_keeps_its_transcript(client):
+    await client._handle_event(
+        {"type": "response.output_item.added", "item": {"type": "message", "id": "msg_1"}}
+    )
+    await client._handle_event({"type": "response.output_audio.done", "item_id": "msg_1"})
+    client.truncate_heard("msg_1", 4000, unplayed=False)
+    assert client.queued == []
+
+
+def test_an_item_from_a_previous_session_is_not_truncated(client):
+    client._audio_item = "msg_old"
+    client._reset_session_state()
+    client.truncate_heard("msg_old", 800, unplayed=True)
+    assert client.queued == []
+
+
+# --------------------------------------------------------------------- the speaker
+@pytest.fixture
+def io(robot):
+    io = AudioIO(robot, on_input_pcm16=lambda b: None, voice_gate=False)
+    io._probe_rates()
+    io.cuts = []
+    io.on_cut = lambda item_id, ms, unplayed: io.cuts.append((item_id, ms, unplayed))
+    return io
+
+
+def test_the_speaker_reports_how_much_of_the_item_was_heard(io):
+    io.play_output(np.zeros(24000, dtype=np.int16).tobytes(), "msg_1")  # 1 s of speech
+    time.sleep(0.3)
+    io.interrupt()
+    [(item_id, ms, unplayed)] = io.cuts
+    assert item_id == "msg_1" and unplayed
+    assert 250 <= ms <= 450
+
+
+def test_only_the_first_cut_reports(io):
+    io.play_output(np.zeros(24000, dtype=np.int16).tobytes(), "msg_1")
+    io.interrupt()
+    io.interrupt()  # the server's speech_started after a local barge-in
+    assert len(io.cuts) == 1
+
+
+def test_local_sounds_are_not_assistant_items(io):
+    io.play(np.zeros(2400, dtype=np.int16).tobytes())  # the meditation bell
+    io.interrupt()
+    assert io.cuts == []
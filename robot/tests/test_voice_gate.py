@@ -0,0 +1,144 @@
+"""The mic stays home while the room is silent — and never loses a word for it.
+
+Streaming silence costs Wi-Fi, audio billing and CPU. Holding it back is only
+acceptable if the first syllable of a sentence still reaches the server, and if
+the server still hears enough silence afterwards to end the turn.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from reachy_mini_mirrorbuddy.voice_gate import VoiceGate
+
+RATE = 24000
+BLOCK = 480  # 20 ms
+
+
+def _voice(seed: int = 0) -> np.ndarray:
+    t = np.arange(BLOCK) / RATE
+    return (np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 440 * t)) * 6000.0
+
+
+def _hiss(level: float = 60.0, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(0, level, BLOCK)
+
+
+def _rms(block: np.ndarray) -> float:
+    return float(np.sqrt(np.mean(block**2))) / 32768.0
+
+
+class Wire:
+    def __init__(self):
+        self.sent: list[bytes] = []
+        self.closed = 0
+
+    def close(self):
+        self.closed += 1
+
+
+def _gate(**kw):
+    wire = Wire()
+    gate = VoiceGate(wire.sent.append, RATE, on_close=wire.close, **kw)
+    return gate, wire
+
+
+def _feed(gate, block, tag: bytes, resting=False):
+    return gate.feed(tag * (BLOCK * 2 // len(tag)), _rms(block), block.astype(np.float32), resting)
+
+
+def test_a_silent_room_sends_nothing():
+    gate, wire = _gate()
+    for i in range(200):
+        _feed(gate, _hiss(seed=i), b"s")
+    assert wire.sent == []
+    assert gate.captured_s == pytest.approx(4.0)
+    assert gate.saved_fraction() == 1.0
+
+
+def test_a_voice_opens_the_gate_with_its_pre_roll_first():
+    gate, wire = _gate(preroll_ms=200)
+    for i in range(50):
+        _feed(gate, _hiss(seed=i), b"s")
+    assert _feed(gate, _voice(), b"v") is False  # 20 ms: still inside the attack
+    assert _feed(gate, _voice(), b"v") is True
+    sent = b"".join(wire.sent)
+    # The syllable that opened the gate is all there, not just its second half...
+    assert sent.endswith(b"v" * BLOCK * 2 * 2)
+    # ...and the ring sent at least 200 ms ahead of the block that opened it.
+    assert len(sent) - BLOCK * 2 >= int(0.2 * RATE) * 2
+    assert sent.startswith(b"s")
+
+
+def test_steady_noise_does_not_open_the_gate_however_loud():
+    gate, wire = _gate()
+    for i in range(100):
+        _feed(gate, _hiss(level=3000.0, seed=i), b"n")  # a hairdryer, not a child
+    assert wire.sent == []
+
+
+def test_the_gate_stays_open_long_enough_for_the_server_to_end_the_turn():
+    gate, wire = _gate(server_silence_ms=800)
+    for _ in range(10):
+        _feed(gate, _voice(), b"v")
+    silent_blocks = 0
+    while gate.is_open and silent_blocks < 500:
+        _feed(gate, _hiss(seed=silent_blocks), b"s")
+        silent_blocks += 1
+    # The server needs 800 ms of silence to close the turn: it got more than that.
+    assert silent_blocks * BLOCK / RATE >= 0.8
+    assert wire.closed == 1
+
+
+def test_resting_asks_for_a_longer_voice_before_it_streams():
+    gate, wire = _gate()
+    for i in range(50):
+        _feed(gate, _hiss(seed=i), b"s", resting=True)
+    assert _feed(gate, _voice(), b"v", resting=True) is False  # one syllable is not a call
+    opened = False
+    for _ in range(10):
+        opened = _feed(gate, _voice(), b"v", resting=True) or opened
+    assert opened  # "Buddy" still gets through, so the child can wake it
+
+
+def test_a_barge_in_forces_the_gate_open():
+    gate, wire = _gate()
+    gate.force_open()
+    assert gate.is_open
+    _feed(gate, _hiss(), b"s")
+    assert wire.sent
+
+
+def test_counters_split_sent_from_captured():
+    gate, _ = _gate(preroll_ms=100)
+    for i in range(100):
+        _feed(gate, _hiss(seed=i), b"s")
+    for _ in range(50):
+        _feed(gate, _voice(), b"v")
+    assert gate.captured_s == pytest.approx(3.0)
+    # One second of voice plus its pre-roll; the other ~1.9 s stayed home.
+    assert 1.0 <= gate.sent_s <= 1.0 + 0.1 + BLOCK / RATE + 1e-9
+    assert gate.saved_fraction() > 0.6
+
+
+def test_flatness_reuses_its_buffers_block_to_block():
+    import tracemalloc
+
+    def reference(block):  # geometric over arithmetic mean of the power spectrum
+        power = np.abs(np.fft.rfft(block.astype(np.float64))) ** 2 + 1e-12
+        return float(np.exp(np.mean(np.log(power))) / np.mean(power))
+
+    gate, _ = _gate()
+    voice, hiss = _voice().astype(np.float32), _hiss(level=3000.0).astype(np.float32)
+    assert gate._flatness(voice) == pytest.approx(reference(voice), rel=1e-6)
+    assert gate._flatness(hiss) == pytest.approx(reference(hiss), rel=1e-6)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        for _ in range(50):
+            gate._flatness(voice)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    assert peak < 2048  # the FFT's own scratch only: ~11 KB of temporaries before
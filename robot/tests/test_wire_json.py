@@ -0,0 +1,63 @@
+"""Bulk payloads are serialised once, from templates, and sent as text.
+
+Every mic packet went through ``b64encode().decode()``, a dict and ``json.dumps``;
+every camera frame was base64-encoded into a data URL and then copied again by
+``json.dumps`` — several copies of a few hundred kilobytes while the mic waited.
+Both are now joined from pre-serialised pieces in one copy, and must still be
+exactly the JSON the dict builders describe.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+
+import pytest
+from reachy_mini_mirrorbuddy import azure_realtime, outbox, rt_messages
+from reachy_mini_mirrorbuddy.azure_realtime import AzureRealtimeClient
+
+
+def test_an_audio_packet_is_the_same_message():
+    pcm = bytes(range(256)) * 8
+    expected = rt_messages.audio_append(base64.b64encode(pcm).decode("ascii"))
+    assert json.loads(rt_messages.audio_append_json(pcm)) == expected
+
+
+def test_an_image_is_the_same_message_whatever_the_prompt():
+    jpeg = b"\xff\xd8" + bytes(range(256)) * 40
+    prompt = 'Leggi "questo" — riga 2\\nè tutto?'
+    data_url = "data:image/jpeg;base64," + base64.b64encode(jpeg).decode("ascii")
+    assert json.loads(rt_messages.image_message_json(jpeg, prompt)) == rt_messages.image_message(data_url, prompt)
+
+
+class _WS:
+    def __init__(self):
+        self.frames = []
+
+    async def send(self, msg, text=None):
+        self.frames.append((msg, text))
+
+
+@pytest.mark.asyncio
+async def test_bytes_go_out_as_text_frames(monkeypatch):
+    ws = _WS()
+    await azure_realtime._text_sender(ws)(b'{"type":"x"}')
+    await azure_realtime._text_sender(ws)('{"type":"y"}')
+    assert ws.frames == [(b'{"type":"x"}', True), ('{"type":"y"}', None)]
+
+    monkeypatch.setattr(azure_realtime, "_ws_major", lambda: 12)  # no text= before 14
+    await azure_realtime._text_sender(ws)(b'{"type":"z"}')
+    assert ws.frames[-1] == ('{"type":"z"}', None)
+
+
+def test_a_camera_frame_is_queued_as_one_image_message():
+    c = AzureRealtimeClient(
+        ws_url="wss://x", api_key="k", instructions="i", voice="coral",
+        turn_detection={"type": "server_vad"},
+    )
+    c._ws = object()
+    c.send_image_jpeg(b"\xff\xd8jpeg", "leggi", respond=False)
+    [(_, msg)] = c._outbox._lanes[outbox.IMAGE].queue
+    assert isinstance(msg, bytes)
+    url = json.loads(msg)["item"]["content"][1]["image_url"]
+    assert url == "data:image/jpeg;base64," + base64.b64encode(b"\xff\xd8jpeg").decode("ascii")
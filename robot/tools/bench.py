@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the robot's hot audio and network paths.
+
+Numbers from a laptop say little about a Raspberry-class CPU, so run these on the
+robot itself — each prints the CPU the old and the new path spend per second of
+audio (or per message), which is the figure that decides whether the mic loop,
+the motion loop and the websocket still fit on the same cores:
+
+    ssh pollen@<robot> '/venvs/apps_venv/bin/python - resample' < bench.py
+
+With no argument every benchmark runs in turn.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from math import gcd
+
+import numpy as np
+
+from reachy_mini_mirrorbuddy.audio_dsp import (
+    boost,
+    boost_int16,
+    boost_table,
+    g711_decode,
+    g711_encode,
+    resample,
+)
+from reachy_mini_mirrorbuddy import meditation, rt_messages
+from reachy_mini_mirrorbuddy.capture import CaptureSource
+from reachy_mini_mirrorbuddy.mic_chain import MicChain
+from reachy_mini_mirrorbuddy.packetizer import MicPacketizer
+from reachy_mini_mirrorbuddy.resampler import StreamingResampler
+from reachy_mini_mirrorbuddy.rt_events import audio_delta
+
+AUDIO_S = 10.0  # seconds of audio pushed through each path
+
+
+def _cpu_ms_per_audio_s(fn: Callable[[], None], audio_s: float) -> float:
+    """CPU milliseconds ``fn`` spends per second of audio it processes."""
+    start = time.process_time()
+    fn()
+    return (time.process_time() - start) * 1000.0 / audio_s
+
+
+def _speech_like(rate: int, seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(7)
+    t = np.arange(int(rate * seconds)) / rate
+    voice = np.sin(2 * np.pi * 180 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    return ((voice * 0.3 + rng.normal(0, 0.02, t.size)) * 32767).astype(np.int16)
+
+
+def _report(title: str, rows: list[tuple[str, float]]) -> None:
+    print(f"\n{title}")
+    base = rows[0][1]
+    for name, value in rows:
+        gain = f"  ({base / value:.1f}x)" if value and name != rows[0][0] else ""
+        print(f"  {name:<28} {value:8.2f} ms CPU / s audio{gain}")
+
+
+def bench_resample() -> None:
+    """Per-chunk resample_poly vs the streaming resampler, mic and speaker paths."""
+    cases = [
+        ("mic 16k -> 24k, 20 ms blocks", 16000, 24000, 320),
+        ("mic 48k -> 24k, 10 ms blocks", 48000, 24000, 480),
+        ("speaker 24k -> 16k, deltas", 24000, 16000, 2400),
+        ("speaker 24k -> 48k, deltas", 24000, 48000, 2400),
+    ]
+    for title, src, dst, block in cases:
+        audio = _speech_like(src, AUDIO_S)
+        chunks = [audio[i:i + block] for i in range(0, audio.size, block)]
+
+        def per_chunk() -> None:
+            for c in chunks:
+                resample(c, src, dst)
+
+        stream = StreamingResampler(src, dst)
+        buf = np.empty(stream.output_size(block), dtype=np.float32)
+
+        def streaming() -> None:
+            for c in chunks:
+                stream.process(c, out=buf)
+
+        _report(
+            f"{title} (up {dst // gcd(src, dst)}, down {src // gcd(src, dst)})",
+            [
+                ("resample_poly per chunk", _cpu_ms_per_audio_s(per_chunk, AUDIO_S)),
+                ("StreamingResampler", _cpu_ms_per_audio_s(streaming, AUDIO_S)),
+            ],
+        )
+
+
+def bench_mic() -> None:
+    """The whole mic block path: the old step-per-line loop vs the staged chain."""
+    src, block = 16000, 320
+    stereo = np.stack([_speech_like(src, AUDIO_S)] * 2, axis=1).astype(np.float32) / 32768.0
+    blocks = [stereo[i:i + block] for i in range(0, stereo.shape[0], block)]
+
+    def old_loop() -> None:
+        for b in blocks:
+            audio = b.mean(axis=1)
+            audio = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+            float(np.sqrt(np.mean((audio.astype(np.float32) / 32768.0) ** 2)))
+            resample(audio, src, 24000).astype(np.int16).tobytes()
+
+    chain = MicChain(src, 24000)
+
+    def staged() -> None:
+        for b in blocks:
+            chain.process(b)
+            chain.serialise()
+
+    _report(
+        "mic block path, stereo float32 16k -> 24k, 20 ms blocks",
+        [
+            ("old per-step loop", _cpu_ms_per_audio_s(old_loop, AUDIO_S)),
+            ("MicChain", _cpu_ms_per_audio_s(staged, AUDIO_S)),
+        ],
+    )
+    print(f"  stages: {chain.timer.describe()}")
+
+
+def bench_packets() -> None:
+    """Upstream frames per second and send-path CPU for each packet length."""
+    rate, block_ms = 24000, 10
+    pcm = _speech_like(rate, AUDIO_S).tobytes()
+    step = rate * 2 * block_ms // 1000
+    blocks = [pcm[i:i + step] for i in range(0, len(pcm), step)]
+    rows = []
+    for packet_ms in (block_ms, 20, 40, 100):
+        frames: list[bytes] = []
+
+        def send(packet: bytes) -> None:
+            frames.append(rt_messages.audio_append_json(packet))
+
+        packets = MicPacketizer(send, packet_ms, rate)
+
+        def run() -> None:
+            for b in blocks:
+                packets.push(b)
+
+        cpu = _cpu_ms_per_audio_s(run, AUDIO_S)
+        rows.append((f"{packet_ms:>3} ms packets ({len(frames) / AUDIO_S:.0f} frames/s)", cpu))
+    _report(f"upstream send path, media blocks of {block_ms} ms", rows)
+
+
+def _peak_bytes(fn: Callable[[], object]) -> int:
+    """Most memory ``fn`` holds at once beyond its result: the copies it makes on the way."""
+    tracemalloc.start()
+    try:
+        result = fn()
+        size = len(result) if isinstance(result, (bytes, str)) else 0
+        return tracemalloc.get_traced_memory()[1] - size
+    finally:
+        tracemalloc.stop()
+
+
+def bench_serialize() -> None:
+    """Outbound JSON: b64encode + dict + json.dumps vs pre-serialised templates."""
+    rate, packet_ms, passes = 24000, 40, 20
+    pcm = _speech_like(rate, AUDIO_S).tobytes()
+    step = rate * 2 * packet_ms // 1000
+    packets = [pcm[i:i + step] for i in range(0, len(pcm), step)] * passes
+    audio_s = AUDIO_S * passes
+
+    def old_audio(p: bytes) -> str:
+        return json.dumps(rt_messages.audio_append(base64.b64encode(p).decode("ascii")))
+
+    def old_all() -> None:
+        for p in packets:
+            old_audio(p)
+
+    def new_all() -> None:
+        for p in packets:
+            rt_messages.audio_append_json(p)
+
+    _report(
+        f"mic send path, {packet_ms} ms PCM16 packets ({1000 // packet_ms}/s)",
+        [("b64encode, dict, json.dumps", _cpu_ms_per_audio_s(old_all, audio_s)),
+         ("template join", _cpu_ms_per_audio_s(new_all, audio_s))],
+    )
+    print(f"  transient bytes per packet: {_peak_bytes(lambda: old_audio(packets[0])):,} -> "
+          f"{_peak_bytes(lambda: rt_messages.audio_append_json(packets[0])):,}"
+          f" (x{1000 // packet_ms}/s)")
+
+    jpeg = np.random.default_rng(3).integers(0, 256, 200_000, dtype=np.uint8).tobytes()
+    prompt = "Guarda la foto e leggi cosa c'e' scritto."
+
+    def old_image() -> str:
+        data_url = "data:image/jpeg;base64," + base64.b64encode(jpeg).decode("ascii")
+        return json.dumps(rt_messages.image_message(data_url, prompt))
+
+    def timed(fn: Callable[[], object], n: int = 50) -> float:
+        start = time.process_time()
+        for _ in range(n):
+            fn()
+        return (time.process_time() - start) * 1000.0 / n
+
+    print("\n200 kB camera frame -> image message")
+    for name, fn in (("data URL + json.dumps", old_image),
+                     ("template join", lambda: rt_messages.image_message_json(jpeg, prompt))):
+        print(f"  {name:<28} {timed(fn):8.2f} ms CPU   {_peak_bytes(fn) / 1000:8.0f} kB transient")
+
+
+def _reply_stream(seconds: float = AUDIO_S) -> list[str]:
+    """Inbound frames of one spoken reply, as the service sends them (100 ms deltas)."""
+    rate, step = 24000, 4800
+    wire = _speech_like(rate, seconds).tobytes()
+    frames = [json.dumps({"type": "response.created", "event_id": "e0",
+                          "response": {"id": "resp_1", "status": "in_progress"}}, separators=(",", ":"))]
+    for n, i in enumerate(range(0, len(wire), step)):
+        frames.append(json.dumps({
+            "type": "response.output_audio.delta", "event_id": f"e{n}a", "response_id": "resp_1",
+            "item_id": "item_1", "output_index": 0, "content_index": 0,
+            "delta": base64.b64encode(wire[i:i + step]).decode("ascii"),
+        }, separators=(",", ":")))
+        frames.append(json.dumps({
+            "type": "response.output_audio_transcript.delta", "event_id": f"e{n}t",
+            "response_id": "resp_1", "item_id": "item_1", "output_index": 0,
+            "content_index": 0, "delta": "parola ",
+        }, separators=(",", ":")))
+    return frames
+
+
+def bench_inbound() -> None:
+    """Inbound frames: json.loads + b64decode for all vs the audio-delta fast path."""
+    passes = 10
+    frames = _reply_stream() * passes
+    audio_s = AUDIO_S * passes
+    deltas = sum(1 for f in frames if '"response.output_audio.delta"' in f)
+
+    def generic() -> None:
+        for raw in frames:
+            event = json.loads(raw)
+            if event.get("type") == "response.output_audio.delta":
+                np.frombuffer(base64.b64decode(event["delta"]), dtype=np.int16)
+
+    def fast() -> None:
+        for raw in frames:
+            delta = audio_delta(raw)
+            if delta is not None:
+                np.frombuffer(binascii.a2b_base64(delta[0]), dtype=np.int16)
+                continue
+            json.loads(raw)
+
+    old_ms = _cpu_ms_per_audio_s(generic, audio_s)
+    new_ms = _cpu_ms_per_audio_s(fast, audio_s)
+    _report("inbound reply stream, 100 ms audio deltas + transcript deltas",
+            [("json.loads every frame", old_ms), ("audio-delta fast path", new_ms)])
+    per = (old_ms - new_ms) * audio_s / deltas * 1000.0
+    print(f"  saving per audio delta: {per:.1f} µs")
+
+
+def bench_formats() -> None:
+    """Wire bytes per second and CPU per turn for PCM16, μ-law and A-law."""
+    mic_rate, spk_rate, block = 16000, 16000, 320
+    listen_s, speak_s = 5.0, 10.0  # one turn: the child talks, then Buddy answers
+    mic = _speech_like(mic_rate, listen_s)
+    mic_blocks = [mic[i:i + block] for i in range(0, mic.size, block)]
+    print(f"\nrealtime audio formats, one turn = {listen_s:.0f} s listening + {speak_s:.0f} s speaking")
+    for fmt in rt_messages.AUDIO_FORMATS:
+        rate = rt_messages.wire_rate(fmt)
+        law = fmt if fmt != "pcm16" else None
+        encoder = (lambda pcm, law=law: g711_encode(pcm, law)) if law else None
+        up: list[bytes] = []
+
+        def send(packet: bytes, up=up) -> None:
+            up.append(rt_messages.audio_append_json(packet))
+
+        chain = MicChain(mic_rate, rate, encoder=encoder)
+        packets = MicPacketizer(send, 40, rate, rt_messages.bytes_per_sample(fmt))
+        reply = _speech_like(rate, speak_s)
+        wire = g711_encode(reply, law) if law else reply.tobytes()
+        step = rate * rt_messages.bytes_per_sample(fmt) // 10  # 100 ms deltas
+        down = [
+            json.dumps({"type": "response.output_audio.delta",
+                        "delta": base64.b64encode(wire[i:i + step]).decode("ascii")})
+            for i in range(0, len(wire), step)
+        ]
+        speaker = StreamingResampler(rate, spk_rate)
+
+        def turn() -> None:
+            for b in mic_blocks:
+                chain.process(b)
+                packets.push(chain.serialise())
+            for frame in down:
+                data = base64.b64decode(json.loads(frame)["delta"])
+                pcm = g711_decode(data, law) if law else np.frombuffer(data, dtype=np.int16)
+                speaker.process(pcm)
+
+        start = time.process_time()
+        turn()
+        cpu_ms = (time.process_time() - start) * 1000.0
+        up_bps = sum(len(f) for f in up) / listen_s
+        down_bps = sum(len(f) for f in down) / speak_s
+        print(f"  {fmt:<6} {rate // 1000:>2} kHz  up {up_bps / 1000:6.1f} kB/s"
+              f"  down {down_bps / 1000:6.1f} kB/s  {cpu_ms:7.1f} ms CPU/turn")
+
+
+def bench_boost() -> None:
+    """Speaker render: resample, then convert + tanh vs round + int16 lookup table."""
+    rate, gain, chunk = 24000, 3.2, 2400  # 100 ms deltas at the realtime rate
+    audio = _speech_like(rate, AUDIO_S)
+    passes = 20  # each pass is cheap: repeat it so the CPU clock can resolve it
+    chunks = [audio[i:i + chunk] for i in range(0, audio.size, chunk)] * passes
+    audio_s = AUDIO_S * passes
+    table = boost_table(gain)  # built once per gain, not per chunk
+    old, new = StreamingResampler(rate, 16000), StreamingResampler(rate, 16000)
+
+    def arithmetic() -> None:
+        for c in chunks:
+            out = old.process(c)
+            out /= 32768.0
+            boost(out, gain)
+
+    def lookup() -> None:
+        for c in chunks:
+            out = new.process(c)
+            np.rint(out, out=out)
+            np.clip(out, -32768.0, 32767.0, out=out)
+            boost_int16(out.astype(np.int16), table)
+
+    _report(
+        "speaker render (resample to 16 kHz + boost), 100 ms chunks",
+        [("convert, scale, tanh", _cpu_ms_per_audio_s(arithmetic, audio_s)),
+         ("round, int16 lookup table", _cpu_ms_per_audio_s(lookup, audio_s))],
+    )
+
+
+def _bell_per_sample(seconds: float, rate: int) -> bytes:
+    """The meditation bell as it used to be built: one Python loop turn per sample."""
+    import math
+    import struct
+
+    out = bytearray()
+    peak = sum(a for _, a in meditation._PARTIALS)
+    for i in range(max(1, int(seconds * rate))):
+        t = i / rate
+        env = math.exp(-meditation._DECAY * t)
+        s = sum(a * math.sin(2 * math.pi * meditation._FUNDAMENTAL_HZ * r * t)
+                for r, a in meditation._PARTIALS)
+        out += struct.pack("<h", int(max(-1.0, min(1.0, s / peak * env)) * 32767 * 0.7))
+    return bytes(out)
+
+
+def bench_bell() -> None:
+    """Meditation bell synthesis: per-sample loop vs numpy (uncached), 3 s at 24 kHz."""
+    seconds, rate = meditation.BELL_S, meditation.SAMPLE_RATE
+    passes = 20  # the numpy strike is quick: repeat it so the CPU clock can resolve it
+
+    def numpy_bell() -> None:
+        for _ in range(passes):
+            meditation.bell.__wrapped__(seconds, rate)
+
+    _report(
+        "meditation bell, 3 s at 24 kHz",
+        [("per-sample loop + struct", _cpu_ms_per_audio_s(lambda: _bell_per_sample(seconds, rate), seconds)),
+         ("numpy", _cpu_ms_per_audio_s(numpy_bell, seconds * passes))],
+    )
+
+
+class _ClockedMedia:
+    """Stands in for the media server: one block becomes ready every period."""
+
+    def __init__(self, rate: int, block_s: float) -> None:
+        self.block = np.zeros(int(rate * block_s), dtype=np.int16)
+        self.block_s = block_s
+        self.start = time.monotonic()
+        self.handed = 0
+
+    def get_audio_sample(self):
+        if self.handed >= int((time.monotonic() - self.start) / self.block_s):
+            return None
+        self.handed += 1
+        return self.block
+
+
+def bench_capture(seconds: float = 3.0) -> None:
+    """Mic-thread wakeups per second: 1 ms sleep polling vs the capture source."""
+    rate = 16000
+    print(f"\nmic thread wakeups, 20 ms blocks, {seconds:.0f} s real time each")
+    media = _ClockedMedia(rate, 0.02)
+    wakeups, end = 0, time.monotonic() + seconds
+    cpu = time.process_time()
+    while time.monotonic() < end:
+        wakeups += 1
+        if media.get_audio_sample() is None:
+            time.sleep(0.001)
+    print(f"  {'1 ms sleep polling':<28} {wakeups / seconds:8.0f} wakeups/s"
+          f"  {(time.process_time() - cpu) * 1000 / seconds:6.2f} ms CPU/s")
+
+    media = _ClockedMedia(rate, 0.02)
+    source = CaptureSource(media, rate)
+    end = time.monotonic() + seconds
+    cpu = time.process_time()
+    while time.monotonic() < end:
+        source.read(0.1)
+    print(f"  {'CaptureSource':<28} {source.wakeups / seconds:8.0f} wakeups/s"
+          f"  {(time.process_time() - cpu) * 1000 / seconds:6.2f} ms CPU/s")
+
+
+BENCHMARKS: dict[str, Callable[[], None]] = {
+    "resample": bench_resample,
+    "mic": bench_mic,
+    "packets": bench_packets,
+    "capture": bench_capture,
+    "formats": bench_formats,
+    "boost": bench_boost,
+    "bell": bench_bell,
+    "serialize": bench_serialize,
+    "inbound": bench_inbound,
+}
+
+
+def main(argv: list[str]) -> None:
+    names = argv or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"unknown benchmark {name!r}; choose from {', '.join(BENCHMARKS)}")
+            sys.exit(2)
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Score the on-device keyword spotter on recorded WAVs: accuracy and latency.
+
+Whether "zitto" is caught on the robot — and whether the television is not —
+depends on the child's voice and the room, which no synthetic test can stand in
+for. Record a few takes of each word (the templates) and a separate set of test
+clips, then run the spotter over the clips exactly as the mic thread would:
+20 ms blocks, the same 10 ms hop voice test the barge-in uses, the same match.
+
+    templates/zitto/*.wav  templates/buddy/*.wav  ...
+    clips/zitto/*.wav      clips/buddy/*.wav      clips/other/*.wav
+
+A clip folder named after an enrolled word must trigger that word; any other
+folder (speech, TV, noise) must trigger nothing. Latency is measured from the
+end of each clip's audio to the block that fired (negative: the word was caught
+before a quiet tail at the end of the recording).
+
+    PYTHONPATH=. python tools/eval-kws.py templates clips [--threshold 11]
+
+If words are missed, record more templates or raise the threshold; if other
+clips fire, lower it. Set the result as MIRRORBUDDY_KWS_THRESHOLD, or leave it
+unset to let each word's threshold follow the spread of its own templates.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from reachy_mini_mirrorbuddy.barge_detector import BargeDetector
+from reachy_mini_mirrorbuddy.keyword_spotter import KeywordSpotter, load_wav
+from reachy_mini_mirrorbuddy.mic_chain import MicChain
+
+BLOCK_S = 0.02
+PAD_S = 0.5  # room tone around each clip, so the floor is learnt and the word can end
+
+
+class _Spotters(dict):
+    """One spotter per clip sample rate, built on first use (the mic rate is per robot)."""
+
+    def __init__(self, templates: Path, threshold: float | None) -> None:
+        super().__init__()
+        self.templates, self.threshold = templates, threshold
+
+    def __missing__(self, rate: int) -> KeywordSpotter:
+        spotter = self[rate] = KeywordSpotter(rate, self.threshold)
+        spotter.load_dir(self.templates)
+        return spotter
+
+
+def _run_clip(
+    spotter: KeywordSpotter, audio: np.ndarray, rate: int, t0: float
+) -> tuple[str | None, float]:
+    """Stream one clip starting at time ``t0``; return the word spotted and its delay in ms."""
+    rng = np.random.default_rng(0)
+    pad = rng.normal(0, 30, int(PAD_S * rate)).astype(np.float32)
+    stream = np.concatenate([pad, audio, pad])
+    clip_end = (pad.size + audio.size) / rate
+    chain, barge = MicChain(rate, rate), BargeDetector(rms_threshold=0.045, sustain_frames=3)
+    spotter.reset()
+    block = int(BLOCK_S * rate)
+    for start in range(0, stream.size - block + 1, block):
+        chain.process(stream[start:start + block].astype(np.int16))
+        hops = chain.hops
+        voiced = bool(hops.size) and float(hops.max()) >= barge.threshold()
+        if not voiced:
+            barge.note_hops(hops, False, chain.hop_ms)  # learn the room, as the robot does
+        now = (start + block) / rate
+        word = spotter.feed(chain.mono, voiced, now=t0 + now)
+        if word:
+            return word, (now - clip_end) * 1000.0
+    return None, 0.0
+
+
+def main(argv: list[str]) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("templates", type=Path)
+    ap.add_argument("clips", type=Path)
+    ap.add_argument("--threshold", type=float, default=None)
+    args = ap.parse_args(argv)
+
+    spotters = _Spotters(args.templates, args.threshold)
+    rows: dict[str, list[tuple[str | None, float]]] = {}
+    audio_s, cpu = 0.0, 0.0
+    clock = 0.0  # clips play one after the other, well apart: each stands alone
+    for wav in sorted(args.clips.glob("*/*.wav")):
+        audio, rate = load_wav(wav)
+        spotter = spotters[rate]
+        if not spotter.templates:
+            print(f"No templates under {args.templates}")
+            sys.exit(2)
+        start = time.process_time()
+        result = _run_clip(spotter, audio, rate, clock)
+        rows.setdefault(wav.parent.name.replace("_", " "), []).append(result)
+        cpu += time.process_time() - start
+        audio_s += audio.size / rate + 2 * PAD_S
+        clock += audio.size / rate + 2 * PAD_S + 5.0
+
+    words = set(next(iter(spotters.values())).words) if spotters else set()
+    print(f"\n{'clips':<14} {'n':>4} {'right':>6} {'wrong':>6} {'missed':>7}   latency ms (median / p90)")
+    false_alarms = negatives = 0
+    for label, results in sorted(rows.items()):
+        hits = [d for w, d in results if w == label]
+        wrong = sum(1 for w, _ in results if w is not None and w != label)
+        missed = sum(1 for w, _ in results if w is None)
+        if label not in words:
+            negatives += len(results)
+            false_alarms += wrong
+            print(f"{label:<14} {len(results):>4} {'-':>6} {wrong:>6} {'-':>7}   (should never fire)")
+            continue
+        lat = f"{np.median(hits):5.0f} / {np.percentile(hits, 90):5.0f}" if hits else "    -"
+        print(f"{label:<14} {len(results):>4} {len(hits):>6} {wrong:>6} {missed:>7}   {lat}")
+    if negatives:
+        print(f"\nFalse alarms: {false_alarms} of {negatives} non-keyword clips")
+    for spotter in spotters.values():
+        limits = ", ".join(f"{w} {spotter.threshold_for(w):.1f}" for w in spotter.words)
+        print(f"Thresholds at {spotter.sample_rate} Hz: {limits}")
+    if audio_s:
+        print(f"CPU: {cpu * 1000.0 / audio_s:.1f} ms per second of audio")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])